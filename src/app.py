@@ -1,11 +1,12 @@
 import streamlit as st
 from lib.config.model_config import ModelConfig
-from script import ResumeSkillExtractor
+from script import ResumeSkillExtractor, run_retrieve_cookie_and_scraper, get_job_search_query
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
+import hashlib
 import os
 import json
 import base64
-import subprocess
 
 
 from dotenv import load_dotenv
@@ -48,38 +49,59 @@ def display_jobs(jobs):
             st.markdown("---")
 
 
-def run_script_and_get_results(pdf_path: str):
-    try:
-        subprocess.run(["python3", "src/script.py", pdf_path], check=True)
+SCRAPER_VENV_PYTHON = "scraper/scraper_venv/bin/python"
+
+
+def analyze_resume(pdf_bytes: bytes) -> dict:
+    # runs in-process on the cached extractor, models stay loaded between uploads
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        tmp_file.write(pdf_bytes)
+        temp_pdf_path = tmp_file.name
 
-        jobs = []
-        resume_data = {}
+    try:
+        return extractor.process_resume(temp_pdf_path)
+    except Exception as e:
+        st.error(f"Error analyzing resume: {e}")
+        return {}
+    finally:
+        os.remove(temp_pdf_path)
 
-        if os.path.exists("linkedin_jobs.json"):
-            jobs = load_local_scraped_jobs("linkedin_jobs.json")
-        else:
-            st.warning("LinkedIn jobs file not found.")
 
-        if os.path.exists("resume_analysis_zsl_results.json"):
-            with open("resume_analysis_zsl_results.json", "r", encoding="utf-8") as f:
-                resume_data = json.load(f)
-        else:
-            st.warning("Resume analysis result file not found.")
+def search_jobs(query: str) -> list:
+    # every search writes to its own file so concurrent users don't overwrite each other;
+    # the listings are read back right away, the file is not needed after that
+    fd, output_path = tempfile.mkstemp(suffix=".json", prefix="jobs_")
+    os.close(fd)
+    try:
+        run_retrieve_cookie_and_scraper(
+            SCRAPER_VENV_PYTHON, query, location="Romania", output_path=output_path)
+        with open(output_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(output_path)
 
-        return jobs, resume_data
 
-    except subprocess.CalledProcessError as e:
-        st.error(f"Error running script.py: {e}")
-        return [], {}
+@st.cache_resource
+def load_job_executor():
+    return ThreadPoolExecutor(max_workers=2)
 
 
 @st.cache_resource
-def load_extractor():
-    config = ModelConfig.get_accurate_config()
+def load_extractor(mode: str):
+    # one cached extractor per mode, switching back doesn't reload the models
+    if mode == "rules":
+        config = ModelConfig.get_rules_config()
+    else:
+        config = ModelConfig.get_accurate_config()
     return ResumeSkillExtractor(config=config)
 
 
-extractor = load_extractor()
+ANALYSIS_MODES = {
+    "Full (zero-shot verified)": "full",
+    "Fast (rules only)": "rules",
+}
+analysis_mode = ANALYSIS_MODES[st.sidebar.radio("Analysis mode", list(ANALYSIS_MODES))]
+extractor = load_extractor(analysis_mode)
 
 st.title("CV Skill Extractor")
 
@@ -88,14 +110,12 @@ uploaded_file = st.file_uploader("Upload your resume (PDF only)", type=["pdf"])
 if uploaded_file:
     st.success("File uploaded successfully!")
 
-    # save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        temp_pdf_path = tmp_file.name
+    pdf_bytes = uploaded_file.getvalue()
+    # a mode switch re-analyzes the same upload
+    resume_key = f"{hashlib.sha256(pdf_bytes).hexdigest()}:{analysis_mode}"
 
     # PDF preview
-    with open(temp_pdf_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
+    base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
 
     pdf_display = f'''
         <iframe
@@ -109,9 +129,14 @@ if uploaded_file:
     st.sidebar.markdown("### Uploaded resume (preview)")
     st.sidebar.markdown(pdf_display, unsafe_allow_html=True)
 
-    st.info("Running full pipeline...")
+    # streamlit reruns the page on every interaction, analyze each upload once
+    if st.session_state.get("resume_key") != resume_key:
+        with st.spinner("Analyzing resume..."):
+            st.session_state["resume_data"] = analyze_resume(pdf_bytes)
+        st.session_state["resume_key"] = resume_key
+        st.session_state.pop("job_search", None)
 
-    job_data, resume_data = run_script_and_get_results(temp_pdf_path)
+    resume_data = st.session_state["resume_data"]
 
     # display results
     if resume_data:
@@ -139,5 +164,27 @@ if uploaded_file:
             "Rule-based detected": stats.get("rule_based_count", 0),
         })
 
-    st.subheader("Matching jobs based off of predicted role: ")
-    display_jobs(job_data)
+        st.download_button(
+            "Download analysis (JSON)",
+            data=json.dumps(resume_data, indent=4, default=str,
+                            ensure_ascii=False),
+            file_name="resume_analysis.json",
+            mime="application/json"
+        )
+
+        st.subheader("Matching jobs based off of predicted role: ")
+        # the scraper is slow and optional, it runs as a background job
+        if "job_search" not in st.session_state:
+            if st.button("Search matching jobs"):
+                st.session_state["job_search"] = load_job_executor().submit(
+                    search_jobs, get_job_search_query(resume_data))
+
+        job_search = st.session_state.get("job_search")
+        if job_search is not None:
+            if not job_search.done():
+                st.info("Searching jobs...")
+                st.button("Refresh")
+            elif job_search.exception() is not None:
+                st.error(f"Failed to load job listings: {job_search.exception()}")
+            else:
+                display_jobs(job_search.result())
@@ -0,0 +1,426 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import platform
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from lib.config.model_config import ModelConfig
+from lib.processors.resume_document import ResumeDocument
+from lib.utils.embedding_prefilter import SkillEmbeddingIndex
+from lib.utils.inference_profile import InferenceProfile, save_calibration
+from lib.utils.model_utils import get_model_manager
+from script import ResumeSkillExtractor
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+STAGES = [
+    "pdf_extraction",
+    "cleaning",
+    "chunking",
+    "rule_matching",
+    "nli_scoring",
+    "role_classification",
+    "experience_regexes",
+]
+
+
+class StubNLIScorer:
+    """Deterministic stand-in for NLIScorer: scores are a hash of the pair,
+    so model-dependent stages can be benchmarked offline without weights"""
+
+    tokenizer = None
+
+    def score(self, premises: List[str], labels: List[str]) -> List[float]:
+        scores = []
+        for premise, label in zip(premises, labels):
+            digest = hashlib.sha1(f"{premise}\x1f{label}".encode("utf-8")).digest()
+            scores.append(int.from_bytes(digest[:4], "big") / 0xFFFFFFFF)
+        return scores
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def measure(self, stage: str):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        rss_start = peak_rss_mb()
+        yield
+        # ru_maxrss is a process-wide high-water mark, so a stage is charged only
+        # for how far it raised it (0 for a stage that stayed below an earlier peak)
+        self.stages[stage] = {
+            "wall_s": time.perf_counter() - wall_start,
+            "cpu_s": time.process_time() - cpu_start,
+            "peak_rss_increase_mb": round(peak_rss_mb() - rss_start, 1),
+        }
+
+
+def build_extractor(stub: bool) -> ResumeSkillExtractor:
+    config = ModelConfig.get_accurate_config()
+    # cached scores / results would turn the NLI stages into lookups
+    config.score_cache_path = None
+    config.result_cache_path = None
+
+    if not stub:
+        return ResumeSkillExtractor(config=config)
+
+    extractor = ResumeSkillExtractor(config=config, load_models=False)
+    scorer = StubNLIScorer()
+    extractor.role_scorer = scorer
+    extractor.zsl_extractor.scorer = scorer
+    extractor.hybrid_extractor.zsl_extractor.scorer = scorer
+    return extractor
+
+
+def run_stages(extractor: ResumeSkillExtractor, pdf_path: Optional[str] = None,
+               raw_text: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """one pass of the pipeline, stage by stage (PDF extraction only for PDFs)"""
+    timer = StageTimer()
+    processor = extractor.text_processor
+    config = extractor.config
+
+    if pdf_path is not None:
+        with timer.measure("pdf_extraction"):
+            raw_text = extractor.text_extractor.extract_from_pdf(pdf_path)
+
+    with timer.measure("cleaning"):
+        text = processor.clean_text(raw_text)
+
+    with timer.measure("chunking"):
+        sentence_spans = processor.extract_sentence_spans(text)
+        chunk_spans = processor.chunk_sentence_spans(
+            sentence_spans, config.text_chunk_size)
+        chunks = [text[start:end] for start, end in chunk_spans]
+
+    document = ResumeDocument(raw_text=raw_text, text=text, sentence_spans=sentence_spans,
+                              chunks=chunks, chunk_size=config.text_chunk_size,
+                              chunk_spans=chunk_spans)
+
+    with timer.measure("rule_matching"):
+        rule_based_skills = extractor.rule_extractor.extract(text)
+
+    with timer.measure("nli_scoring"):
+        candidate_skills = [skill['skill'] for skill in rule_based_skills]
+        skill_positions = {skill['skill']: skill['positions'] for skill in rule_based_skills}
+        extractor.zsl_extractor.extract(
+            text, candidate_skills, document=document, skill_positions=skill_positions)
+
+    with timer.measure("role_classification"):
+        extractor.classify_role(text, document)
+
+    with timer.measure("experience_regexes"):
+        extractor.extract_experience_years(text)
+
+    return timer.stages
+
+
+def best_of(runs: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """fastest wall time per stage across repeats, the least noisy estimate"""
+    best = {}
+    for stage in runs[0]:
+        fastest = min((run[stage] for run in runs), key=lambda m: m["wall_s"])
+        best[stage] = {
+            "wall_s": round(fastest["wall_s"], 6),
+            "cpu_s": round(fastest["cpu_s"], 6),
+            "peak_rss_increase_mb": max(run[stage]["peak_rss_increase_mb"] for run in runs),
+        }
+    return best
+
+
+def run_benchmark(corpus_dir: str, scales: List[int], repeat: int, stub: bool) -> Dict:
+    extractor = build_extractor(stub)
+    pdf_paths = sorted(Path(corpus_dir).glob("*.pdf"))
+    if not pdf_paths:
+        raise FileNotFoundError(f"no PDF files found in {corpus_dir}")
+
+    documents = {}
+    for pdf_path in pdf_paths:
+        runs = [run_stages(extractor, pdf_path=str(pdf_path))
+                for _ in range(repeat)]
+        documents[pdf_path.name] = best_of(runs)
+        logger.warning(f"benchmarked {pdf_path.name}")
+
+    # synthetic resumes: the first corpus resume repeated to scale its length
+    base_text = extractor.text_extractor.extract_from_pdf(str(pdf_paths[0]))
+    for scale in scales:
+        raw_text = "\n".join([base_text] * scale)
+        runs = [run_stages(extractor, raw_text=raw_text)
+                for _ in range(repeat)]
+        documents[f"synthetic_{scale}x"] = best_of(runs)
+        logger.warning(f"benchmarked synthetic {scale}x")
+
+    totals = {}
+    for stage in STAGES:
+        measured = [doc[stage] for doc in documents.values() if stage in doc]
+        totals[stage] = {
+            "wall_s": round(sum(m["wall_s"] for m in measured), 6),
+            "cpu_s": round(sum(m["cpu_s"] for m in measured), 6),
+        }
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stub_classifier": stub,
+            "repeat": repeat,
+            "scales": scales,
+            "config": extractor.config.to_dict(),
+        },
+        "documents": documents,
+        "totals": totals,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def measure_prefilter_recall(corpus_dir: str, top_k: int) -> Dict:
+    """NLI pairs and detected skills of the embedding pre-filter vs. the exhaustive
+    path, per resume (needs the real models)"""
+    config = ModelConfig.get_accurate_config()
+    config.score_cache_path = None
+    config.result_cache_path = None
+    config.prefilter_top_k = top_k
+    # pair counts of the pre-filter alone
+    config.zsl_early_exit = False
+    extractor = ResumeSkillExtractor(config=config)
+    zsl_extractor = extractor.zsl_extractor
+
+    encoder = extractor.model_manager.load_embedding_encoder(
+        config.embedding_model, use_gpu=config.use_gpu)
+    prefilter = SkillEmbeddingIndex(
+        encoder, extractor.skill_categories, config.skill_embeddings_dir)
+
+    documents = {}
+    for pdf_path in sorted(Path(corpus_dir).glob("*.pdf")):
+        document = extractor.create_document(
+            extractor.text_extractor.extract_from_pdf(str(pdf_path)))
+        candidate_skills = [skill['skill'] for skill in
+                            extractor.rule_extractor.extract(document.text)]
+
+        runs = {}
+        for name, stage in (("exhaustive", None), ("prefilter", prefilter)):
+            zsl_extractor.prefilter = stage
+            start = time.perf_counter()
+            stats = {}
+            skills = zsl_extractor.extract(
+                document.text, candidate_skills, document=document, stats=stats)
+            runs[name] = {
+                "pairs": stats["pairs_scored"],
+                "skills": {skill['skill'] for skill in skills},
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+
+        full, filtered = runs["exhaustive"]["skills"], runs["prefilter"]["skills"]
+        documents[pdf_path.name] = {
+            "pairs": runs["exhaustive"]["pairs"],
+            "prefilter_pairs": runs["prefilter"]["pairs"],
+            "seconds": runs["exhaustive"]["seconds"],
+            "prefilter_seconds": runs["prefilter"]["seconds"],
+            "recall": round(len(full & filtered) / len(full), 4) if full else 1.0,
+            "missed": sorted(full - filtered),
+        }
+        logger.warning(f"measured pre-filter recall on {pdf_path.name}")
+
+    zsl_extractor.prefilter = None
+    extractor.model_manager.release_model(config.embedding_model, use_gpu=config.use_gpu)
+
+    pairs = sum(doc["pairs"] for doc in documents.values())
+    prefilter_pairs = sum(doc["prefilter_pairs"] for doc in documents.values())
+    return {
+        "top_k": top_k,
+        "documents": documents,
+        "pair_reduction": round(pairs / prefilter_pairs, 2) if prefilter_pairs else None,
+        "mean_recall": round(sum(doc["recall"] for doc in documents.values())
+                             / max(len(documents), 1), 4),
+    }
+
+
+def calibration_pairs(extractor: ResumeSkillExtractor, corpus_dir: str, limit: int):
+    """(chunk, skill) pairs of the corpus, the same work the skill classifier gets"""
+    premises, labels = [], []
+    for pdf_path in sorted(Path(corpus_dir).glob("*.pdf")):
+        document = extractor.create_document(
+            extractor.text_extractor.extract_from_pdf(str(pdf_path)))
+        skills = [skill['skill'] for skill in extractor.rule_extractor.extract(document.text)]
+        for chunk in document.chunks:
+            for skill in skills:
+                premises.append(chunk)
+                labels.append(skill)
+                if len(premises) >= limit:
+                    return premises, labels
+    return premises, labels
+
+
+def _calibration_worker(config_dict: Dict, threads: int, premises: List[str], labels: List[str],
+                        rounds: int, barrier) -> float:
+    """one inference process of the layout: pairs/s with threads intra-op threads,
+    measured once every process of the layout is loaded and warm"""
+    config = ModelConfig.from_dict(config_dict)
+    profile = InferenceProfile.from_config(config)
+    profile.threads = threads
+    profile.interop_threads = 1
+    scorer = get_model_manager().load_nli_scorer(
+        config.skill_classifier_model, use_gpu=False, batch_size=config.nli_batch_size,
+        backend=config.inference_backend, profile=profile)
+    scorer.score(premises[:config.nli_batch_size], labels[:config.nli_batch_size])
+
+    barrier.wait()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        scorer.score(premises, labels)
+    return rounds * len(premises) / (time.perf_counter() - start)
+
+
+def calibrate_threads(corpus_dir: str, processes: int, pair_count: int, rounds: int,
+                      output_path: Optional[str]) -> Dict:
+    """Sweep torch threads per process for a layout of processes inference processes
+    running at once on this machine and record the fastest in total pairs/s
+    (each process loads its own copy of the skill classifier)"""
+    config = ModelConfig.get_cpu_config()
+    config.score_cache_path = None
+    config.result_cache_path = None
+    output_path = output_path or config.inference_profile_path
+
+    extractor = ResumeSkillExtractor(config=config, load_models=False)
+    premises, labels = calibration_pairs(extractor, corpus_dir, pair_count)
+    if not premises:
+        raise FileNotFoundError(f"no skills found in the PDF files of {corpus_dir}")
+
+    cpu_count = os.cpu_count() or 1
+    per_process = max(cpu_count // processes, 1)
+    candidates = sorted({1, per_process} | {2 ** i for i in range(per_process.bit_length())
+                                            if 2 ** i <= per_process})
+
+    # fresh processes per setting, torch's thread pools can't be resized once used
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for threads in candidates:
+        with context.Manager() as manager:
+            barrier = manager.Barrier(processes)
+            with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+                futures = [pool.submit(_calibration_worker, config.to_dict(), threads,
+                                       premises, labels, rounds, barrier)
+                           for _ in range(processes)]
+                results[threads] = round(sum(future.result() for future in futures), 2)
+        print(f"{threads:3d} threads x {processes} processes: {results[threads]:10.2f} pairs/s")
+
+    best = max(results, key=results.get)
+    profile = InferenceProfile.from_config(config)
+    profile.threads = best
+    profile.interop_threads = 1
+    save_calibration(output_path, profile, processes, results, cpu_count)
+    return {"threads": best, "pairs_per_second": results, "output": output_path}
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """stages whose total wall time grew by more than tolerance over the baseline"""
+    regressions = []
+    print("\n======= BASELINE COMPARISON =======")
+    for stage, current in results["totals"].items():
+        previous = baseline.get("totals", {}).get(stage)
+        if not previous or not previous["wall_s"]:
+            continue
+        ratio = current["wall_s"] / previous["wall_s"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(stage)
+            flag = "  <-- REGRESSION"
+        print(f"{stage:22s} {previous['wall_s']:10.4f}s -> {current['wall_s']:10.4f}s"
+              f"  ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def print_totals(results: Dict):
+    print("\n======= STAGE TOTALS =======")
+    for stage, total in results["totals"].items():
+        print(f"{stage:22s} wall {total['wall_s']:10.4f}s  cpu {total['cpu_s']:10.4f}s")
+    print(f"peak RSS: {results['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-stage benchmark of the resume pipeline")
+    parser.add_argument("--corpus", default="resumes",
+                        help="folder of PDF resumes")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="length multipliers for the synthetic resumes")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per document, the fastest is kept")
+    parser.add_argument("--stub", action="store_true",
+                        help="use a deterministic stub instead of the NLI models (offline)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None,
+                        help="previous --output file to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed wall time growth per stage vs. the baseline")
+    parser.add_argument("--prefilter-recall", action="store_true",
+                        help="instead of timing stages, compare the embedding pre-filter "
+                             "to exhaustive NLI scoring (real models only)")
+    parser.add_argument("--top-k", type=int, default=2,
+                        help="chunks kept per skill by the pre-filter")
+    parser.add_argument("--calibrate-threads", action="store_true",
+                        help="instead of timing stages, find the fastest torch thread count per "
+                             "inference process on this machine and save it for ModelConfig "
+                             "(real models only)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="inference processes sharing the machine, e.g. server instances")
+    parser.add_argument("--calibration-pairs", type=int, default=256,
+                        help="(chunk, skill) pairs scored per round")
+    parser.add_argument("--calibration-output", default=None,
+                        help="where to save the calibration (default: inference_profile_path)")
+    args = parser.parse_args()
+
+    if args.calibrate_threads:
+        calibration = calibrate_threads(
+            args.corpus, args.processes, args.calibration_pairs, args.repeat,
+            args.calibration_output)
+        print(f"Best: {calibration['threads']} threads per process, "
+              f"saved to {calibration['output']}")
+        return
+
+    if args.prefilter_recall:
+        results = measure_prefilter_recall(args.corpus, args.top_k)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print(f"NLI pairs cut {results['pair_reduction']}x, "
+              f"mean skill recall {results['mean_recall']:.2%} (top-{args.top_k})")
+        print(f"Results saved to {args.output}")
+        return
+
+    results = run_benchmark(args.corpus, args.scales, args.repeat, args.stub)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+    print_totals(results)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[ERROR] regressions in: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
-from dataclasses import dataclass
-from typing import Dict, Any, List
+import logging
+from dataclasses import dataclass, fields
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 model_path = Path(__file__).parent.resolve() / \
     "../../training/skill_extractor_zsl_model"
 model_path = model_path.resolve()
-print("Model path:", model_path)
+
+cache_dir = (Path(__file__).parent.resolve() / "../../../.cache").resolve()
+
+# old name -> new name of renamed config fields, for ModelConfig.from_dict
+RENAMED_CONFIG_KEYS = {
+    'zsl_batch_size': 'nli_batch_size',
+}
 
 
 @dataclass
@@ -22,24 +31,122 @@ class ModelConfig:
 
     # processing params
     confidence_threshold: float = 0.85
-    zsl_batch_size: int = 8
+    nli_batch_size: int = 32  # (chunk, skill) pairs per forward pass
     text_chunk_size: int = 400
+    # if set, chunks are filled up to this many skill classifier tokens instead of
+    # text_chunk_size chars; leave room for the hypothesis within the model's 512
+    chunk_token_budget: Optional[int] = None
+
+    # stop NLI scoring a skill once one chunk confirms it; chunks holding its
+    # rule-based matches are scored first. Every skill is still detected or not as
+    # without it, but a confirmed skill's confidence is a lower bound of its exact
+    # maximum (which skill based roles and index queries like "x>0.9" rely on)
+    zsl_early_exit: bool = False
+
+    # optional bi-encoder pre-filter: only the prefilter_top_k chunks most similar to a
+    # skill are NLI scored for it; skill embeddings are cached in skill_embeddings_dir
+    embedding_prefilter: bool = False
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    prefilter_top_k: int = 2
+    skill_embeddings_dir: str = str(cache_dir / "skill_embeddings")
+
+    # compiled skill taxonomies (ids, aliases, category bitsets, match patterns),
+    # None rebuilds them in every process
+    taxonomy_cache_dir: Optional[str] = str(cache_dir / "taxonomy")
+
+    # persistent NLI score cache, None disables it
+    score_cache_path: Optional[str] = str(cache_dir / "nli_scores.sqlite")
+    score_cache_size: int = 200_000
+
+    # persistent whole-resume result cache keyed by PDF content, None disables it;
+    # entries expire after result_cache_ttl seconds (None: never), LRU beyond max_mb
+    result_cache_path: Optional[str] = str(cache_dir / "results.sqlite")
+    result_cache_ttl: Optional[float] = 30 * 24 * 3600
+    result_cache_max_mb: float = 512
+
+    # per-resume intermediates (cleaned text, chunks, rule matches, NLI pair scores)
+    # for script.py --reanalyze after a skill taxonomy change, None disables them
+    artifact_store_path: Optional[str] = None
 
     # device settings
     use_gpu: bool = True
     device: int = 0  # GPU device number
 
+    # inference backend: "torch" (fp32), "torch_int8" (dynamic int8 quantization, CPU)
+    # or "onnx" (ONNX Runtime export from src/training/export_onnx.py, CPU), exports
+    # are read from <model dir>_onnx for local models or .cache/onnx for hub models
+    inference_backend: str = "torch"
+
+    # inference profile, applied by ModelManager to every model it loads: torch
+    # intra-op / inter-op threads of this process (None: torch's default of one per
+    # core, or the calibrated setting in inference_profile_path written by
+    # src/benchmark.py --calibrate-threads), dtype "float32", "bfloat16" (autocast
+    # on CPUs with native bf16, else fp32) or "float16" (GPU only), torch.compile
+    # of the forward pass, and inference_mode (else no_grad) around every forward
+    inference_threads: Optional[int] = None
+    inference_interop_threads: Optional[int] = None
+    inference_dtype: str = "float32"
+    inference_compile: bool = False
+    inference_mode: bool = True
+    inference_profile_path: Optional[str] = str(cache_dir / "inference_profile.json")
+
+    # PDF text extraction: backend "pypdf2", "pypdfium2", "pdfminer" or "auto" (fastest
+    # installed), pages parsed across pdf_page_workers processes for documents of at
+    # least pdf_parallel_min_pages pages, pages slower than pdf_page_timeout seconds skipped
+    pdf_backend: str = "pypdf2"
+    pdf_page_workers: int = 1
+    pdf_parallel_min_pages: int = 20
+    pdf_page_timeout: Optional[float] = 30.0
+
+    # timing spans / counters / histograms from lib.utils.instrumentation
+    metrics_enabled: bool = False
+
+    # role classification: entailment of every candidate role is scored against up to
+    # role_max_chunks evenly spaced chunks of the resume and aggregated per role with
+    # "max", "mean" or "length_weighted"; with role_latency_budget_ms set, fewer chunks
+    # are scored once the cost per pair says the budget would be exceeded. The cost is
+    # the model time per uncached pair, role_pair_cost_ms (on the high side) until the
+    # role model has scored anything
+    role_aggregation: str = "max"
+    role_max_chunks: int = 8
+    role_latency_budget_ms: Optional[float] = None
+    role_pair_cost_ms: float = 50.0
+
+    # role predictor: "nli" (role_classifier_model as above), "skills" (weighted
+    # skill-to-role profiles over the extracted skills, role_classifier_model is never
+    # loaded) or "hybrid" (skills, falling back to NLI below role_fallback_confidence);
+    # role_profiles_path holds profiles learned by src/training/train_role_profiles.py
+    role_predictor: str = "nli"
+    role_profiles_path: Optional[str] = None
+    role_fallback_confidence: float = 0.5
+
+    # pipeline mode: "full" (rule matching verified and extended by the zero-shot
+    # skill model) or "rules" (rule matching, experience regexes and the skills
+    # role predictor only: no model is loaded and spaCy sentence splitting is
+    # replaced by a regex, whatever the settings above say)
+    mode: str = "full"
+
     # candidate roles for classification
     candidate_roles: List[str] = None
 
     def __post_init__(self):
         if self.candidate_roles is None:
             self.candidate_roles = [
+                "Web Developer",
                 "Frontend Developer",
                 "Backend Developer",
+                "Frontend Engineer",
+                "Backend Engineer",
+                "Cloud Developer",
+                "SysAdmin",
+                "System Engineer",
+                "System Administrator",
+                "Cloud R&D Engineer",
                 "Full Stack Developer",
-                "Data Scientist",
+                "Data Science",
                 "Machine Learning Engineer",
+                "AI Engineer",
+                "Artificial Intelligence Engineer",
                 "DevOps Engineer",
                 "Mobile Developer",
                 "UI/UX Designer",
@@ -49,7 +156,16 @@ class ModelConfig:
                 "Software Architect",
                 "Product Manager",
                 "Technical Lead",
-                "Cybersecurity Specialist"
+                "Cybersecurity Specialist",
+                "iOS Developer",
+                "Platform Engineer",
+                "Site Reliability Engineer",
+                "SRE",
+                "Cloud Architect",
+                "MLOps",
+                "Prompt Engineer",
+                "GenAI Engineer",
+                "Web3 Developer"
             ]
 
     @classmethod
@@ -60,7 +176,7 @@ class ModelConfig:
     def get_fast_config(cls) -> 'ModelConfig':
         return cls(
             confidence_threshold=0.6,
-            zsl_batch_size=64,
+            nli_batch_size=64,
             text_chunk_size=300,
             use_gpu=True
         )
@@ -69,7 +185,7 @@ class ModelConfig:
     def get_accurate_config(cls) -> 'ModelConfig':
         return cls(
             confidence_threshold=0.8,
-            zsl_batch_size=16,
+            nli_batch_size=32,
             text_chunk_size=800,
             use_gpu=True
         )
@@ -79,8 +195,19 @@ class ModelConfig:
         return cls(
             use_gpu=False,
             device=-1,
-            zsl_batch_size=10,
-            text_chunk_size=400
+            nli_batch_size=16,
+            text_chunk_size=400,
+            role_predictor="skills"
+        )
+
+    @classmethod
+    def get_rules_config(cls) -> 'ModelConfig':
+        return cls(
+            use_gpu=False,
+            device=-1,
+            pdf_backend="auto",
+            role_predictor="skills",
+            mode="rules"
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -89,13 +216,57 @@ class ModelConfig:
             'role_classifier_model': self.role_classifier_model,
             'skill_classifier_model': self.skill_classifier_model,
             'confidence_threshold': self.confidence_threshold,
-            'zsl_batch_size': self.zsl_batch_size,
+            'nli_batch_size': self.nli_batch_size,
             'text_chunk_size': self.text_chunk_size,
+            'chunk_token_budget': self.chunk_token_budget,
+            'zsl_early_exit': self.zsl_early_exit,
+            'embedding_prefilter': self.embedding_prefilter,
+            'embedding_model': self.embedding_model,
+            'prefilter_top_k': self.prefilter_top_k,
+            'skill_embeddings_dir': self.skill_embeddings_dir,
+            'taxonomy_cache_dir': self.taxonomy_cache_dir,
+            'score_cache_path': self.score_cache_path,
+            'score_cache_size': self.score_cache_size,
+            'result_cache_path': self.result_cache_path,
+            'result_cache_ttl': self.result_cache_ttl,
+            'result_cache_max_mb': self.result_cache_max_mb,
+            'artifact_store_path': self.artifact_store_path,
             'use_gpu': self.use_gpu,
             'device': self.device,
+            'inference_backend': self.inference_backend,
+            'inference_threads': self.inference_threads,
+            'inference_interop_threads': self.inference_interop_threads,
+            'inference_dtype': self.inference_dtype,
+            'inference_compile': self.inference_compile,
+            'inference_mode': self.inference_mode,
+            'inference_profile_path': self.inference_profile_path,
+            'pdf_backend': self.pdf_backend,
+            'pdf_page_workers': self.pdf_page_workers,
+            'pdf_parallel_min_pages': self.pdf_parallel_min_pages,
+            'pdf_page_timeout': self.pdf_page_timeout,
+            'metrics_enabled': self.metrics_enabled,
+            'role_aggregation': self.role_aggregation,
+            'role_max_chunks': self.role_max_chunks,
+            'role_latency_budget_ms': self.role_latency_budget_ms,
+            'role_pair_cost_ms': self.role_pair_cost_ms,
+            'role_predictor': self.role_predictor,
+            'role_profiles_path': self.role_profiles_path,
+            'role_fallback_confidence': self.role_fallback_confidence,
+            'mode': self.mode,
             'candidate_roles': self.candidate_roles
         }
 
     @classmethod
     def from_dict(cls, config_dict: Dict[str, Any]) -> 'ModelConfig':
-        return cls(**config_dict)
+        # configs saved by older versions: renamed keys are mapped, removed ones dropped
+        config_dict = dict(config_dict)
+        for old_key, new_key in RENAMED_CONFIG_KEYS.items():
+            if old_key in config_dict:
+                value = config_dict.pop(old_key)
+                config_dict.setdefault(new_key, value)
+
+        known = {f.name for f in fields(cls)}
+        unknown = [key for key in config_dict if key not in known]
+        if unknown:
+            logger.warning(f"ignoring unknown config keys: {', '.join(unknown)}")
+        return cls(**{key: value for key, value in config_dict.items() if key in known})
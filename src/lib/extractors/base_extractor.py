@@ -4,6 +4,7 @@ Base extractor class for all extractors
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 from ..config.model_config import ModelConfig
+from ..processors.skill_taxonomy import get_skill_taxonomy
 
 
 class BaseExtractor(ABC):
@@ -38,22 +39,11 @@ class BaseExtractor(ABC):
 class SkillExtractorBase(BaseExtractor):
     def __init__(self, config: ModelConfig, skill_categories: Dict[str, List[str]]):
         self.skill_categories = skill_categories
-        self.all_skills = self._flatten_skills(skill_categories)
-        self.skill_to_category = self._create_skill_mapping(skill_categories)
+        # compiled once per taxonomy and process, shared by every extractor
+        self.taxonomy = get_skill_taxonomy(
+            skill_categories, cache_dir=config.taxonomy_cache_dir)
+        self.all_skills: List[str] = self.taxonomy.names
         super().__init__(config)
 
-    def _flatten_skills(self, skill_categories: Dict[str, List[str]]) -> List[str]:
-        all_skills = []
-        for skills in skill_categories.values():
-            all_skills.extend(skills)
-        return all_skills
-
-    def _create_skill_mapping(self, skill_categories: Dict[str, List[str]]) -> Dict[str, str]:
-        mapping = {}
-        for category, skills in skill_categories.items():
-            for skill in skills:
-                mapping[skill] = category
-        return mapping
-
     def categorize_skill(self, skill: str) -> str:
-        return self.skill_to_category.get(skill, 'other')
+        return self.taxonomy.categorize(skill)
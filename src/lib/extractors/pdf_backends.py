@@ -0,0 +1,155 @@
+"""
+Pluggable PDF text backends and a per-page timeout for TextExtractor
+"""
+import signal
+import logging
+import threading
+import importlib.util
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+class PageTimeoutError(TimeoutError):
+    pass
+
+
+class PDFBackend(ABC):
+    """Opens a PDF once and extracts the text of one page at a time"""
+
+    name = ""
+    module = ""  # import name, to check the backend is installed
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def open(self, pdf_path: str) -> Any:
+        pass
+
+    @abstractmethod
+    def page_count(self, document: Any) -> int:
+        pass
+
+    @abstractmethod
+    def page_text(self, document: Any, page_num: int) -> str:
+        pass
+
+    def close(self, document: Any):
+        pass
+
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, pdf_path: str) -> Any:
+        import PyPDF2
+        # reads the whole file into memory, so there's no handle to close
+        return PyPDF2.PdfReader(pdf_path)
+
+    def page_count(self, document: Any) -> int:
+        return len(document.pages)
+
+    def page_text(self, document: Any, page_num: int) -> str:
+        return document.pages[page_num].extract_text()
+
+
+class PdfiumBackend(PDFBackend):
+    """pypdfium2 (PDFium bindings), several times faster than PyPDF2"""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def open(self, pdf_path: str) -> Any:
+        import pypdfium2
+        return pypdfium2.PdfDocument(pdf_path)
+
+    def page_count(self, document: Any) -> int:
+        return len(document)
+
+    def page_text(self, document: Any, page_num: int) -> str:
+        page = document[page_num]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range()
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+    def close(self, document: Any):
+        document.close()
+
+
+class PdfMinerBackend(PDFBackend):
+    """pdfminer.six, slower but the most careful about reading order"""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, pdf_path: str) -> Any:
+        from pdfminer.pdfpage import PDFPage
+        with open(pdf_path, "rb") as f:
+            pages = sum(1 for _ in PDFPage.get_pages(f))
+        return {"path": pdf_path, "pages": pages}
+
+    def page_count(self, document: Any) -> int:
+        return document["pages"]
+
+    def page_text(self, document: Any, page_num: int) -> str:
+        from pdfminer.high_level import extract_text
+        return extract_text(document["path"], page_numbers=[page_num])
+
+
+PDF_BACKENDS: Dict[str, Type[PDFBackend]] = {
+    backend.name: backend for backend in (PyPDF2Backend, PdfiumBackend, PdfMinerBackend)
+}
+
+# "auto" picks the fastest installed backend
+AUTO_BACKEND_ORDER = ("pypdfium2", "pypdf2")
+
+
+def get_pdf_backend(name: str = "pypdf2") -> PDFBackend:
+    if name == "auto":
+        for candidate in AUTO_BACKEND_ORDER:
+            if PDF_BACKENDS[candidate].is_available():
+                return PDF_BACKENDS[candidate]()
+        raise ImportError("no PDF backend installed: pip install pypdfium2 or PyPDF2")
+
+    if name not in PDF_BACKENDS:
+        raise ValueError(
+            f"unknown PDF backend {name}, expected one of {('auto',) + tuple(PDF_BACKENDS)}")
+    backend = PDF_BACKENDS[name]
+    if not backend.is_available():
+        raise ImportError(f"the {name} PDF backend needs: pip install {backend.module}")
+    return backend()
+
+
+@contextmanager
+def page_timeout(seconds: Optional[float]) -> Iterator[None]:
+    """Raise PageTimeoutError if the block runs longer than seconds.
+
+    Uses SIGALRM, so it only applies on the main thread of a POSIX process (the
+    CLI and batch / page workers); elsewhere, e.g. under Streamlit, it's a no-op.
+    Parsers stuck inside a single C call are interrupted once it returns.
+    """
+    if (not seconds or not hasattr(signal, "SIGALRM")
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def _raise_timeout(signum, frame):
+        raise PageTimeoutError(f"page took longer than {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
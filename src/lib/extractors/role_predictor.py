@@ -0,0 +1,154 @@
+"""
+Role prediction from already-extracted skills, without a role NLI model
+"""
+import json
+import math
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# role -> {"bias": b, "weights": {feature: w}}, features as in skill_features:
+# "category:<name>" is the category's share of all extracted skills,
+# "skill:<name>" the confidence of one extracted skill
+DEFAULT_ROLE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "Frontend Developer": {"bias": 0.0, "weights": {
+        "category:frontend": 8.0, "category:tools": 0.5,
+        "skill:react": 1.0, "skill:angular": 1.0, "skill:vue": 1.0, "skill:typescript": 0.5}},
+    "Backend Developer": {"bias": 0.0, "weights": {
+        "category:backend": 6.0, "category:database": 3.0, "category:message_queue_and_streaming": 2.0,
+        "skill:django": 0.5, "skill:spring boot": 0.5, "skill:node.js": 0.5, "skill:grpc": 0.5}},
+    "Full Stack Developer": {"bias": -1.0, "weights": {
+        "category:frontend": 5.0, "category:backend": 5.0, "category:database": 1.5}},
+    "Data Science": {"bias": 0.0, "weights": {
+        "category:data_science": 7.0, "category:analytics_bi": 2.0, "category:ai_ml": 2.0}},
+    "Machine Learning Engineer": {"bias": 0.0, "weights": {
+        "category:ai_ml": 7.0, "category:data_science": 2.0, "category:cloud_devops": 0.5,
+        "skill:pytorch": 1.0, "skill:tensorflow": 1.0}},
+    "Data Engineer": {"bias": 0.0, "weights": {
+        "category:data_engineering": 7.0, "category:database": 2.0,
+        "category:message_queue_and_streaming": 2.0, "skill:airflow": 1.0, "skill:apache spark": 1.0}},
+    "DevOps Engineer": {"bias": 0.0, "weights": {
+        "category:cloud_devops": 7.0, "category:operating_systems": 1.5,
+        "skill:kubernetes": 1.0, "skill:terraform": 1.0, "skill:jenkins": 0.5}},
+    "Site Reliability Engineer": {"bias": -0.5, "weights": {
+        "category:cloud_devops": 5.0, "category:operating_systems": 2.0, "category:backend": 1.0,
+        "skill:prometheus": 1.0, "skill:grafana": 1.0, "skill:opentelemetry": 1.0}},
+    "System Administrator": {"bias": 0.0, "weights": {
+        "category:operating_systems": 7.0, "category:security": 1.0, "category:cloud_devops": 1.0}},
+    "Mobile Developer": {"bias": 0.0, "weights": {
+        "category:mobile": 9.0, "skill:kotlin": 0.5, "skill:swift": 0.5, "skill:flutter": 0.5}},
+    "Cybersecurity Specialist": {"bias": 0.0, "weights": {
+        "category:security": 9.0, "category:operating_systems": 1.0}},
+    "Web3 Developer": {"bias": 0.0, "weights": {
+        "category:web3": 10.0, "category:backend": 0.5}},
+    "Software Engineer": {"bias": 0.5, "weights": {
+        "category:programming_languages": 4.0, "category:testing": 2.0, "category:tools": 1.0,
+        "category:embedded_systems": 2.0, "category:computer_graphics": 2.0, "category:game_dev": 2.0}},
+}
+
+
+def skill_features(skills: Dict[str, Any]) -> Dict[str, float]:
+    """Features of a hybrid extraction result (skills of a process_resume result),
+    expanded or compact"""
+    summary = skills.get("skill_summary", {})
+    total = summary.get("total_skills") or 0
+
+    features = {}
+    for category, category_skills in skills.get("categorized_skills", {}).items():
+        if total and category_skills:
+            features[f"category:{category}"] = len(category_skills) / total
+        for skill_info in category_skills:
+            # compact results keep skill names only
+            if isinstance(skill_info, dict):
+                features[f"skill:{skill_info['skill']}"] = float(skill_info.get("confidence", 1.0))
+            else:
+                features[f"skill:{skill_info}"] = 1.0
+    return features
+
+
+class SkillRolePredictor:
+    """Linear skill-to-role profiles scored with a softmax over roles. A dict
+    lookup per extracted skill, so no model is loaded and no inference is run."""
+
+    def __init__(self, profiles: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.profiles = profiles or DEFAULT_ROLE_PROFILES
+        self.roles = list(self.profiles)
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> 'SkillRolePredictor':
+        if path is None:
+            return cls()
+        return cls(load_role_profiles(path))
+
+    def scores(self, skills: Dict[str, Any]) -> Dict[str, float]:
+        features = skill_features(skills)
+        logits = {
+            role: profile.get("bias", 0.0) + sum(
+                weight * features[feature]
+                for feature, weight in profile["weights"].items() if feature in features)
+            for role, profile in self.profiles.items()
+        }
+        top = max(logits.values())
+        exps = {role: math.exp(logit - top) for role, logit in logits.items()}
+        total = sum(exps.values())
+        return {role: value / total for role, value in exps.items()}
+
+    def predict(self, skills: Dict[str, Any]) -> Dict[str, Any]:
+        """same shape as ResumeSkillExtractor.classify_role"""
+        ranked = sorted(self.scores(skills).items(),
+                        key=lambda x: x[1], reverse=True)
+        return {
+            "predicted_role": ranked[0][0],
+            "confidence": ranked[0][1],
+            "top_3_roles": {
+                role: score
+                for role, score in ranked[:3]
+            },
+            "method": "skills",
+        }
+
+
+def fit_role_profiles(skill_results: List[Dict[str, Any]], roles: List[str],
+                      regularization: float = 1.0) -> Dict[str, Dict[str, Any]]:
+    """Learn profiles from labeled resumes (their skills results and true roles)
+    with a multinomial logistic regression on skill_features"""
+    from sklearn.feature_extraction import DictVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = DictVectorizer()
+    features = vectorizer.fit_transform([skill_features(skills) for skills in skill_results])
+    model = LogisticRegression(C=regularization, max_iter=1000)
+    model.fit(features, roles)
+
+    names = vectorizer.get_feature_names_out()
+    classes = list(model.classes_)
+    if len(classes) == 2:
+        # binary problems get one coefficient row, for the second class
+        coefficients = [-model.coef_[0] / 2, model.coef_[0] / 2]
+        intercepts = [-model.intercept_[0] / 2, model.intercept_[0] / 2]
+    else:
+        coefficients, intercepts = model.coef_, model.intercept_
+
+    return {
+        role: {
+            "bias": float(intercept),
+            "weights": {name: float(weight)
+                        for name, weight in zip(names, row) if weight != 0.0},
+        }
+        for role, row, intercept in zip(classes, coefficients, intercepts)
+    }
+
+
+def save_role_profiles(path: str, profiles: Dict[str, Dict[str, Any]]):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2, ensure_ascii=False)
+    logger.info(f"Saved role profiles for {len(profiles)} roles to {path}")
+
+
+def load_role_profiles(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,56 +1,74 @@
-import re
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
 from lib.extractors.base_extractor import SkillExtractorBase
 from lib.config.model_config import ModelConfig
 from lib.processors.text_processor import TextProcessor
+from lib.processors.skill_matcher import SkillMatchStream, get_skill_matcher
+from lib.processors.resume_document import ResumeDocument
 from lib.utils.model_utils import get_model_manager
+from lib.utils.score_cache import get_score_cache
+from lib.utils.inference_profile import InferenceProfile
+from lib.utils.artifact_store import PairScores
+from lib.utils.instrumentation import get_metrics
 from lib.config.skill_categories import SkillCategories
 
 logger = logging.getLogger(__name__)
 
+# early exit only confirms a skill above this too, so hybrid merging (rule-based
+# confidence 0.80, zero-shot-only skills above 0.85) decides as on the full scores
+EARLY_EXIT_MIN_CONFIDENCE = 0.85
+
 
 class RuleBasedSkillExtractor(SkillExtractorBase):
     def __init__(self, config: ModelConfig, skill_categories: Dict[str, List[str]]):
         super().__init__(config, skill_categories)
         self.text_processor = TextProcessor(config.spacy_model)
+        self.skill_matcher = get_skill_matcher(self.taxonomy)
 
     def extract(self, text: str, **kwargs) -> List[Dict[str, Any]]:
         self.validate_input(text)
 
-        text_lower = text.lower()
-        found_skills = []
-        seen_skills = set()
+        with get_metrics().span("rule_matching"):
+            matches = self.skill_matcher.find_ids(text)
 
-        for skill in self.all_skills:
-            skill_patterns = self.text_processor.create_skill_patterns(skill)
-            total_matches = []
-            all_positions = []
+        return self.skills_from_matches(text, matches)
 
-            for pattern in skill_patterns:
-                matches = list(re.finditer(pattern, text_lower))
-                if matches:
-                    total_matches.extend(matches)
-                    all_positions.extend([match.span() for match in matches])
+    def match_stream(self) -> SkillMatchStream:
+        """matching for a text that is fed piece by piece, see extract_stream"""
+        return self.skill_matcher.stream()
 
-            if total_matches and skill not in seen_skills:
-                context = self.text_processor.extract_context_around_match(
-                    text, total_matches[0].start(), total_matches[0].end(), context_size=50
-                )
+    def extract_stream(self, text: str, stream: SkillMatchStream) -> List[Dict[str, Any]]:
+        """extract for a text whose (cleaned) pieces were all fed to stream"""
+        self.validate_input(text)
 
-                found_skills.append({
-                    'skill': skill,
-                    'confidence': 0.80,
-                    'category': self.categorize_skill(skill),
-                    'method': 'rule_based',
-                    'context': context,
-                    'matches': len(total_matches),
-                    'positions': all_positions
-                })
-                seen_skills.add(skill)
+        with get_metrics().span("rule_matching"):
+            matches = stream.finish()
+
+        return self.skills_from_matches(text, matches)
+
+    def skills_from_matches(self, text: str, matches: Dict[int, List[Tuple[int, int]]]) -> List[Dict[str, Any]]:
+        """rule-based results of a match table (skill id -> spans in text order)"""
+        found_skills = []
 
+        # one scan of the text for the whole taxonomy
+        for skill_id, positions in matches.items():
+            context = self.text_processor.extract_context_around_match(
+                text, positions[0][0], positions[0][1], context_size=50
+            )
+
+            found_skills.append({
+                'skill': self.taxonomy.names[skill_id],
+                'confidence': 0.80,
+                'category': self.taxonomy.category_of(skill_id),
+                'method': 'rule_based',
+                'context': context,
+                'matches': len(positions),
+                'positions': positions
+            })
+
+        get_metrics().incr("rule_based_skills", len(found_skills))
         logger.info(f"Rule-based extraction found {len(found_skills)} skills")
         # print("\n----------- skills found rule-based: \n")
         # for skill in found_skills:
@@ -64,20 +82,66 @@ class ZeroShotSkillExtractor(SkillExtractorBase):
     def __init__(self, config: ModelConfig, skill_categories: Dict[str, List[str]]):
         super().__init__(config, skill_categories)
         self.text_processor = TextProcessor(config.spacy_model)
+        self.skill_matcher = get_skill_matcher(self.taxonomy)
         self.model_manager = get_model_manager()
-        self.classifier = None
+        self.scorer = None
+        self.prefilter = None
 
     def setup(self):
-        self.classifier = self.model_manager.load_zero_shot_classifier(
+        self.scorer = self.model_manager.load_nli_scorer(
             self.config.skill_classifier_model,
             use_gpu=self.config.use_gpu,
-            cache_key="skill_classifier"
+            batch_size=self.config.nli_batch_size,
+            backend=self.config.inference_backend,
+            score_cache=get_score_cache(
+                self.config.score_cache_path, self.config.score_cache_size),
+            profile=InferenceProfile.from_config(self.config)
         )
-
-    def extract(self, text: str, candidate_skills: List[str] = None, **kwargs) -> List[Dict[str, Any]]:
+        if self.config.embedding_prefilter and self.prefilter is None:
+            from lib.utils.embedding_prefilter import SkillEmbeddingIndex
+            encoder = self.model_manager.load_embedding_encoder(
+                self.config.embedding_model, use_gpu=self.config.use_gpu)
+            self.prefilter = SkillEmbeddingIndex(
+                encoder, self.skill_categories, self.config.skill_embeddings_dir)
+
+    def release(self):
+        """give the shared skill classifier (and bi-encoder) back to the model manager"""
+        if self.scorer is not None:
+            self.model_manager.release_model(
+                self.config.skill_classifier_model, use_gpu=self.config.use_gpu,
+                dtype=self.config.inference_dtype, backend=self.config.inference_backend)
+            self.scorer = None
+        if self.prefilter is not None:
+            self.model_manager.release_model(
+                self.config.embedding_model, use_gpu=self.config.use_gpu)
+            self.prefilter = None
+
+    def extract(self, text: str, candidate_skills: List[str] = None,
+                document: ResumeDocument = None, skill_positions: Dict[str, List] = None,
+                stats: Dict[str, int] = None, pair_scores: Optional[PairScores] = None,
+                **kwargs) -> List[Dict[str, Any]]:
+        """Verify candidate skills chunk by chunk with the NLI model.
+
+        skill_positions (rule-based match offsets per skill) decide which chunks
+        are scored first when zsl_early_exit is on; stats, if given, receives
+        the number of pairs scored, skipped by early exit and failed (a chunk the
+        model raised on). pair_scores, if given, holds the
+        (chunk index, skill) scores already known for this document: only the
+        missing pairs reach the model, and their scores are added to it.
+        """
+        with get_metrics().span("zero_shot_extraction"):
+            return self._extract(text, candidate_skills, document, skill_positions or {},
+                                 stats if stats is not None else {}, pair_scores)
+
+    def _extract(self, text: str, candidate_skills: List[str], document: ResumeDocument,
+                 skill_positions: Dict[str, List], stats: Dict[str, int],
+                 pair_scores: Optional[PairScores]) -> List[Dict[str, Any]]:
         self.validate_input(text)
+        metrics = get_metrics()
 
-        if self.classifier is None:
+        # with stored pair scores the classifier is loaded only for missing pairs,
+        # unless the pre-filter (which needs the bi-encoder) picks the pairs
+        if self.scorer is None and (pair_scores is None or self.config.embedding_prefilter):
             self.setup()
 
         # use given candidates or filter from all skills
@@ -89,45 +153,48 @@ class ZeroShotSkillExtractor(SkillExtractorBase):
             return []
 
         logger.info(f"ZSL processing {len(candidate_skills)} candidate skills")
-
-        # split text into chunks for better processing
-        chunks = self.text_processor.create_chunks(
-            text, self.config.text_chunk_size)
+        metrics.incr("candidate_skills", len(candidate_skills))
+        metrics.observe("candidate_skills_per_resume", len(candidate_skills))
+
+        # split text into chunks for better processing, reusing the document's if it has them
+        if document is None:
+            if self.scorer is None:
+                self.setup()
+            document = self.text_processor.create_document(
+                text, self.config.text_chunk_size,
+                tokenizer=self.scorer.tokenizer,
+                token_budget=self.config.chunk_token_budget)
+        chunks = document.chunks
         detected_skills = []
 
-        # process in batches to avoid overwhelming the model
-        batch_size = self.config.zsl_batch_size
-
-        for i in range(0, len(candidate_skills), batch_size):
-            batch_skills = candidate_skills[i:i + batch_size]
-
-            for chunk_idx, chunk in enumerate(chunks):
-                # skip very short chunks
-                if len(chunk.split()) < 10:
-                    continue
-                # all_skills = SkillCategories.get_all_skills_flat(
-                #     SkillCategories.get_default_skills())
-
-                try:
-                    result = self.classifier(
-                        chunk, batch_skills, multi_label=True)
-
-                    if isinstance(result['scores'], list):
-                        for skill, score in zip(result['labels'], result['scores']):
-                            if score > self.config.confidence_threshold:
-                                detected_skills.append({
-                                    'skill': skill,
-                                    'confidence': score,
-                                    'category': self.categorize_skill(skill),
-                                    'chunk_index': chunk_idx,
-                                    'context': chunk[:100] + "..." if len(chunk) > 100 else chunk,
-                                    'method': 'zero_shot'
-                                })
-
-                except Exception as e:
-                    logger.warning(f"error processing chunk {
-                                   chunk_idx} with batch {i}: {e}")
-                    continue
+        pairs = self._build_pairs(chunks, candidate_skills)
+
+        if self.config.zsl_early_exit:
+            attempted_pairs = self._score_with_early_exit(
+                chunks, pairs, document.chunk_spans, skill_positions, pair_scores)
+        else:
+            attempted_pairs = list(zip(pairs, self._score_pairs(chunks, pairs, pair_scores)))
+        # a score of None: the model failed on that pair's chunk
+        scored_pairs = [(pair, score) for pair, score in attempted_pairs if score is not None]
+
+        stats['pairs_scored'] = len(scored_pairs)
+        stats['pairs_failed'] = len(attempted_pairs) - len(scored_pairs)
+        stats['pairs_skipped'] = len(pairs) - len(attempted_pairs)
+        metrics.observe("nli_pairs_per_resume", len(scored_pairs))
+        metrics.incr("nli_pairs_failed", stats['pairs_failed'])
+        metrics.incr("early_exit_pairs_skipped", stats['pairs_skipped'])
+
+        for (chunk_idx, skill), score in scored_pairs:
+            if score > self.config.confidence_threshold:
+                chunk = chunks[chunk_idx]
+                detected_skills.append({
+                    'skill': skill,
+                    'confidence': score,
+                    'category': self.categorize_skill(skill),
+                    'chunk_index': chunk_idx,
+                    'context': chunk[:100] + "..." if len(chunk) > 100 else chunk,
+                    'method': 'zero_shot'
+                })
 
         # remove duplicates and keep highest confidence
         unique_skills = {}
@@ -149,19 +216,112 @@ class ZeroShotSkillExtractor(SkillExtractorBase):
 
         return sorted(final_skills, key=lambda x: x['confidence'], reverse=True)
 
-    def _get_candidate_skills_from_text(self, text: str) -> List[str]:
-        text_lower = text.lower()
-        candidates = []
-
-        for skill in self.all_skills:
-            skill_patterns = self.text_processor.create_skill_patterns(skill)
-
-            for pattern in skill_patterns:
-                if re.search(pattern, text_lower):
-                    candidates.append(skill)
-                    break
+    def _score_pairs(self, chunks: List[str], pairs: List[tuple],
+                     pair_scores: Optional[PairScores] = None) -> List[Optional[float]]:
+        if pair_scores is None:
+            return self._score_with_model(chunks, pairs)
+
+        missing = [pair for pair in pairs if pair not in pair_scores]
+        get_metrics().incr("stored_pair_scores_reused", len(pairs) - len(missing))
+        if missing:
+            # failed pairs aren't stored, a later reanalysis scores them again
+            pair_scores.update((pair, score) for pair, score in
+                               zip(missing, self._score_with_model(chunks, missing))
+                               if score is not None)
+        return [pair_scores.get(pair) for pair in pairs]
+
+    def _score_with_model(self, chunks: List[str], pairs: List[tuple]) -> List[Optional[float]]:
+        """scores of pairs, None for the pairs of a chunk the model failed on"""
+        # loaded on first use, a reanalysis from stored scores may never need it
+        if self.scorer is None:
+            self.setup()
+        try:
+            return self.scorer.score(
+                [chunks[chunk_idx] for chunk_idx, _ in pairs],
+                [skill for _, skill in pairs]
+            )
+        except Exception as e:
+            logger.warning(f"error scoring {len(pairs)} chunk/skill pairs, retrying chunk by chunk: {e}")
+
+        # one bad chunk only costs its own pairs, as when chunks were scored one by one
+        chunk_pairs = defaultdict(list)
+        for i, (chunk_idx, _) in enumerate(pairs):
+            chunk_pairs[chunk_idx].append(i)
+        scores: List[Optional[float]] = [None] * len(pairs)
+        for chunk_idx, indices in chunk_pairs.items():
+            try:
+                chunk_scores = self.scorer.score(
+                    [chunks[chunk_idx]] * len(indices), [pairs[i][1] for i in indices])
+            except Exception as e:
+                logger.warning(f"error processing chunk {chunk_idx}: {e}")
+                get_metrics().incr("nli_errors")
+                continue
+            for i, score in zip(indices, chunk_scores):
+                scores[i] = score
+        return scores
+
+    def _score_with_early_exit(self, chunks: List[str], pairs: List[tuple],
+                               chunk_spans: List[tuple], skill_positions: Dict[str, List],
+                               pair_scores: Optional[PairScores] = None) -> List[tuple]:
+        """Score each skill's chunks in rounds of 1, 2, 4, ... chunks per skill, one
+        batched call per round, dropping a skill as soon as a chunk confirms it.
+
+        A skill that is never confirmed gets all its chunks scored, so every
+        threshold decision is the same as scoring all pairs; only the confidence
+        of a confirmed skill can be below its exhaustive maximum.
+        """
+        confirm_above = max(self.config.confidence_threshold, EARLY_EXIT_MIN_CONFIDENCE)
+
+        skill_chunks = defaultdict(list)
+        for chunk_idx, skill in pairs:
+            skill_chunks[skill].append(chunk_idx)
+
+        # chunks holding a rule-based match of the skill go first (stable sort)
+        if chunk_spans:
+            for skill, chunk_indices in skill_chunks.items():
+                starts = [start for start, _ in skill_positions.get(skill, ())]
+                if starts:
+                    chunk_indices.sort(key=lambda i: not any(
+                        chunk_spans[i][0] <= start < chunk_spans[i][1] for start in starts))
+
+        scored_pairs = []
+        offset, round_size = 0, 1
+        while skill_chunks:
+            round_pairs = [
+                (chunk_idx, skill)
+                for skill, chunk_indices in skill_chunks.items()
+                for chunk_idx in chunk_indices[offset:offset + round_size]
+            ]
+            scores = self._score_pairs(chunks, round_pairs, pair_scores)
+            scored_pairs.extend(zip(round_pairs, scores))
+
+            confirmed = {skill for (_, skill), score in zip(round_pairs, scores)
+                         if score is not None and score > confirm_above}
+            offset += round_size
+            round_size *= 2
+            skill_chunks = {
+                skill: chunk_indices for skill, chunk_indices in skill_chunks.items()
+                if skill not in confirmed and len(chunk_indices) > offset
+            }
+
+        return scored_pairs
+
+    def _build_pairs(self, chunks: List[str], candidate_skills: List[str]) -> List[tuple]:
+        # very short chunks are skipped
+        chunk_indices = [i for i, chunk in enumerate(chunks) if len(chunk.split()) >= 10]
+
+        if self.prefilter is None:
+            return [(i, skill) for i in chunk_indices for skill in candidate_skills]
+
+        with get_metrics().span("embedding_prefilter"):
+            pairs = self.prefilter.select_pairs(
+                chunks, chunk_indices, candidate_skills, self.config.prefilter_top_k)
+        get_metrics().incr("prefilter_pairs_skipped",
+                           len(chunk_indices) * len(candidate_skills) - len(pairs))
+        return pairs
 
-        return candidates
+    def _get_candidate_skills_from_text(self, text: str) -> List[str]:
+        return self.skill_matcher.find_skills(text)
 
 
 class HybridSkillExtractor(SkillExtractorBase):
@@ -172,26 +332,62 @@ class HybridSkillExtractor(SkillExtractorBase):
             config, skill_categories)
         self.zsl_extractor = ZeroShotSkillExtractor(config, skill_categories)
 
-    def extract(self, text: str, **kwargs) -> Dict[str, Any]:
+    def extract(self, text: str, rule_based_skills: List[Dict] = None,
+                document: ResumeDocument = None, pair_scores: Optional[PairScores] = None,
+                **kwargs) -> Dict[str, Any]:
         self.validate_input(text)
 
         logger.info("Starting hybrid skill extraction")
 
-        # rule-based extraction
-        rule_based_skills = self.rule_based_extractor.extract(text)
+        with get_metrics().span("hybrid_extraction"):
+            # rule-based extraction, unless already done (e.g. by a batch worker)
+            if rule_based_skills is None:
+                rule_based_skills = self.rule_based_extractor.extract(text)
 
-        # get candidate skills for ZSL verification
-        candidate_skills = [skill['skill'] for skill in rule_based_skills]
+            # get candidate skills for ZSL verification
+            candidate_skills = [skill['skill'] for skill in rule_based_skills]
+            skill_positions = {skill['skill']: skill.get('positions', [])
+                               for skill in rule_based_skills}
+
+            # ZSL verification and additional detection
+            zsl_stats = {}
+            zsl_skills = self.zsl_extractor.extract(
+                text, candidate_skills, document=document,
+                skill_positions=skill_positions, stats=zsl_stats, pair_scores=pair_scores)
+
+            # combine results
+            combined_results = self._combine_results(rule_based_skills, zsl_skills)
+            combined_results['extraction_stats'].update(
+                zsl_pairs_scored=zsl_stats.get('pairs_scored', 0),
+                zsl_pairs_skipped=zsl_stats.get('pairs_skipped', 0))
+
+        return combined_results
+
+    def extract_rules_only(self, text: str, rule_based_skills: List[Dict] = None) -> Dict[str, Any]:
+        """same result shape as extract, from rule matching alone (mode="rules")"""
+        self.validate_input(text)
 
-        # ZSL verification and additional detection
-        zsl_skills = self.zsl_extractor.extract(text, candidate_skills)
+        with get_metrics().span("rules_only_extraction"):
+            if rule_based_skills is None:
+                rule_based_skills = self.rule_based_extractor.extract(text)
 
-        # combine results
-        combined_results = self._combine_results(rule_based_skills, zsl_skills)
+            combined_results = self._combine_results(rule_based_skills, [])
+            combined_results['extraction_stats'].update(
+                hybrid_method=False,
+                method='rule_based',
+                zsl_pairs_scored=0,
+                zsl_pairs_skipped=0)
 
         return combined_results
 
+    def release(self):
+        self.zsl_extractor.release()
+
     def _combine_results(self, rule_based_skills: List[Dict], zsl_skills: List[Dict]) -> Dict[str, Any]:
+        with get_metrics().span("combine_results"):
+            return self._combine(rule_based_skills, zsl_skills)
+
+    def _combine(self, rule_based_skills: List[Dict], zsl_skills: List[Dict]) -> Dict[str, Any]:
         all_skills = {}
         detailed_skills = []
 
@@ -267,6 +463,23 @@ class HybridSkillExtractor(SkillExtractorBase):
             'text_length': len(text)
         }
 
+        # spans and counters of this call only, even with metrics disabled
+        with get_metrics().capture() as captured:
+            self._debug_stages(text, debug_info)
+
+        debug_info['timings'] = {
+            'spans': captured['spans'],
+            'total_ms': {},
+            'counters': captured['counters']
+        }
+        for span in captured['spans']:
+            totals = debug_info['timings']['total_ms']
+            totals[span['name']] = round(
+                totals.get(span['name'], 0.0) + span['duration_ms'], 3)
+
+        return debug_info
+
+    def _debug_stages(self, text: str, debug_info: Dict[str, Any]):
         # 1: rule based extraction
         rule_based_skills = self.rule_based_extractor.extract(text)
         debug_info['rule_based'] = {
@@ -277,9 +490,14 @@ class HybridSkillExtractor(SkillExtractorBase):
 
         # 2: ZSL extraction
         candidate_skills = [skill['skill'] for skill in rule_based_skills]
-        zsl_skills = self.zsl_extractor.extract(text, candidate_skills)
+        skill_positions = {skill['skill']: skill['positions'] for skill in rule_based_skills}
+        zsl_stats = {}
+        zsl_skills = self.zsl_extractor.extract(
+            text, candidate_skills, skill_positions=skill_positions, stats=zsl_stats)
         debug_info['zero_shot'] = {
             'candidates_processed': len(candidate_skills),
+            'pairs_scored': zsl_stats.get('pairs_scored', 0),
+            'pairs_skipped': zsl_stats.get('pairs_skipped', 0),
             'count': len(zsl_skills),
             'skills': [s['skill'] for s in zsl_skills],
             'details': zsl_skills[:5]  # First 5 for preview
@@ -292,5 +510,3 @@ class HybridSkillExtractor(SkillExtractorBase):
             'final_skills': combined['skill_names'],
             'by_category': {cat: len(skills) for cat, skills in combined['categorized_skills'].items()}
         }
-
-        return debug_info
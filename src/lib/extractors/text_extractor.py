@@ -1,14 +1,46 @@
+import os
 import logging
-import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional, Tuple
 from lib.config.model_config import ModelConfig
+from lib.utils.instrumentation import get_metrics
 from .base_extractor import BaseExtractor
+from .pdf_backends import get_pdf_backend, page_timeout
 
 logger = logging.getLogger(__name__)
 
 
+# per-process open document of page workers, see TextExtractor._iter_pages_parallel
+_page_worker_state = {}
+
+
+def _extract_page(backend_name: str, pdf_path: str, page_num: int,
+                  timeout: Optional[float]) -> Tuple[Optional[str], Optional[str]]:
+    """(page text, error) of one page, run in a page worker process"""
+    # a file rewritten in place between calls must be reopened
+    file_key = (pdf_path, os.path.getmtime(pdf_path))
+    if _page_worker_state.get("file_key") != file_key:
+        backend = get_pdf_backend(backend_name)
+        if "document" in _page_worker_state:
+            _page_worker_state["backend"].close(_page_worker_state["document"])
+        _page_worker_state.update(
+            file_key=file_key, backend=backend, document=backend.open(pdf_path))
+
+    try:
+        with page_timeout(timeout):
+            return _page_worker_state["backend"].page_text(
+                _page_worker_state["document"], page_num), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
 class TextExtractor(BaseExtractor):
-    def __init__(self, config: ModelConfig = None):
+    def __init__(self, config: ModelConfig = None, page_workers: Optional[int] = None):
         super().__init__(config or ModelConfig.get_default_config())
+        self.backend = get_pdf_backend(self.config.pdf_backend)
+        # batch workers pass page_workers=1, they are already one process per file
+        self.page_workers = page_workers or self.config.pdf_page_workers
+        self._page_pool = None
 
     def extract(self, file_path: str) -> str:
         self.validate_input(file_path)
@@ -17,19 +49,18 @@ class TextExtractor(BaseExtractor):
 
         return self.extract_from_pdf(file_path)
 
-    def extract_from_pdf(self, pdf_path: str) -> str:
-        try:
-            with open(pdf_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        text += page_text+"\n"
-                    except Exception as e:
-                        logger.warning(f"error extracting text from page  {
-                                       page_num}: {e}")
-                        continue
+    def extract_from_pdf(self, pdf_path: str, on_page: Optional[Callable[[str], None]] = None) -> str:
+        """Text of a PDF, one line break after every page. on_page, if given, gets
+        each page's text (line break included) as soon as it's parsed, while the
+        next pages are still being parsed."""
+        with get_metrics().span("pdf_extraction", backend=self.backend.name):
+            try:
+                pages = []
+                for page_text in self.iter_pages(pdf_path):
+                    pages.append(page_text + "\n")
+                    if on_page is not None:
+                        on_page(pages[-1])
+                text = "".join(pages)
 
                 if not text.strip():
                     raise ValueError("no text could be extracted from PDF")
@@ -38,8 +69,61 @@ class TextExtractor(BaseExtractor):
                             len(text)} characters from PDF")
                 return text
 
-        except FileNotFoundError:
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-        except Exception as e:
-            logger.error(f"krror extracting text from PDF {pdf_path}: {e}")
-            raise
+            except FileNotFoundError:
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            except Exception as e:
+                logger.error(f"error extracting text from PDF {pdf_path}: {e}")
+                raise
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """Page texts in page order, each yielded as soon as it's parsed so callers
+        can start on page 1. Pages that fail or exceed pdf_page_timeout are skipped.
+        Large documents are parsed across a pool of page workers."""
+        document = self.backend.open(pdf_path)
+        try:
+            page_count = self.backend.page_count(document)
+            if self.page_workers > 1 and page_count >= self.config.pdf_parallel_min_pages:
+                results = self._iter_pages_parallel(pdf_path, page_count)
+            else:
+                results = self._iter_pages_sequential(document, page_count)
+
+            metrics = get_metrics()
+            for page_num, (page_text, error) in enumerate(results):
+                if error is not None:
+                    logger.warning(f"error extracting text from page {page_num}: {error}")
+                    metrics.incr("page_errors")
+                    continue
+                metrics.incr("pages_parsed")
+                yield page_text
+        finally:
+            self.backend.close(document)
+
+    def _iter_pages_sequential(self, document, page_count: int) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        for page_num in range(page_count):
+            # the timer must not run while the caller works on the yielded page
+            try:
+                with page_timeout(self.config.pdf_page_timeout):
+                    result = self.backend.page_text(document, page_num), None
+            except Exception as e:
+                result = None, f"{type(e).__name__}: {e}"
+            yield result
+
+    def _iter_pages_parallel(self, pdf_path: str, page_count: int) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        if self._page_pool is None:
+            self._page_pool = ProcessPoolExecutor(max_workers=self.page_workers)
+
+        # map keeps page order; each worker opens the file once and times out its own pages
+        chunksize = max(page_count // (self.page_workers * 4), 1)
+        return self._page_pool.map(
+            _extract_page,
+            [self.backend.name] * page_count,
+            [pdf_path] * page_count,
+            range(page_count),
+            [self.config.pdf_page_timeout] * page_count,
+            chunksize=chunksize
+        )
+
+    def close(self):
+        if self._page_pool is not None:
+            self._page_pool.shutdown(cancel_futures=True)
+            self._page_pool = None
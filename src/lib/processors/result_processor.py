@@ -0,0 +1,199 @@
+"""
+Result sinks for writing resume analysis results, and a lazy reader for them
+"""
+import gzip
+import io
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def _compression_from_path(path: str) -> Optional[str]:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _open_binary(path: str, mode: str, compression: Optional[str]):
+    if compression is None:
+        return open(path, mode + "b")
+    if compression == "gzip":
+        return gzip.open(path, mode + "b")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "zstd compression needs the zstandard package: pip install zstandard")
+        if mode == "r":
+            return zstandard.ZstdDecompressor().stream_reader(
+                open(path, "rb"), read_across_frames=True, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(open(path, mode + "b"), closefd=True)
+    raise ValueError(f"unknown compression {compression}, expected one of {COMPRESSIONS}")
+
+
+def compact_result(result: Dict[str, Any], keep_positions: bool = False) -> Dict[str, Any]:
+    """Smaller copy of a process_resume result.
+
+    Drops the rule-based match positions (unless keep_positions), stores every
+    distinct context string once in a "contexts" table that skills point into,
+    and keeps only skill names in categorized_skills / skill names list.
+    """
+    skills = result.get("skills")
+    if not skills or "detailed_skills" not in skills:
+        return result
+
+    contexts = {}
+    detailed_skills = []
+    for skill_info in skills["detailed_skills"]:
+        skill_info = dict(skill_info)
+        if not keep_positions:
+            skill_info.pop("positions", None)
+        if "context" in skill_info:
+            skill_info["context"] = contexts.setdefault(
+                skill_info["context"], len(contexts))
+        detailed_skills.append(skill_info)
+
+    compact_skills = {
+        key: value for key, value in skills.items()
+        if key not in ("detailed_skills", "categorized_skills", "skill_names")
+    }
+    compact_skills["detailed_skills"] = detailed_skills
+    compact_skills["categorized_skills"] = {
+        category: [s["skill"] for s in category_skills]
+        for category, category_skills in skills.get("categorized_skills", {}).items()
+    }
+
+    compact = dict(result)
+    compact["skills"] = compact_skills
+    compact["contexts"] = list(contexts)
+    compact["compact"] = True
+    return compact
+
+
+def expand_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """undo compact_result as far as possible (dropped positions stay dropped)"""
+    if not result.get("compact"):
+        return result
+
+    contexts = result["contexts"]
+    skills = dict(result["skills"])
+
+    detailed_skills = []
+    by_name = {}
+    for skill_info in skills["detailed_skills"]:
+        skill_info = dict(skill_info)
+        if isinstance(skill_info.get("context"), int):
+            skill_info["context"] = contexts[skill_info["context"]]
+        detailed_skills.append(skill_info)
+        by_name[skill_info["skill"]] = skill_info
+
+    skills["detailed_skills"] = detailed_skills
+    skills["categorized_skills"] = {
+        category: [by_name[name] for name in names if name in by_name]
+        for category, names in skills["categorized_skills"].items()
+    }
+    skills["skill_names"] = list(by_name)
+
+    expanded = {key: value for key, value in result.items()
+                if key not in ("contexts", "compact")}
+    expanded["skills"] = skills
+    return expanded
+
+
+class ResultSink(ABC):
+    """Destination for process_resume results"""
+
+    @abstractmethod
+    def write(self, result: Dict[str, Any]):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JSONFileSink(ResultSink):
+    """One pretty-printed JSON document, a single result or a list of them"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._results = []
+
+    def write(self, result: Dict[str, Any]):
+        self._results.append(result)
+
+    def close(self):
+        data = self._results[0] if len(self._results) == 1 else self._results
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, default=str, ensure_ascii=False)
+        logger.info(f"Results saved to {self.path}")
+
+
+class JSONLinesSink(ResultSink):
+    """Append-only JSON Lines file, optionally gzip/zstd compressed, flushed per result"""
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = "auto",
+        compact: bool = False,
+        keep_positions: bool = False
+    ):
+        if compression == "auto":
+            compression = _compression_from_path(path)
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"unknown compression {compression}, expected one of {COMPRESSIONS}")
+
+        self.path = path
+        self.compression = compression
+        self.compact = compact
+        self.keep_positions = keep_positions
+        self.count = 0
+        self._file = _open_binary(path, "a", compression)
+
+    def write(self, result: Dict[str, Any]):
+        if self.compact:
+            result = compact_result(result, keep_positions=self.keep_positions)
+
+        line = json.dumps(result, default=str, ensure_ascii=False,
+                          separators=(",", ":")) + "\n"
+        self._file.write(line.encode("utf-8"))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"{self.count} results appended to {self.path}")
+
+
+def open_result_sink(path: str, compact: bool = False, compression: Optional[str] = "auto") -> ResultSink:
+    """JSON Lines sink for .jsonl paths (optionally .gz / .zst), plain JSON otherwise"""
+    if ".jsonl" in path:
+        return JSONLinesSink(path, compression=compression, compact=compact)
+    return JSONFileSink(path)
+
+
+def read_results(path: str, expand: bool = True) -> Iterator[Dict[str, Any]]:
+    """lazily iterate the results of a JSON Lines file written by JSONLinesSink"""
+    with _open_binary(path, "r", _compression_from_path(path)) as raw:
+        for line in io.TextIOWrapper(raw, encoding="utf-8"):
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            yield expand_result(result) if expand else result
@@ -0,0 +1,36 @@
+"""
+Per-resume analysis state shared by every extractor
+"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class ResumeDocument:
+    """A resume parsed once: cleaned text, its sentence offsets and the NLI chunks
+    built from them. Plain data only, so it can be sent between processes."""
+
+    raw_text: str
+    text: str
+    sentence_spans: List[Tuple[int, int]] = field(default_factory=list)
+    chunks: List[str] = field(default_factory=list)
+    chunk_size: int = 0
+    chunk_spans: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def sentences(self) -> List[str]:
+        return [self.text[start:end] for start, end in self.sentence_spans]
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_spans)
+
+    def get_text_statistics(self) -> dict:
+        words = len(self.text.split())
+        return {
+            'character_count': len(self.text),
+            'word_count': words,
+            'sentence_count': self.sentence_count,
+            'paragraph_count': len([p for p in self.text.split('\n\n') if p.strip()]),
+            'avg_sentence_length': words / max(self.sentence_count, 1)
+        }
@@ -0,0 +1,450 @@
+"""
+Inverted index over processed resumes: skill -> posting list of (resume id,
+confidence, match count), memory-mapped, with boolean queries and top-k ranking
+"""
+import re
+import json
+import logging
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.skill_categories import SkillCategories
+
+logger = logging.getLogger(__name__)
+
+# bump when the on-disk layout changes
+INDEX_FORMAT_VERSION = 1
+
+# match counts are stored as uint16
+MAX_MATCHES = np.iinfo(np.uint16).max
+
+QUERY_TOKEN_RE = re.compile(r'\s*(\(|\)|"[^"]*"(?:>[0-9.]+)?|[^\s()]+)')
+OPERATORS = ("AND", "OR", "NOT")
+
+
+class QueryError(ValueError):
+    pass
+
+
+class SkillIndexBuilder:
+    """Collects the skills of processed resumes into per-skill posting lists.
+    Resume ids are assigned in insertion order, so every list is already sorted;
+    a resume added again (e.g. after a reanalysis) replaces its earlier entry."""
+
+    def __init__(self, skill_to_category: Optional[Dict[str, str]] = None,
+                 skill_aliases: Optional[Dict[str, List[str]]] = None):
+        if skill_to_category is None:
+            skill_to_category = SkillCategories.get_skill_to_category_mapping(
+                SkillCategories.get_default_skills())
+        if skill_aliases is None:
+            skill_aliases = SkillCategories.get_skill_aliases()
+        self.skill_to_category = skill_to_category
+        self.aliases = {alias: skill for skill, aliases in skill_aliases.items() for alias in aliases}
+
+        self.resumes: List[str] = []
+        self._resume_ids: Dict[str, int] = {}
+        self._replaced: List[int] = []
+        # skill -> (resume ids, confidences, match counts), compact stdlib arrays
+        self._postings: Dict[str, Tuple[array, array, array]] = {}
+        self._categories: Dict[str, str] = {}
+
+    def add(self, resume: str, skills: Dict[str, Any]) -> int:
+        """add the skills result (HybridSkillExtractor.extract, expanded) of one resume"""
+        if resume in self._resume_ids:
+            self._replaced.append(self._resume_ids[resume])
+        resume_id = len(self.resumes)
+        self._resume_ids[resume] = resume_id
+        self.resumes.append(resume)
+
+        for skill_info in skills.get("detailed_skills", []):
+            skill = skill_info["skill"]
+            if skill not in self._postings:
+                self._postings[skill] = (array("i"), array("f"), array("H"))
+                self._categories[skill] = self.skill_to_category.get(
+                    skill, skill_info.get("category", "other"))
+            docs, confidences, matches = self._postings[skill]
+            docs.append(resume_id)
+            confidences.append(float(skill_info.get("confidence", 0.0)))
+            matches.append(min(int(skill_info.get("matches", 0)), MAX_MATCHES))
+        return resume_id
+
+    def add_results(self, results: Iterable[Dict[str, Any]]) -> int:
+        """add process_resume results (e.g. read_results of a --batch file), skipping failures"""
+        added = 0
+        for result in results:
+            if "error" in result or "skills" not in result:
+                continue
+            self.add(result["file_path"], result["skills"])
+            added += 1
+        return added
+
+    def save(self, directory: str):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # drop replaced entries and renumber, so ids stay dense
+        keep = np.ones(len(self.resumes), dtype=bool)
+        keep[self._replaced] = False
+        new_ids = np.cumsum(keep, dtype=np.int64) - 1
+        resumes = [resume for resume, kept in zip(self.resumes, keep) if kept]
+
+        # skills whose every entry was replaced are left out
+        kept_postings = {}
+        for skill, columns in self._postings.items():
+            docs, confidences, matches = (np.frombuffer(values, dtype=dtype) for values, dtype in
+                                          zip(columns, (np.int32, np.float32, np.uint16)))
+            kept = keep[docs]
+            if kept.any():
+                kept_postings[skill] = (new_ids[docs[kept]].astype(np.int32), confidences[kept], matches[kept])
+
+        skills = sorted(kept_postings)
+        # every known category, so filtering on one no resume has is not an error
+        categories = sorted(set(self.skill_to_category.values()) | {self._categories[skill] for skill in skills})
+        category_index = {category: i for i, category in enumerate(categories)}
+
+        pointers = [0]
+        doc_parts, confidence_parts, match_parts = [], [], []
+        for skill in skills:
+            docs, confidences, matches = kept_postings[skill]
+            doc_parts.append(docs)
+            confidence_parts.append(confidences)
+            match_parts.append(matches)
+            pointers.append(pointers[-1] + len(docs))
+
+        # one more list per category after the skills: its best confidence and
+        # total matches per resume, so category terms cost a single list too
+        for category in categories:
+            members = [i for i, skill in enumerate(skills) if self._categories[skill] == category]
+            if not members:
+                doc_parts.append(np.zeros(0, dtype=np.int32))
+                confidence_parts.append(np.zeros(0, dtype=np.float32))
+                match_parts.append(np.zeros(0, dtype=np.uint16))
+                pointers.append(pointers[-1])
+                continue
+            docs = np.concatenate([doc_parts[i] for i in members])
+            confidences = np.concatenate([confidence_parts[i] for i in members])
+            matches = np.concatenate([match_parts[i] for i in members]).astype(np.int64)
+            order = np.lexsort((-confidences, docs))
+            docs, confidences, matches = docs[order], confidences[order], matches[order]
+            first = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+            doc_parts.append(docs[first])
+            confidence_parts.append(confidences[first])
+            match_parts.append(np.minimum(np.add.reduceat(matches, first), MAX_MATCHES))
+            pointers.append(pointers[-1] + len(first))
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        np.save(directory / "pointers.npy", np.array(pointers, dtype=np.int64))
+        np.save(directory / "docs.npy", concat(doc_parts, np.int32))
+        np.save(directory / "confidences.npy", concat(confidence_parts, np.float32))
+        np.save(directory / "matches.npy", concat(match_parts, np.uint16))
+        with open(directory / "resumes.json", "w", encoding="utf-8") as f:
+            json.dump(resumes, f, ensure_ascii=False)
+        # written last, a directory without it is an interrupted build
+        with open(directory / "index.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "format": INDEX_FORMAT_VERSION,
+                "resume_count": len(resumes),
+                "skills": skills,
+                "categories": categories,
+                "skill_categories": [category_index[self._categories[skill]] for skill in skills],
+                "aliases": {alias: skill for alias, skill in self.aliases.items() if skill in kept_postings},
+            }, f, ensure_ascii=False)
+        logger.info(f"Saved skill index ({len(resumes)} resumes, {len(skills)} skills, "
+                    f"{pointers[len(skills)]} postings) to {directory}")
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """sorted unique a & b, a binary search per element of the shorter one"""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a) or not len(b):
+        return a[:0]
+    positions = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[positions] == a]
+
+
+def _difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """sorted unique a - b"""
+    if not len(a) or not len(b):
+        return a
+    positions = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[positions] != a]
+
+
+class SkillIndex:
+    """A saved SkillIndexBuilder, memory-mapped: posting lists are CSR slices of
+    docs / confidences / matches, one pointer pair per skill and per category.
+
+        index.search('kubernetes>0.9 AND terraform>0.9 AND NOT php', top_k=10)
+
+    Terms are skill names or aliases ("quoted" if they contain spaces) or
+    category:<name> (any skill of the category), each optionally followed by
+    >confidence; AND binds tighter than OR, NOT applies to the next term or
+    parenthesized group.
+    """
+
+    def __init__(self, directory: str):
+        directory = Path(directory)
+        with open(directory / "index.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format"] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"skill index format {meta['format']}, expected {INDEX_FORMAT_VERSION}")
+
+        self.directory = directory
+        self.resume_count: int = meta["resume_count"]
+        self.skills: List[str] = meta["skills"]
+        self.categories: List[str] = meta["categories"]
+        self.skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.aliases: Dict[str, str] = meta["aliases"]
+        # category lists follow the skill lists
+        self.category_ids = {category: len(self.skills) + i for i, category in enumerate(self.categories)}
+
+        def load(name: str) -> np.ndarray:
+            # plain ndarray views of the maps, np.memmap indexing is much slower
+            return np.load(directory / f"{name}.npy", mmap_mode="r").view(np.ndarray)
+
+        self.pointers = np.load(directory / "pointers.npy")
+        self.docs = load("docs")
+        self.confidences = load("confidences")
+        self.matches = load("matches")
+        self._resumes: Optional[List[str]] = None
+
+    @property
+    def resumes(self) -> List[str]:
+        # only needed to name results, not to answer queries
+        if self._resumes is None:
+            with open(self.directory / "resumes.json", "r", encoding="utf-8") as f:
+                self._resumes = json.load(f)
+        return self._resumes
+
+    def skill_id(self, skill: str) -> Optional[int]:
+        skill = skill.strip().lower()
+        return self.skill_ids.get(self.aliases.get(skill, skill))
+
+    def postings(self, skill_id: int, min_confidence: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(resume ids, confidences, match counts) of a skill (or category list),
+        above min_confidence"""
+        start, end = int(self.pointers[skill_id]), int(self.pointers[skill_id + 1])
+        docs, confidences, matches = self.docs[start:end], self.confidences[start:end], self.matches[start:end]
+        if min_confidence > 0.0:
+            keep = confidences > min_confidence
+            return docs[keep], confidences[keep], matches[keep]
+        return docs, confidences, matches
+
+    def _resume_ids(self, list_id: int, min_confidence: float) -> np.ndarray:
+        # postings()[0] without filtering the columns nobody reads
+        start, end = int(self.pointers[list_id]), int(self.pointers[list_id + 1])
+        if min_confidence > 0.0:
+            return self.docs[start:end][self.confidences[start:end] > min_confidence]
+        return self.docs[start:end]
+
+    def resumes_with(self, skill: str, min_confidence: float = 0.0) -> np.ndarray:
+        skill_id = self.skill_id(skill)
+        if skill_id is None:
+            return np.zeros(0, dtype=np.int32)
+        return self._resume_ids(skill_id, min_confidence)
+
+    def resumes_in_category(self, category: str, min_confidence: float = 0.0) -> np.ndarray:
+        if category not in self.category_ids:
+            raise QueryError(f"unknown category {category}, expected one of {self.categories}")
+        return self._resume_ids(self.category_ids[category], min_confidence)
+
+    def _union(self, parts: List[np.ndarray]) -> np.ndarray:
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return np.zeros(0, dtype=np.int32)
+        if len(parts) == 1:
+            return np.asarray(parts[0])
+        # a bitmap over all resumes beats sorting once the lists are long
+        if not self._is_dense(sum(len(part) for part in parts)):
+            return np.unique(np.concatenate(parts))
+        mask = np.zeros(self.resume_count, dtype=bool)
+        for part in parts:
+            mask[part] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def query(self, query: str, min_confidence: float = 0.0) -> Tuple[np.ndarray, List[Tuple[int, float]]]:
+        """(sorted resume ids matching query, (skill id, min confidence) of its positive
+        skill terms); min_confidence applies to terms without their own >confidence"""
+        tokens = QUERY_TOKEN_RE.findall(query)
+        if not tokens:
+            raise QueryError("empty query")
+        parser = _QueryParser(self, tokens, min_confidence)
+        resume_ids = parser.parse()
+        return resume_ids, parser.positive_terms
+
+    def search(self, query: str, min_confidence: float = 0.0, top_k: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Resumes matching query, best first: ranked by the sum of their confidences
+        for the query's (non-negated) skill terms, then by resume id"""
+        resume_ids, terms = self.query(query, min_confidence)
+
+        skill_ids = list(dict.fromkeys(skill_id for skill_id, _ in terms))
+        if self._is_dense(len(resume_ids)):
+            # scatter the postings over all resumes rather than search each result
+            dense = np.zeros(self.resume_count, dtype=np.float32)
+            for skill_id in skill_ids:
+                docs, confidences, _ = self.postings(skill_id)
+                dense[docs] += confidences
+            scores = dense[resume_ids]
+        else:
+            scores = np.zeros(len(resume_ids), dtype=np.float32)
+            for skill_id in skill_ids:
+                scores += self._confidences_of(skill_id, resume_ids)
+
+        if top_k is not None and top_k < len(resume_ids):
+            # partition first, only the top k get sorted; ties keep resume id order
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k] if top_k > 0 else np.zeros(0, dtype=np.int64)
+            threshold = scores[candidates].min() if len(candidates) else np.inf
+            candidates = np.flatnonzero(scores >= threshold)
+            order = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        top_ids = resume_ids[order]
+        term_confidences = {self.skills[skill_id]: self._confidences_of(skill_id, top_ids)
+                            for skill_id in skill_ids}
+        resumes = self.resumes
+        return [{
+            "resume_id": int(resume_id),
+            "resume": resumes[resume_id],
+            "score": round(float(scores[i]), 4),
+            "skills": {skill: round(float(confidence[rank]), 4)
+                       for skill, confidence in term_confidences.items() if confidence[rank] > 0.0},
+        } for rank, (i, resume_id) in enumerate(zip(order, top_ids))]
+
+    def _is_dense(self, size: int) -> bool:
+        """whether a bitmap / array over all resumes beats working on size sorted ids"""
+        return size * 32 >= self.resume_count
+
+    def _confidences_of(self, skill_id: int, resume_ids: np.ndarray) -> np.ndarray:
+        """confidence of a skill for each of the sorted resume_ids, 0 where it is absent"""
+        docs, confidences, _ = self.postings(skill_id)
+        if not len(docs) or not len(resume_ids):
+            return np.zeros(len(resume_ids), dtype=np.float32)
+        positions = np.minimum(np.searchsorted(docs, resume_ids), len(docs) - 1)
+        return np.where(docs[positions] == resume_ids, confidences[positions], np.float32(0.0))
+
+    def get_stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "resumes": self.resume_count,
+            "skills": len(self.skills),
+            "postings": int(self.pointers[len(self.skills)]),
+        }
+
+
+class _QueryParser:
+    """recursive descent over query tokens: or := and (OR and)*, and := not (AND not)*,
+    not := NOT not | ( or ) | term"""
+
+    def __init__(self, index: SkillIndex, tokens: List[str], min_confidence: float):
+        self.index = index
+        self.tokens = tokens
+        self.position = 0
+        self.min_confidence = min_confidence
+        self.positive_terms: List[Tuple[int, float]] = []
+        self._negated = 0
+
+    def parse(self) -> np.ndarray:
+        result = self._or()
+        if self.position < len(self.tokens):
+            raise QueryError(f"unexpected {self.tokens[self.position]!r}")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> str:
+        token = self._peek()
+        if token is None:
+            raise QueryError("query ends too early")
+        self.position += 1
+        return token
+
+    def _or(self) -> np.ndarray:
+        parts = [self._and()]
+        while (self._peek() or "").upper() == "OR":
+            self._next()
+            parts.append(self._and())
+        return self.index._union(parts)
+
+    def _and(self) -> np.ndarray:
+        # negated operands are subtracted rather than complemented
+        included, excluded = [], []
+        target = excluded if self._skip_not() else included
+        target.append(self._not_operand(target is excluded))
+        while (self._peek() or "").upper() == "AND":
+            self._next()
+            target = excluded if self._skip_not() else included
+            target.append(self._not_operand(target is excluded))
+
+        if included:
+            # shortest lists first keeps every intersection small
+            included.sort(key=len)
+            result = included[0]
+            for part in included[1:]:
+                result = _intersect(result, part)
+        else:
+            result = np.arange(self.index.resume_count, dtype=np.int32)
+        if excluded and self.index._is_dense(len(result)):
+            mask = np.zeros(self.index.resume_count, dtype=bool)
+            mask[result] = True
+            for part in excluded:
+                mask[part] = False
+            return np.flatnonzero(mask).astype(np.int32)
+        for part in excluded:
+            result = _difference(result, part)
+        return result
+
+    def _skip_not(self) -> bool:
+        negated = False
+        while (self._peek() or "").upper() == "NOT":
+            self._next()
+            negated = not negated
+        return negated
+
+    def _not_operand(self, negated: bool) -> np.ndarray:
+        self._negated += negated
+        try:
+            token = self._next()
+            if token == "(":
+                result = self._or()
+                if self._next() != ")":
+                    raise QueryError("missing )")
+                return result
+            if token == ")" or token.upper() in OPERATORS:
+                raise QueryError(f"unexpected {token!r}")
+            return self._term(token)
+        finally:
+            self._negated -= negated
+
+    def _term(self, token: str) -> np.ndarray:
+        name, _, threshold = token.rpartition(">") if ">" in token else (token, "", "")
+        try:
+            min_confidence = float(threshold) if threshold else self.min_confidence
+        except ValueError:
+            raise QueryError(f"bad confidence in {token!r}")
+        name = name.strip('"')
+
+        if name.lower().startswith("category:"):
+            return self.index.resumes_in_category(name[len("category:"):], min_confidence)
+
+        skill_id = self.index.skill_id(name)
+        if skill_id is None:
+            return np.zeros(0, dtype=np.int32)
+        if not self._negated:
+            self.positive_terms.append((skill_id, min_confidence))
+        return self.index._resume_ids(skill_id, min_confidence)
+
+
+def build_skill_index(results: Iterable[Dict[str, Any]], directory: str,
+                      skill_to_category: Optional[Dict[str, str]] = None) -> SkillIndex:
+    builder = SkillIndexBuilder(skill_to_category)
+    builder.add_results(results)
+    builder.save(directory)
+    return SkillIndex(directory)
@@ -0,0 +1,178 @@
+"""
+Precompiled single-pass skill matcher
+"""
+import re
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _leading_char(pattern: str) -> Optional[str]:
+    """first literal char a pattern from TextProcessor.create_skill_patterns
+    can start matching with, or None if it can start with anything"""
+    # every pattern starts with a (?<!...) boundary lookbehind
+    body = pattern[pattern.index(')') + 1:]
+
+    if body.startswith('['):
+        return body[1:body.index(']')].lower()[:1] or None
+    if body.startswith('\\'):
+        # escaped punctuation is a literal, \s \w etc. are classes
+        return None if body[1].isalnum() else body[1]
+    return body[0]
+
+
+def _merge_alias_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """spans of a skill's name and aliases in text order, without the ones inside
+    a longer match ("react" within "react.js", "kafka" within "apache kafka")"""
+    merged = []
+    for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if merged and end <= merged[-1][1]:
+            continue
+        merged.append((start, end))
+    return merged
+
+
+class SkillMatcher:
+    """Finds every occurrence of every skill of a taxonomy in one scan of the text.
+
+    Uses the patterns of a compiled SkillTaxonomy (TextProcessor.create_skill_patterns
+    of each skill and its aliases): candidate start positions are found with one
+    compiled regex, then only the patterns whose first char matches the char at that
+    position are probed, all at once.
+    """
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.patterns: List[str] = taxonomy.patterns
+        # skill id -> indices into self.patterns
+        self.skill_patterns: List[List[int]] = [
+            taxonomy.patterns_of(skill_id).tolist() for skill_id in range(len(taxonomy.names))]
+
+        # a pattern's source is at least as long as anything it matches (every matched
+        # char takes at least one char of pattern), bounding how far a probe looks ahead
+        self.max_match_length = max(map(len, self.patterns), default=0)
+
+        self._compile()
+        logger.info(f"Compiled skill matcher: {len(self.skill_patterns)} skills, "
+                    f"{len(self.patterns)} patterns")
+
+    def _compile(self):
+        buckets = defaultdict(list)
+        for pattern_id, pattern in enumerate(self.patterns):
+            buckets[_leading_char(pattern)].append(pattern_id)
+
+        # patterns with an unknown first char are probed at every position
+        wildcard = buckets.pop(None, [])
+
+        # all patterns start with a lookbehind that implies (?<!\w)
+        if wildcard:
+            self._starts = re.compile(r'(?<!\w)')
+        else:
+            self._starts = re.compile(
+                r'(?<!\w)(?=[' + re.escape(''.join(buckets)) + '])')
+
+        # each probe captures, at a single position, every pattern of its bucket that matches there;
+        # its gate, an alternation of the same patterns, rejects the (many) positions where none
+        # does without building and walking a tuple of mostly empty groups
+        self._probes: Dict[Optional[str], Tuple[List[int], re.Pattern, re.Pattern]] = {}
+        for char, pattern_ids in list(buckets.items()) + [(None, [])]:
+            pattern_ids = pattern_ids + wildcard
+            self._probes[char] = (
+                pattern_ids,
+                re.compile('|'.join(f'(?:{self.patterns[i]})' for i in pattern_ids)),
+                re.compile(''.join(f'(?=({self.patterns[i]})|)' for i in pattern_ids)))
+
+    def _scan(self, text_lower: str) -> List[List[Tuple[int, int]]]:
+        spans = [[] for _ in self.patterns]
+        # end of the last kept match per pattern, to keep re.finditer's non-overlapping semantics
+        last_end = [0] * len(self.patterns)
+        self._scan_range(text_lower, spans, last_end, 0, len(text_lower))
+        return spans
+
+    def _scan_range(self, text_lower: str, spans: List[List[Tuple[int, int]]], last_end: List[int],
+                    start: int, stop: int):
+        """add the matches starting in [start, stop) to spans"""
+        for start_match in self._starts.finditer(text_lower, start):
+            pos = start_match.start()
+            if pos >= stop:
+                break
+            pattern_ids, gate, probe = self._probes.get(
+                text_lower[pos], self._probes[None])
+            if not pattern_ids or gate.match(text_lower, pos) is None:
+                continue
+
+            groups = probe.match(text_lower, pos).groups()
+            for pattern_id, group in zip(pattern_ids, groups):
+                if group is not None and pos >= last_end[pattern_id]:
+                    end = pos + len(group)
+                    spans[pattern_id].append((pos, end))
+                    last_end[pattern_id] = max(end, pos + 1)
+
+    def _collect(self, spans: List[List[Tuple[int, int]]]) -> Dict[int, List[Tuple[int, int]]]:
+        found = {}
+        for skill_id, pattern_ids in enumerate(self.skill_patterns):
+            if len(pattern_ids) == 1:
+                positions = spans[pattern_ids[0]]
+            else:
+                positions = _merge_alias_spans(
+                    [span for pattern_id in pattern_ids for span in spans[pattern_id]])
+            if positions:
+                found[skill_id] = positions
+
+        return found
+
+    def find_ids(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """skill id -> match spans in text order, only for skills found in text"""
+        return self._collect(self._scan(text.lower()))
+
+    def stream(self) -> 'SkillMatchStream':
+        return SkillMatchStream(self)
+
+    def find_all(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        """canonical skill -> match spans (in taxonomy order), only for skills found in text"""
+        names = self.taxonomy.names
+        return {names[skill_id]: positions for skill_id, positions in self.find_ids(text).items()}
+
+    def find_skills(self, text: str) -> List[str]:
+        return list(self.find_all(text).keys())
+
+
+class SkillMatchStream:
+    """find_ids over a text that arrives in pieces (e.g. the cleaned pages of a PDF):
+    each piece is scanned as soon as it's fed, up to where a match could still
+    depend on text to come. Pieces should end before whitespace, like
+    TextCleaner output, so lowercasing them one by one equals lowercasing the text."""
+
+    def __init__(self, matcher: SkillMatcher):
+        self.matcher = matcher
+        self.text_lower = ""
+        self._spans = [[] for _ in matcher.patterns]
+        self._last_end = [0] * len(matcher.patterns)
+        self._scanned = 0
+
+    def feed(self, text: str):
+        self.text_lower += text.lower()
+        # a probe at pos reads up to max_match_length chars plus one lookahead char
+        self._scan_to(len(self.text_lower) - self.matcher.max_match_length - 1)
+
+    def _scan_to(self, stop: int):
+        if stop > self._scanned:
+            self.matcher._scan_range(self.text_lower, self._spans, self._last_end, self._scanned, stop)
+            self._scanned = stop
+
+    def finish(self) -> Dict[int, List[Tuple[int, int]]]:
+        """the find_ids result of the whole text fed"""
+        self._scan_to(len(self.text_lower))
+        return self.matcher._collect(self._spans)
+
+
+# compiled matchers, one per skill taxonomy
+_matchers: Dict[str, SkillMatcher] = {}
+
+
+def get_skill_matcher(taxonomy) -> SkillMatcher:
+    if taxonomy.digest not in _matchers:
+        _matchers[taxonomy.digest] = SkillMatcher(taxonomy)
+    return _matchers[taxonomy.digest]
@@ -0,0 +1,396 @@
+"""
+Compiled skill taxonomy: canonical skill ids, alias table, category bitsets and
+match patterns, validated once and stored on disk for memory-mapped loading
+"""
+import os
+import json
+import hashlib
+import inspect
+import logging
+import shutil
+import tempfile
+import tokenize
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import skill_categories as skill_categories_module
+from ..config.skill_categories import SkillCategories
+from .text_processor import TextProcessor
+
+logger = logging.getLogger(__name__)
+
+# bump when create_skill_patterns or the artifact layout changes
+TAXONOMY_FORMAT_VERSION = 1
+
+# category membership is one uint64 bitset per skill
+MAX_CATEGORIES = 64
+
+
+class TaxonomyError(ValueError):
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        super().__init__("invalid skill taxonomy:\n  " + "\n  ".join(problems))
+
+
+def find_implicit_concatenations(source_path: str) -> List[str]:
+    """Adjacent string literals in a source file, i.e. a missing comma that makes
+    Python silently glue two skills together ("mui" "next.js" -> "muinext.js")"""
+    problems = []
+    previous = None
+    with open(source_path, "rb") as f:
+        for token in tokenize.tokenize(f.readline):
+            if token.type in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT, tokenize.ENCODING):
+                continue
+            if token.type == tokenize.STRING and previous is not None and previous.type == tokenize.STRING:
+                problems.append(f"{source_path}:{token.start[0]}: missing comma between "
+                                f"{previous.string} and {token.string}")
+            previous = token
+    return problems
+
+
+def validate_skill_categories(skill_categories: Dict[str, List[str]],
+                              skill_aliases: Dict[str, List[str]]) -> List[str]:
+    """problems with the skill lists and aliases, empty if there are none"""
+    problems = []
+    listed = set()
+
+    if len(skill_categories) > MAX_CATEGORIES:
+        problems.append(f"{len(skill_categories)} categories, at most {MAX_CATEGORIES} are supported")
+
+    for category, skills in skill_categories.items():
+        seen = set()
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                problems.append(f"{category}: empty or non-string skill {skill!r}")
+                continue
+            if skill != skill.strip() or skill != skill.lower():
+                problems.append(f"{category}: {skill!r} should be lowercase without surrounding spaces")
+            if skill in seen:
+                problems.append(f"{category}: duplicate {skill!r}")
+            seen.add(skill)
+        listed.update(seen)
+
+    owners = {}
+    for skill, aliases in skill_aliases.items():
+        if skill not in listed:
+            problems.append(f"aliases of {skill!r}, which no category lists")
+        for alias in aliases:
+            if alias != alias.strip() or alias != alias.lower():
+                problems.append(f"alias {alias!r} should be lowercase without surrounding spaces")
+            if alias in listed:
+                problems.append(f"alias {alias!r} of {skill!r} is also listed as a skill")
+            if alias in owners and owners[alias] != skill:
+                problems.append(f"alias {alias!r} belongs to both {owners[alias]!r} and {skill!r}")
+            owners[alias] = skill
+
+    return problems
+
+
+def normalize_skill_categories(skill_categories: Dict[str, List[str]],
+                               skill_aliases: Dict[str, List[str]]
+                               ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """skill lists and aliases stripped, lowercased and without duplicates; empty
+    skills, aliases of unlisted skills and aliases that are skills or belong to
+    another skill already are dropped"""
+    categories = {}
+    for category, skills in skill_categories.items():
+        normalized = (skill.strip().lower() for skill in skills if isinstance(skill, str))
+        categories[category] = list(dict.fromkeys(skill for skill in normalized if skill))
+
+    listed = {skill for skills in categories.values() for skill in skills}
+    aliases: Dict[str, List[str]] = {}
+    owners = {}
+    for skill, skill_forms in skill_aliases.items():
+        skill = skill.strip().lower()
+        if skill not in listed:
+            continue
+        for alias in skill_forms:
+            alias = alias.strip().lower()
+            if not alias or alias in listed or owners.setdefault(alias, skill) != skill:
+                continue
+            forms = aliases.setdefault(skill, [])
+            if alias not in forms:
+                forms.append(alias)
+    return categories, aliases
+
+
+def taxonomy_digest(skill_categories: Dict[str, List[str]],
+                    skill_aliases: Dict[str, List[str]]) -> str:
+    # list and category order decide the skill ids, so nothing is sorted
+    encoded = json.dumps({
+        "format": TAXONOMY_FORMAT_VERSION,
+        "skills": skill_categories,
+        "aliases": skill_aliases,
+    }, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SkillTaxonomy:
+    """Skills as integer ids (in first-listed order) with everything the
+    extractors look up per skill precomputed:
+
+    - skill_ids: canonical name or alias -> id
+    - primary_category: id -> category index (the last category listing it)
+    - category_bits: id -> bitset of every category listing it
+    - patterns / skill_pattern_ptr / skill_pattern_ids: deduplicated match
+      patterns and, per skill, the slice of pattern ids of its name and aliases
+    """
+
+    def __init__(self, names: List[str], categories: List[str], skill_ids: Dict[str, int],
+                 primary_category: np.ndarray, category_bits: np.ndarray, patterns: List[str],
+                 skill_pattern_ptr: np.ndarray, skill_pattern_ids: np.ndarray, digest: str):
+        self.names = names
+        self.categories = categories
+        self.skill_ids = skill_ids
+        self.primary_category = primary_category
+        self.category_bits = category_bits
+        self.patterns = patterns
+        self.skill_pattern_ptr = skill_pattern_ptr
+        self.skill_pattern_ids = skill_pattern_ids
+        self.digest = digest
+
+    @classmethod
+    def build(cls, skill_categories: Dict[str, List[str]],
+              skill_aliases: Dict[str, List[str]], strict: bool = False) -> 'SkillTaxonomy':
+        """Compile skill lists and aliases. strict (the build step, the bundled lists)
+        rejects every problem; otherwise user supplied lists are normalized with a
+        warning and only what can't be fixed (too many categories) raises."""
+        # the digest of the lists as given, it's what callers look taxonomies up by
+        digest = taxonomy_digest(skill_categories, skill_aliases)
+        problems = validate_skill_categories(skill_categories, skill_aliases)
+        if problems and not strict:
+            logger.warning("normalizing skill taxonomy: " + "; ".join(problems))
+            skill_categories, skill_aliases = normalize_skill_categories(
+                skill_categories, skill_aliases)
+            problems = validate_skill_categories(skill_categories, skill_aliases)
+        if problems:
+            raise TaxonomyError(problems)
+
+        names: List[str] = []
+        skill_ids: Dict[str, int] = {}
+        primary = []
+        bits = []
+        for category_index, skills in enumerate(skill_categories.values()):
+            for skill in skills:
+                if skill not in skill_ids:
+                    skill_ids[skill] = len(names)
+                    names.append(skill)
+                    primary.append(category_index)
+                    bits.append(0)
+                skill_id = skill_ids[skill]
+                primary[skill_id] = category_index
+                bits[skill_id] |= 1 << category_index
+
+        for skill, aliases in skill_aliases.items():
+            for alias in aliases:
+                skill_ids[alias] = skill_ids[skill]
+
+        forms = [[name] for name in names]
+        for skill, aliases in skill_aliases.items():
+            forms[skill_ids[skill]].extend(aliases)
+
+        patterns: List[str] = []
+        pattern_index: Dict[str, int] = {}
+        pattern_owner: Dict[int, int] = {}
+        pointers, pattern_ids = [0], []
+        for skill_id, skill_forms in enumerate(forms):
+            ids = []
+            for form in skill_forms:
+                for pattern in TextProcessor.create_skill_patterns(form):
+                    if pattern not in pattern_index:
+                        pattern_index[pattern] = len(patterns)
+                        patterns.append(pattern)
+                    pattern_id = pattern_index[pattern]
+                    if pattern_owner.setdefault(pattern_id, skill_id) != skill_id:
+                        problem = f"{form!r} matches exactly like {names[pattern_owner[pattern_id]]!r}"
+                        if not strict:
+                            # the first skill listed keeps the pattern
+                            logger.warning(f"skill taxonomy: {problem}, pattern dropped")
+                            continue
+                        problems.append(problem)
+                    if pattern_id not in ids:
+                        ids.append(pattern_id)
+            pattern_ids.extend(ids)
+            pointers.append(len(pattern_ids))
+        if problems:
+            raise TaxonomyError(problems)
+
+        return cls(
+            names, list(skill_categories), skill_ids,
+            np.array(primary, dtype=np.int16), np.array(bits, dtype=np.uint64), patterns,
+            np.array(pointers, dtype=np.int32), np.array(pattern_ids, dtype=np.int32),
+            digest)
+
+    def save(self, directory: str):
+        """Write to a staging directory next to directory and rename it into place.
+        Other processes np.load the arrays with mmap_mode="r", rewriting them in
+        place could truncate a file under their mapping (SIGBUS)."""
+        directory = Path(directory)
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+        stale = staging.with_name(staging.name + ".old")
+        try:
+            np.save(staging / "primary_category.npy", self.primary_category)
+            np.save(staging / "category_bits.npy", self.category_bits)
+            np.save(staging / "skill_pattern_ptr.npy", self.skill_pattern_ptr)
+            np.save(staging / "skill_pattern_ids.npy", self.skill_pattern_ids)
+            with open(staging / "taxonomy.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "format": TAXONOMY_FORMAT_VERSION,
+                    "digest": self.digest,
+                    "names": self.names,
+                    "categories": self.categories,
+                    "skill_ids": self.skill_ids,
+                    "patterns": self.patterns,
+                }, f, ensure_ascii=False)
+
+            if directory.exists():
+                # an unreadable or interrupted build, moved aside rather than
+                # overwritten: its files stay valid for anyone who mapped them
+                os.replace(directory, stale)
+            try:
+                os.replace(staging, directory)
+            except OSError:
+                # another process renamed its (identical) build into place first
+                logger.info(f"skill taxonomy {directory} was saved concurrently")
+                return
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(stale, ignore_errors=True)
+        logger.info(f"Saved skill taxonomy ({len(self.names)} skills) to {directory}")
+
+    @classmethod
+    def load(cls, directory: str) -> 'SkillTaxonomy':
+        directory = Path(directory)
+        with open(directory / "taxonomy.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["format"] != TAXONOMY_FORMAT_VERSION:
+            raise ValueError(f"taxonomy format {meta['format']}, expected {TAXONOMY_FORMAT_VERSION}")
+
+        def array(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+        return cls(
+            meta["names"], meta["categories"], meta["skill_ids"],
+            array("primary_category"), array("category_bits"), meta["patterns"],
+            array("skill_pattern_ptr"), array("skill_pattern_ids"), meta["digest"])
+
+    def skill_id(self, skill: str) -> Optional[int]:
+        """id of a canonical skill name or alias, None if unknown"""
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = self.skill_ids.get(skill.strip().lower())
+        return skill_id
+
+    def canonical(self, skill: str) -> str:
+        skill_id = self.skill_id(skill)
+        return skill if skill_id is None else self.names[skill_id]
+
+    def category_of(self, skill_id: int) -> str:
+        return self.categories[self.primary_category[skill_id]]
+
+    def categorize(self, skill: str) -> str:
+        skill_id = self.skill_id(skill)
+        return 'other' if skill_id is None else self.category_of(skill_id)
+
+    def categories_of(self, skill_id: int) -> List[str]:
+        bits = int(self.category_bits[skill_id])
+        return [category for i, category in enumerate(self.categories) if bits >> i & 1]
+
+    def skill_ids_in(self, category: str) -> np.ndarray:
+        mask = np.uint64(1 << self.categories.index(category))
+        return np.flatnonzero(self.category_bits & mask)
+
+    def patterns_of(self, skill_id: int) -> np.ndarray:
+        return self.skill_pattern_ids[self.skill_pattern_ptr[skill_id]:self.skill_pattern_ptr[skill_id + 1]]
+
+    def canonical_id(self, skill: str) -> Optional[int]:
+        """id of skill if it is a canonical name here, None if unknown or only an alias"""
+        skill_id = self.skill_ids.get(skill)
+        return skill_id if skill_id is not None and self.names[skill_id] == skill else None
+
+    def subset(self, names: List[str]) -> 'SkillTaxonomy':
+        """taxonomy of just these skills and their aliases, to match them alone;
+        a skill's matches don't depend on the other skills, so they are the same"""
+        wanted = {self.skill_ids[name] for name in names}
+        aliases = defaultdict(list)
+        for form, skill_id in self.skill_ids.items():
+            if skill_id in wanted and form != self.names[skill_id]:
+                aliases[self.names[skill_id]].append(form)
+        return SkillTaxonomy.build({"subset": list(names)}, dict(aliases))
+
+
+def diff_taxonomies(old: SkillTaxonomy, new: SkillTaxonomy) -> Tuple[List[str], List[str]]:
+    """(skills of new that are added or match differently than in old, i.e. new
+    or changed aliases, skills of old that new no longer lists). A skill that only
+    moved to another category is neither, its matches and NLI scores still hold."""
+    changed = []
+    for skill_id, name in enumerate(new.names):
+        old_id = old.canonical_id(name)
+        if old_id is None:
+            changed.append(name)
+            continue
+        old_patterns = {old.patterns[i] for i in old.patterns_of(old_id)}
+        new_patterns = {new.patterns[i] for i in new.patterns_of(skill_id)}
+        if old_patterns != new_patterns:
+            changed.append(name)
+
+    removed = [name for name in old.names if new.canonical_id(name) is None]
+    return changed, removed
+
+
+def default_skill_aliases(skill_categories: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """the default aliases of the skills a (possibly custom) taxonomy lists"""
+    listed = {skill.strip().lower() for skills in skill_categories.values()
+              for skill in skills if isinstance(skill, str)}
+    return {skill: aliases for skill, aliases in SkillCategories.get_skill_aliases().items()
+            if skill in listed and not listed.intersection(aliases)}
+
+
+def validate_default_taxonomy() -> List[str]:
+    """the build step check: source file of the default lists plus the lists themselves"""
+    skill_categories = SkillCategories.get_default_skills()
+    problems = find_implicit_concatenations(inspect.getsourcefile(skill_categories_module))
+    problems.extend(validate_skill_categories(
+        skill_categories, SkillCategories.get_skill_aliases()))
+    return problems
+
+
+# loaded taxonomies, one per digest
+_taxonomies: Dict[str, SkillTaxonomy] = {}
+
+
+def get_skill_taxonomy(skill_categories: Optional[Dict[str, List[str]]] = None,
+                       skill_aliases: Optional[Dict[str, List[str]]] = None,
+                       cache_dir: Optional[str] = None) -> SkillTaxonomy:
+    """The compiled taxonomy of skill_categories (default: the default skills),
+    built and validated on first use, then loaded from cache_dir. Only the
+    bundled default lists are validated strictly, custom ones are normalized."""
+    strict = skill_categories is None
+    if strict:
+        skill_categories = SkillCategories.get_default_skills()
+    if skill_aliases is None:
+        skill_aliases = default_skill_aliases(skill_categories)
+
+    digest = taxonomy_digest(skill_categories, skill_aliases)
+    if digest in _taxonomies:
+        return _taxonomies[digest]
+
+    taxonomy = None
+    directory = Path(cache_dir) / digest[:16] if cache_dir else None
+    if directory is not None and (directory / "taxonomy.json").exists():
+        try:
+            taxonomy = SkillTaxonomy.load(str(directory))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"rebuilding unreadable skill taxonomy {directory}: {e}")
+
+    if taxonomy is None:
+        taxonomy = SkillTaxonomy.build(skill_categories, skill_aliases, strict=strict)
+        if directory is not None:
+            taxonomy.save(str(directory))
+
+    _taxonomies[digest] = taxonomy
+    return taxonomy
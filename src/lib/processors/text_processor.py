@@ -2,71 +2,316 @@ import re
 import unicodedata
 import string
 import logging
-from typing import List
+from typing import Any, List, Optional, Tuple
 from ..utils.model_utils import get_model_manager
+from ..utils.instrumentation import get_metrics
+from .resume_document import ResumeDocument
 
 logger = logging.getLogger(__name__)
 
 
+# whitespace normalization, compiled once
+NEWLINES_RE = re.compile(r'\n+')
+WHITESPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+# sentence breaks of cleaned text for the rules-only pipeline: whitespace after
+# terminal punctuation (so "node.js" and "3.5" stay whole). Cleaning turns line
+# breaks into spaces, those come from TextCleaner.line_breaks of the raw text
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+class _ControlCharTable(dict):
+    """str.translate table mapping control chars (unicode category C*) to a space.
+    Filled lazily, so each distinct char is classified only once per process."""
+
+    def __missing__(self, codepoint: int):
+        value = ' ' if unicodedata.category(chr(codepoint))[0] == 'C' else codepoint
+        self[codepoint] = value
+        return value
+
+
+CONTROL_CHAR_TABLE = _ControlCharTable()
+
+
+class TextCleaner:
+    """TextProcessor.clean_text of a text that arrives in pieces (e.g. PDF pages):
+    feed returns the part of the cleaned text that is final, everything except
+    trailing whitespace a later piece could still merge into or the final strip
+    would remove. The pieces it returns add up to clean_text of the whole."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._tail = ""
+        self._length = 0
+        # offsets in the cleaned text of the raw line breaks, each one now a space
+        self.line_breaks: List[int] = []
+
+    def feed(self, raw_text: str) -> str:
+        *lines, last = raw_text.split('\n')
+        pieces = []
+        for line in lines:
+            pieces.append(self._feed(line + '\n'))
+            # blank lines and leading breaks add no new boundary
+            if self._length and (not self.line_breaks or self.line_breaks[-1] < self._length):
+                self.line_breaks.append(self._length)
+        pieces.append(self._feed(last))
+        return "".join(pieces)
+
+    def _feed(self, raw_text: str) -> str:
+        # the pending whitespace takes part in the next piece's whitespace runs
+        text = NEWLINES_RE.sub('\n', self._tail + raw_text.translate(CONTROL_CHAR_TABLE))
+        text = WHITESPACE_RE.sub(' ', text)
+        if not self._parts:
+            text = text.lstrip()
+
+        final = text.rstrip()
+        self._tail = text[len(final):]
+        if final:
+            self._parts.append(final)
+            self._length += len(final)
+        return final
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
 class TextProcessor:
     """Handles text preprocessing and chunking"""
 
     def __init__(self, spacy_model: str = "en_core_web_sm"):
         self.model_manager = get_model_manager()
-        self.nlp = self.model_manager.load_spacy_model(spacy_model)
+        self.spacy_model = spacy_model
+        self._nlp = None
+
+    @property
+    def nlp(self):
+        # loaded by the first sentence split, rule matching alone never needs spaCy
+        if self._nlp is None:
+            self._nlp = self.model_manager.load_spacy_model(self.spacy_model)
+        return self._nlp
 
     def clean_text(self, text: str) -> str:
         # replace all control characters (\u0003) with space
-        text = ''.join(
-            c if unicodedata.category(c)[0] != 'C' else ' '
-            for c in text
-        )
+        text = text.translate(CONTROL_CHAR_TABLE)
 
         # normalize newlines
-        text = re.sub(r'\n+', '\n', text)
+        text = NEWLINES_RE.sub('\n', text)
 
         # replace excessive whitespace with single space
-        text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+        text = WHITESPACE_RE.sub(' ', text)
 
         return text.strip()
 
+    def extract_sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of the non-empty, stripped sentences of text"""
+        spans = []
+        for sent in self.nlp(text).sents:
+            start, end = sent.start_char, sent.end_char
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                spans.append((start, end))
+        return spans
+
+    @staticmethod
+    def split_sentence_spans(text: str, line_breaks: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+        """approximate sentence offsets of cleaned text without spaCy: breaks after
+        terminal punctuation and at line_breaks (offsets from a TextCleaner)"""
+        spans = []
+        start = 0
+        for end in [offset for offset in line_breaks or () if 0 < offset < len(text)] + [len(text)]:
+            for match in SENTENCE_BREAK_RE.finditer(text, start, end):
+                if match.start() > start:
+                    spans.append((start, match.start()))
+                start = match.end()
+            if start < end:
+                spans.append((start, end))
+            # past the space the line break became
+            start = max(start, end)
+            while start < len(text) and text[start].isspace():
+                start += 1
+        return spans
+
     def extract_sentences(self, text: str) -> List[str]:
-        doc = self.nlp(text)
-        return [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+        return [text[start:end] for start, end in self.extract_sentence_spans(text)]
+
+    def create_document(self, raw_text: str, chunk_size: int = 500,
+                        tokenizer: Any = None, token_budget: Optional[int] = None,
+                        text: Optional[str] = None) -> ResumeDocument:
+        """Clean, sentence-split and chunk a resume, running spaCy exactly once.
+
+        Chunks hold up to chunk_size chars, or up to token_budget tokens of the
+        NLI tokenizer when both are given, so they fill the model's window without
+        being truncated. text is raw_text already cleaned (e.g. by a TextCleaner).
+        """
+        metrics = get_metrics()
+        with metrics.span("create_document"):
+            if text is None:
+                with metrics.span("cleaning"):
+                    text = self.clean_text(raw_text)
+
+            with metrics.span("chunking"):
+                sentence_spans = self.extract_sentence_spans(text)
+
+                if tokenizer is not None and token_budget:
+                    token_lengths = self.count_tokens(
+                        tokenizer, [text[start:end] for start, end in sentence_spans])
+                    # a sentence over the budget would be truncated by the NLI model
+                    piece_spans, piece_lengths = self.split_long_spans(
+                        tokenizer, text, sentence_spans, token_lengths, token_budget)
+                    chunk_spans = self.chunk_sentence_spans(
+                        piece_spans, token_budget, piece_lengths)
+                    chunk_size = token_budget
+                else:
+                    chunk_spans = self.chunk_sentence_spans(sentence_spans, chunk_size)
+
+        metrics.incr("chunks", len(chunk_spans))
+        metrics.observe("chunks_per_resume", len(chunk_spans))
+
+        return ResumeDocument(
+            raw_text=raw_text,
+            text=text,
+            sentence_spans=sentence_spans,
+            chunks=[text[start:end] for start, end in chunk_spans],
+            chunk_size=chunk_size,
+            chunk_spans=chunk_spans
+        )
+
+    def create_rules_document(self, raw_text: str, text: Optional[str] = None,
+                              line_breaks: Optional[List[int]] = None) -> ResumeDocument:
+        """Clean a resume and split it into approximate sentences at line breaks and
+        terminal punctuation. No chunks, the rules-only pipeline runs no NLI model
+        and never loads spaCy. text and line_breaks are from a TextCleaner fed raw_text."""
+        metrics = get_metrics()
+        with metrics.span("create_document"):
+            if text is None:
+                with metrics.span("cleaning"):
+                    cleaner = TextCleaner()
+                    cleaner.feed(raw_text)
+                    text, line_breaks = cleaner.text, cleaner.line_breaks
+            sentence_spans = self.split_sentence_spans(text, line_breaks)
+
+        return ResumeDocument(
+            raw_text=raw_text,
+            text=text,
+            sentence_spans=sentence_spans
+        )
 
     def create_chunks(self, text: str, chunk_size: int = 500) -> List[str]:
         """split text into chunks for better processing"""
-        sentences = self.extract_sentences(text)
+        metrics = get_metrics()
+        with metrics.span("chunking"):
+            spans = self.chunk_sentence_spans(
+                self.extract_sentence_spans(text), chunk_size)
+        metrics.incr("chunks", len(spans))
+        metrics.observe("chunks_per_resume", len(spans))
+        return [text[start:end] for start, end in spans]
+
+    @staticmethod
+    def count_tokens(tokenizer: Any, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encodings = tokenizer(texts, add_special_tokens=False)['input_ids']
+        return [len(input_ids) for input_ids in encodings]
+
+    @staticmethod
+    def split_long_spans(tokenizer: Any, text: str, spans: List[Tuple[int, int]], token_lengths: List[int],
+                         max_tokens: int) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """spans (and token lengths) with every span over max_tokens tokens cut at
+        token boundaries into pieces of at most max_tokens. Slow tokenizers have no
+        offsets, they cut between words."""
+        long_spans = [i for i, length in enumerate(token_lengths) if length > max_tokens]
+        if not long_spans:
+            return spans, token_lengths
+
+        texts = [text[spans[i][0]:spans[i][1]] for i in long_spans]
+        if getattr(tokenizer, "is_fast", False):
+            offsets = tokenizer(texts, add_special_tokens=False,
+                                return_offsets_mapping=True)['offset_mapping']
+        else:
+            offsets = []
+            for span_text in texts:
+                words = [(m.start(), m.end()) for m in re.finditer(r'\S+', span_text)]
+                word_lengths = TextProcessor.count_tokens(
+                    tokenizer, [span_text[start:end] for start, end in words])
+                # one (start, end) per token, every token of a word spanning the word
+                offsets.append([word for word, length in zip(words, word_lengths) for _ in range(length)])
+        split = dict(zip(long_spans, offsets))
+
+        pieces, piece_lengths = [], []
+        for i, (start, end) in enumerate(spans):
+            if i not in split:
+                pieces.append((start, end))
+                piece_lengths.append(token_lengths[i])
+                continue
 
+            token_offsets = split[i]
+            piece_start = 0
+            while piece_start < len(token_offsets):
+                piece_end = min(piece_start + max_tokens, len(token_offsets))
+                if piece_end < len(token_offsets):
+                    # back off to a word boundary (tokens of a word touch or overlap),
+                    # a single word longer than the budget is cut anyway
+                    cut = piece_end
+                    while cut > piece_start + 1 and token_offsets[cut][0] <= token_offsets[cut - 1][1]:
+                        cut -= 1
+                    if token_offsets[cut][0] > token_offsets[cut - 1][1]:
+                        piece_end = cut
+                pieces.append((start + token_offsets[piece_start][0],
+                               start + token_offsets[piece_end - 1][1]))
+                piece_lengths.append(piece_end - piece_start)
+                piece_start = piece_end
+        return pieces, piece_lengths
+
+    def chunk_sentence_spans(self, sentence_spans: List[Tuple[int, int]], max_length: int,
+                             token_lengths: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+        """Group consecutive sentences into chunk spans of at most max_length.
+
+        Length is the chunk's char length in the text (sentences are separated by a
+        single space after clean_text), or the sum of its sentences' token_lengths.
+        A sentence longer than max_length becomes a chunk of its own (token budgeted
+        documents cut those with split_long_spans first).
+        """
         chunks = []
-        current_chunk = ""
+        chunk_start, chunk_end, chunk_tokens = None, None, 0
+
+        for i, (start, end) in enumerate(sentence_spans):
+            if chunk_start is None:
+                fits = False
+            elif token_lengths is None:
+                fits = end - chunk_start <= max_length
+            else:
+                fits = chunk_tokens + token_lengths[i] <= max_length
 
-        for sentence in sentences:
-            # check if adding this sentence exceeds chunk size
-            if len(current_chunk + " " + sentence) <= chunk_size:
-                current_chunk += " " + sentence if current_chunk else sentence
+            if fits:
+                chunk_end = end
+                chunk_tokens += token_lengths[i] if token_lengths else 0
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
+                if chunk_start is not None:
+                    chunks.append((chunk_start, chunk_end))
                 # start new chunk with current sentence
-                current_chunk = sentence
+                chunk_start, chunk_end = start, end
+                chunk_tokens = token_lengths[i] if token_lengths else 0
 
         # if last chunk is not empty, add it
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if chunk_start is not None:
+            chunks.append((chunk_start, chunk_end))
 
         return chunks
 
     def get_text_statistics(self, text: str) -> dict:
         """Get basic text statistics"""
-        doc = self.nlp(text)
+        sentence_count = len(list(self.nlp(text).sents))
 
         return {
             'character_count': len(text),
             'word_count': len(text.split()),
-            'sentence_count': len(list(doc.sents)),
+            'sentence_count': sentence_count,
             'paragraph_count': len([p for p in text.split('\n\n') if p.strip()]),
-            'avg_sentence_length': len(text.split()) / max(len(list(doc.sents)), 1)
+            'avg_sentence_length': len(text.split()) / max(sentence_count, 1)
         }
 
     def extract_context_around_match(self, text: str, match_start: int, match_end: int,
@@ -91,21 +336,22 @@ class TextProcessor:
 
         return tokens
 
-    def remove_diacritics(self, text: str) -> str:
+    @staticmethod
+    def remove_diacritics(text: str) -> str:
         return ''.join(
             c for c in unicodedata.normalize('NFD', text)
             if unicodedata.category(c) != 'Mn'
         )
 
-    def normalize_skill_text(self, skill: str) -> str:
-        skill = self.remove_diacritics(skill.lower())
-        skill = re.escape(skill)
-        skill = skill.replace('.', r'\.')  # escape dots
-        skill = skill.replace(' ', r'[-\s]')  # match spaces or hyphens
-        return skill
+    @staticmethod
+    def normalize_skill_text(skill: str) -> str:
+        skill = TextProcessor.remove_diacritics(skill.lower())
+        # re.escape already escapes dots and spaces, spaces also match hyphens
+        return re.escape(skill).replace(r'\ ', r'[-\s]')
 
-    def create_skill_patterns(self, skill: str) -> List[str]:
-        """Create regex patterns for matching skill in text"""
+    @staticmethod
+    def create_skill_patterns(skill: str) -> List[str]:
+        """Create regex patterns for matching skill in text (no spaCy needed)"""
         skill_lower = skill.lower()
 
         if skill_lower == 'c':
@@ -117,5 +363,5 @@ class TextProcessor:
         elif skill_lower == 'c++':
             return [r'(?<!\w)[cC]\+\+(?!\w)']
 
-        normalized = self.normalize_skill_text(skill)
+        normalized = TextProcessor.normalize_skill_text(skill)
         return [rf'(?<![\w+#]){normalized}(?![\w+#])']
@@ -0,0 +1,148 @@
+"""
+Per-resume intermediate artifacts (cleaned text, chunks, rule matches, NLI pair
+scores), kept so a changed skill taxonomy only costs the work for the skills that
+changed
+"""
+import json
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .result_cache import get_model_version
+
+logger = logging.getLogger(__name__)
+
+# bump when the layout of a stored artifact changes
+ARTIFACT_FORMAT_VERSION = 2
+
+# config fields the stored document and pair scores depend on; everything else
+# (thresholds, role settings, early exit, the taxonomy) is re-applied on reanalysis
+ARTIFACT_CONFIG_KEYS = (
+    'mode', 'spacy_model', 'pdf_backend', 'text_chunk_size', 'chunk_token_budget',
+    'skill_classifier_model', 'inference_backend', 'inference_dtype',
+)
+
+# (chunk index, skill) -> entailment score
+PairScores = Dict[Tuple[int, str], float]
+
+
+def make_artifact_fingerprint(config_dict: Dict[str, Any]) -> str:
+    fingerprint = {key: config_dict.get(key) for key in ARTIFACT_CONFIG_KEYS}
+    fingerprint["format"] = ARTIFACT_FORMAT_VERSION
+    if config_dict.get("mode") != "rules":
+        fingerprint["model"] = get_model_version(config_dict["skill_classifier_model"])
+    encoded = json.dumps(fingerprint, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def encode_pair_scores(pair_scores: PairScores) -> Dict[str, Dict[str, float]]:
+    """skill -> {chunk index: score}, JSON friendly"""
+    encoded: Dict[str, Dict[str, float]] = {}
+    for (chunk_idx, skill), score in pair_scores.items():
+        encoded.setdefault(skill, {})[str(chunk_idx)] = score
+    return encoded
+
+
+def decode_pair_scores(encoded: Dict[str, Dict[str, float]]) -> PairScores:
+    return {(int(chunk_idx), skill): score
+            for skill, scores in encoded.items() for chunk_idx, score in scores.items()}
+
+
+class ArtifactStore:
+    """SQLite backed store of one artifact per (PDF content, artifact fingerprint),
+    plus every skill taxonomy an artifact was built with, by digest"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "pdf_sha256 TEXT NOT NULL, fingerprint TEXT NOT NULL, taxonomy TEXT NOT NULL, "
+            "artifact BLOB NOT NULL, updated REAL NOT NULL, PRIMARY KEY (pdf_sha256, fingerprint))")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS taxonomies ("
+            "digest TEXT PRIMARY KEY, skills TEXT NOT NULL, aliases TEXT NOT NULL)")
+        self._conn.commit()
+        logger.info(f"Opened artifact store: {self.path}")
+
+    def get(self, pdf_sha256: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT artifact FROM artifacts WHERE pdf_sha256 = ? AND fingerprint = ?",
+                (pdf_sha256, fingerprint)).fetchone()
+        return None if row is None else json.loads(zlib.decompress(row[0]))
+
+    def put(self, pdf_sha256: str, fingerprint: str, taxonomy_digest: str, artifact: Dict[str, Any]):
+        blob = zlib.compress(json.dumps(
+            artifact, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (pdf_sha256, fingerprint, taxonomy, artifact, updated) "
+                "VALUES (?, ?, ?, ?, ?)", (pdf_sha256, fingerprint, taxonomy_digest, blob, time.time()))
+            self._conn.commit()
+
+    def iter_artifacts(self, fingerprint: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(pdf sha256, taxonomy digest, artifact) of every resume stored under fingerprint"""
+        with self._lock:
+            keys = self._conn.execute(
+                "SELECT pdf_sha256 FROM artifacts WHERE fingerprint = ? ORDER BY rowid",
+                (fingerprint,)).fetchall()
+        # row by row, the archive may not fit in memory
+        for (pdf_sha256,) in keys:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT taxonomy, artifact FROM artifacts WHERE pdf_sha256 = ? AND fingerprint = ?",
+                    (pdf_sha256, fingerprint)).fetchone()
+            if row is not None:
+                yield pdf_sha256, row[0], json.loads(zlib.decompress(row[1]))
+
+    def count(self, fingerprint: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM artifacts WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+
+    def put_taxonomy(self, digest: str, skill_categories: Dict[str, List[str]],
+                     skill_aliases: Dict[str, List[str]]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO taxonomies (digest, skills, aliases) VALUES (?, ?, ?)",
+                (digest, json.dumps(skill_categories), json.dumps(skill_aliases)))
+            self._conn.commit()
+
+    def get_taxonomy(self, digest: str) -> Optional[Tuple[Dict[str, List[str]], Dict[str, List[str]]]]:
+        """(skill categories, aliases) of a stored taxonomy"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT skills, aliases FROM taxonomies WHERE digest = ?", (digest,)).fetchone()
+        return None if row is None else (json.loads(row[0]), json.loads(row[1]))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(artifact)), 0) FROM artifacts").fetchone()
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size_mb": round(size / 1024 ** 2, 2),
+        }
+
+
+# open stores, one per file
+_artifact_stores: Dict[str, ArtifactStore] = {}
+
+
+def get_artifact_store(path: Optional[str]) -> Optional[ArtifactStore]:
+    if not path:
+        return None
+    if path not in _artifact_stores:
+        _artifact_stores[path] = ArtifactStore(path)
+    return _artifact_stores[path]
@@ -0,0 +1,106 @@
+"""
+Bi-encoder pre-filter that picks which (chunk, skill) pairs are worth an NLI pass
+"""
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILL_DESCRIPTION = "{skill} ({category})"
+
+
+class EmbeddingEncoder:
+    """Mean-pooled, L2 normalized sentence embeddings from a small transformer
+    (e.g. sentence-transformers/all-MiniLM-L6-v2), so a dot product is a cosine"""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 64):
+        self.model_name = model_name
+        self.device = torch.device(device)
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).to(self.device).eval()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.model.config.hidden_size), dtype=np.float32)
+
+        embeddings = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = self.tokenizer(
+                    list(texts[start:start + self.batch_size]), padding=True,
+                    truncation=True, return_tensors="pt").to(self.device)
+                hidden = self.model(**batch).last_hidden_state
+                mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                embeddings.append(
+                    torch.nn.functional.normalize(pooled.float(), dim=-1).cpu().numpy())
+        return np.concatenate(embeddings)
+
+
+class SkillEmbeddingIndex:
+    """Taxonomy skill embeddings, computed once per (model, descriptions) and kept
+    on disk as a .npy matrix, used to keep the top-k chunks per candidate skill"""
+
+    def __init__(self, encoder: EmbeddingEncoder, skill_categories: Dict[str, List[str]],
+                 cache_dir: str, description_template: str = DEFAULT_SKILL_DESCRIPTION):
+        self.encoder = encoder
+        self.description_template = description_template
+        self.skills = [skill for skills in skill_categories.values() for skill in skills]
+        descriptions = [
+            description_template.format(skill=skill, category=category.replace("_", " "))
+            for category, skills in skill_categories.items() for skill in skills
+        ]
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self.matrix = self._load_or_encode(descriptions, Path(cache_dir))
+
+    def _load_or_encode(self, descriptions: List[str], cache_dir: Path) -> np.ndarray:
+        # the file name pins both the model and the exact descriptions
+        digest = hashlib.sha256(
+            "\n".join([self.encoder.model_name] + descriptions).encode("utf-8")).hexdigest()
+        path = cache_dir / f"{self.encoder.model_name.replace('/', '--')}-{digest[:16]}.npy"
+
+        if path.exists():
+            matrix = np.load(path)
+            if matrix.shape[0] == len(descriptions):
+                return matrix
+
+        matrix = self.encoder.encode(descriptions)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, matrix)
+        logger.info(f"Saved {len(descriptions)} skill embeddings to {path}")
+        return matrix
+
+    def select_pairs(self, chunks: List[str], chunk_indices: List[int],
+                     candidate_skills: List[str], top_k: int) -> List[Tuple[int, str]]:
+        """(chunk index, skill) pairs for the top_k most similar chunks of each skill,
+        in (chunk, candidate) order like the exhaustive pairing. Skills missing from
+        the taxonomy keep every chunk."""
+        if len(chunk_indices) <= top_k:
+            return [(i, skill) for i in chunk_indices for skill in candidate_skills]
+
+        known = [skill for skill in candidate_skills if skill in self.skill_index]
+        selected = {skill: chunk_indices for skill in candidate_skills
+                    if skill not in self.skill_index}
+
+        if known:
+            chunk_matrix = self.encoder.encode([chunks[i] for i in chunk_indices])
+            skill_matrix = self.matrix[[self.skill_index[skill] for skill in known]]
+            # (chunks x skills) cosine similarities in one matrix multiply
+            similarities = chunk_matrix @ skill_matrix.T
+            top_rows = np.argpartition(-similarities, top_k - 1, axis=0)[:top_k]
+            for column, skill in enumerate(known):
+                selected[skill] = {chunk_indices[row] for row in top_rows[:, column]}
+
+        return [
+            (i, skill)
+            for i in chunk_indices
+            for skill in candidate_skills
+            if i in selected[skill]
+        ]
@@ -0,0 +1,152 @@
+"""
+CPU inference backends for the NLI classifiers: dynamic int8 quantization and ONNX Runtime
+"""
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+# torch / transformers are imported where a backend is actually built, so that
+# backend validation (ModelManager.model_key) stays cheap
+if TYPE_CHECKING:
+    from transformers.modeling_outputs import SequenceClassifierOutput
+
+logger = logging.getLogger(__name__)
+
+# "torch": full precision PyTorch, "torch_int8": PyTorch with dynamically quantized
+# Linear layers (CPU only), "onnx": exported ONNX Runtime graph (CPU only)
+BACKENDS = ("torch", "torch_int8", "onnx")
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+
+
+def validate_backend(backend: str):
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"unknown inference backend {backend}, expected one of {BACKENDS}")
+
+
+def get_onnx_model_dir(model_name: str, onnx_model_dir: Optional[str] = None) -> Path:
+    """where the ONNX export of a model lives: next to a local model dir, or in the cache"""
+    if onnx_model_dir:
+        return Path(onnx_model_dir)
+
+    model_path = Path(model_name)
+    if model_path.is_dir():
+        return model_path.with_name(model_path.name + "_onnx")
+
+    cache_dir = (Path(__file__).parent.resolve() / "../../../.cache").resolve()
+    return cache_dir / "onnx" / model_name.replace("/", "--")
+
+
+def quantize_dynamic_int8(model: Any) -> Any:
+    """int8 weights for every Linear layer, activations quantized on the fly"""
+    import torch
+    model = model.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class ONNXSequenceClassifier:
+    """ONNX Runtime session that quacks like a transformers sequence classifier
+    (config, device, eval(), __call__ returning logits) so NLIScorer can drive it"""
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: Optional[int] = None):
+        import torch
+        from transformers import AutoConfig
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "the onnx backend needs onnxruntime: pip install onnxruntime")
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / ONNX_INT8_MODEL_FILE
+        if not quantized or not model_file.exists():
+            model_file = model_dir / ONNX_MODEL_FILE
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"no ONNX export in {model_dir}, run: python3 src/training/export_onnx.py")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.model_file = model_file
+        self.session = ort.InferenceSession(
+            str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.config = AutoConfig.from_pretrained(model_dir)
+        self.device = torch.device("cpu")
+        logger.info(f"Loaded ONNX model: {model_file}")
+
+    def eval(self) -> 'ONNXSequenceClassifier':
+        return self
+
+    @property
+    def memory_mb(self) -> float:
+        return round(self.model_file.stat().st_size / (1024 ** 2), 1)
+
+    def __call__(self, **inputs) -> 'SequenceClassifierOutput':
+        import torch
+        from transformers.modeling_outputs import SequenceClassifierOutput
+        feeds = {
+            name: tensor.cpu().numpy()
+            for name, tensor in inputs.items() if name in self.input_names
+        }
+        logits = self.session.run(["logits"], feeds)[0]
+        return SequenceClassifierOutput(logits=torch.from_numpy(logits))
+
+
+class ONNXClassifier:
+    """model + tokenizer pair, the same surface NLIScorer.from_pipeline reads"""
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: Optional[int] = None):
+        from transformers import AutoTokenizer
+        self.model = ONNXSequenceClassifier(model_dir, quantized, num_threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 17) -> Path:
+    """Export a sequence classification model to ONNX (plus an int8 copy if quantize),
+    saving tokenizer and config next to it so the directory loads on its own."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    dummy = tokenizer(["Experienced with Terraform and AWS."], ["This example is cloud."],
+                      return_tensors="pt")
+    input_names = list(dummy.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    onnx_path = output_dir / ONNX_MODEL_FILE
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            args=(),
+            kwargs=dict(dummy),
+            f=str(onnx_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    logger.info(f"Exported {model_name} to {onnx_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = output_dir / ONNX_INT8_MODEL_FILE
+        quantize_dynamic(str(onnx_path), str(int8_path),
+                         weight_type=QuantType.QInt8)
+        logger.info(f"Quantized ONNX model saved to {int8_path}")
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    return output_dir
@@ -0,0 +1,136 @@
+"""
+Inference profile of the torch backends: threads, dtype, torch.compile and autograd
+mode, applied by ModelManager to every model it loads
+"""
+import json
+import logging
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ("float32", "bfloat16", "float16")
+
+# bump when the layout of calibration files changes
+CALIBRATION_FORMAT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def cpu_supports_bf16() -> bool:
+    """native bf16 matmuls (AVX512-BF16 or AMX), without them bf16 autocast is slower than fp32"""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+@dataclass
+class InferenceProfile:
+    """How the torch backends run a model in this process. threads and
+    interop_threads are process-wide torch settings, None keeps torch's default
+    (one thread per core, which oversubscribes as soon as several inference
+    processes share a host)."""
+
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    dtype: str = "float32"
+    compile: bool = False
+    inference_mode: bool = True
+
+    def __post_init__(self):
+        if self.dtype not in DTYPES:
+            raise ValueError(f"unknown inference dtype {self.dtype}, expected one of {DTYPES}")
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'InferenceProfile':
+        """the ModelConfig inference_* fields, thread counts left at None taken from
+        the calibration file at inference_profile_path if there is one"""
+        profile = cls(
+            threads=config.inference_threads,
+            interop_threads=config.inference_interop_threads,
+            dtype=config.inference_dtype,
+            compile=config.inference_compile,
+            inference_mode=config.inference_mode
+        )
+        calibration = load_calibration(config.inference_profile_path)
+        if calibration is not None:
+            if profile.threads is None:
+                profile.threads = calibration["threads"]
+            if profile.interop_threads is None:
+                profile.interop_threads = calibration["interop_threads"]
+        return profile
+
+    def for_backend(self, backend: str) -> 'InferenceProfile':
+        # quantized and ONNX models have their own kernels, only the threads apply
+        if backend == "torch":
+            return self
+        return replace(self, dtype="float32", compile=False)
+
+    def weight_dtype(self, on_gpu: bool) -> str:
+        """dtype the weights are loaded in: half precision on GPU, on CPU the
+        weights stay fp32 and bf16 is an autocast (see context)"""
+        if on_gpu:
+            return self.dtype
+        return "float32"
+
+    def autocast_dtype(self, on_gpu: bool) -> Optional[str]:
+        if on_gpu or self.dtype == "float32":
+            return None
+        if self.dtype == "float16" or not cpu_supports_bf16():
+            return None
+        return "bfloat16"
+
+    @contextmanager
+    def context(self, device: Any) -> Iterator[None]:
+        """autograd off (inference_mode or no_grad) plus bf16 autocast on capable CPUs"""
+        import torch
+        grad_mode = torch.inference_mode() if self.inference_mode else torch.no_grad()
+        autocast_dtype = self.autocast_dtype(device.type == "cuda")
+        with grad_mode:
+            if autocast_dtype is None:
+                yield
+            else:
+                with torch.autocast("cpu", dtype=getattr(torch, autocast_dtype)):
+                    yield
+
+    def describe(self) -> str:
+        return (f"threads={self.threads or 'default'}, interop={self.interop_threads or 'default'}, "
+                f"dtype={self.dtype}, compile={self.compile}, inference_mode={self.inference_mode}")
+
+
+def load_calibration(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """best thread setting recorded by benchmark.py --calibrate-threads, None if there is none"""
+    if not path or not Path(path).is_file():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            calibration = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"ignoring unreadable inference calibration {path}: {e}")
+        return None
+    if calibration.get("format") != CALIBRATION_FORMAT_VERSION:
+        logger.warning(f"ignoring inference calibration {path} of another format")
+        return None
+    return calibration
+
+
+def save_calibration(path: str, profile: InferenceProfile, processes: int,
+                     results: Dict[int, float], cpu_count: int):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": CALIBRATION_FORMAT_VERSION,
+            "threads": profile.threads,
+            "interop_threads": profile.interop_threads,
+            "processes": processes,
+            "cpu_count": cpu_count,
+            "profile": asdict(profile),
+            "pairs_per_second": {str(threads): rate for threads, rate in results.items()},
+        }, f, indent=2)
+    logger.info(f"Saved inference calibration to {path}")
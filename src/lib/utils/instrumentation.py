@@ -0,0 +1,413 @@
+"""
+Lightweight hot-path instrumentation: nested timing spans, counters and histograms,
+exported as Prometheus text or OpenTelemetry (OTLP/JSON) compatible dicts.
+
+Disabled by default; while disabled span() hands back a shared no-op and
+incr()/observe() return right away, so instrumented code pays one attribute check.
+"""
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# upper bounds, seconds for span durations and plain counts for size histograms
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+METRIC_PREFIX = "resume_"
+SERVICE_NAME = "resume-skill-extractor"
+
+_INVALID_METRIC_CHARS = re.compile(r'[^a-zA-Z0-9_:]')
+
+
+def _metric_name(name: str) -> str:
+    return METRIC_PREFIX + _INVALID_METRIC_CHARS.sub('_', name)
+
+
+class Histogram:
+    """fixed-bucket histogram, per-bucket (not cumulative) counts like OTLP"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram'):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+
+class _NoopSpan:
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """one timed region; spans opened inside it on the same thread become its children"""
+
+    def __init__(self, metrics: 'Metrics', name: str, attributes: Dict[str, Any]):
+        self.metrics = metrics
+        self.name = name
+        self.attributes = attributes
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = None
+        self.parent_id = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.duration = 0.0
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        stack = self.metrics._stack()
+        if stack:
+            self.trace_id = stack[-1].trace_id
+            self.parent_id = stack[-1].span_id
+        else:
+            self.trace_id = os.urandom(16).hex()
+        stack.append(self)
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        stack = self.metrics._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        elif self in stack:
+            stack.remove(self)
+        self.metrics._finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": dict(self.attributes),
+        }
+
+
+class Metrics:
+    """Process-wide registry of counters, histograms and recently finished spans"""
+
+    def __init__(self, enabled: bool = False, max_spans: int = 10_000):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.span_histograms: Dict[str, Histogram] = {}
+        self.spans = deque(maxlen=max_spans)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _captures(self) -> List[Dict[str, Any]]:
+        return getattr(self._local, "captures", None)
+
+    def span(self, name: str, **attributes):
+        """time a block: `with get_metrics().span("nli_scoring", pairs=n): ...`"""
+        if not self.enabled and not getattr(self._local, "captures", None):
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def incr(self, name: str, value: float = 1):
+        if not self.enabled and not getattr(self._local, "captures", None):
+            return
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+        for capture in self._captures() or ():
+            capture["counters"][name] = capture["counters"].get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = SIZE_BUCKETS):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def _finish(self, span: Span):
+        if self.enabled:
+            with self._lock:
+                histogram = self.span_histograms.get(span.name)
+                if histogram is None:
+                    histogram = self.span_histograms[span.name] = Histogram(TIME_BUCKETS)
+                histogram.observe(span.duration)
+                self.spans.append(span)
+        for capture in self._captures() or ():
+            capture["spans"].append(span.to_dict())
+
+    @contextmanager
+    def capture(self) -> Iterator[Dict[str, Any]]:
+        """Collect the spans and counters of this thread while the block runs,
+        whether or not metrics are enabled (used by debug_extract)"""
+        captured = {"spans": [], "counters": {}}
+        captures = getattr(self._local, "captures", None)
+        if captures is None:
+            captures = self._local.captures = []
+        captures.append(captured)
+        try:
+            yield captured
+        finally:
+            captures.remove(captured)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.span_histograms.clear()
+            self.spans.clear()
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """picklable copy of counters and histograms, e.g. to ship from a worker process"""
+        with self._lock:
+            snapshot = {
+                "counters": dict(self.counters),
+                "histograms": {name: (h.buckets, list(h.counts), h.sum, h.count)
+                               for name, h in self.histograms.items()},
+                "span_histograms": {name: (h.buckets, list(h.counts), h.sum, h.count)
+                                    for name, h in self.span_histograms.items()},
+            }
+        if reset:
+            self.reset()
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """add a snapshot() taken in another process into this registry"""
+        if not snapshot or not self.enabled:
+            return
+        with self._lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for key in ("histograms", "span_histograms"):
+                target = getattr(self, key)
+                for name, (buckets, counts, total, count) in snapshot[key].items():
+                    other = Histogram(buckets)
+                    other.counts, other.sum, other.count = list(counts), total, count
+                    if name not in target:
+                        target[name] = Histogram(buckets)
+                    target[name].merge(other)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """counters plus count / total / mean seconds per span name"""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "spans": {
+                    name: {
+                        "count": h.count,
+                        "total_s": round(h.sum, 6),
+                        "mean_s": round(h.sum / h.count, 6) if h.count else 0.0,
+                    }
+                    for name, h in self.span_histograms.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = _metric_name(name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            for name, histogram in sorted(self.histograms.items()):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                lines.extend(_prometheus_histogram(metric, histogram))
+
+            if self.span_histograms:
+                metric = _metric_name("span_duration_seconds")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, histogram in sorted(self.span_histograms.items()):
+                    lines.extend(_prometheus_histogram(
+                        metric, histogram, f'span="{name}"'))
+
+        return "\n".join(lines) + "\n"
+
+    def to_otlp_json(self) -> Dict[str, Any]:
+        """Finished spans and metrics shaped like OTLP/JSON export requests
+        (resourceSpans + resourceMetrics), for an OpenTelemetry collector"""
+        resource = {"attributes": [
+            {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]}
+        scope = {"name": __name__}
+        now = str(time.time_ns())
+
+        with self._lock:
+            spans = [_otlp_span(span) for span in self.spans]
+
+            metrics = [
+                {
+                    "name": _metric_name(name) + "_total",
+                    "sum": {
+                        "dataPoints": [{"asDouble": value, "timeUnixNano": now}],
+                        "aggregationTemporality": 2,  # cumulative
+                        "isMonotonic": True,
+                    },
+                }
+                for name, value in sorted(self.counters.items())
+            ]
+            metrics.extend(
+                _otlp_histogram(_metric_name(name), [(histogram, [])], now)
+                for name, histogram in sorted(self.histograms.items())
+            )
+            if self.span_histograms:
+                metrics.append(_otlp_histogram(
+                    _metric_name("span_duration_seconds"),
+                    [(histogram, [{"key": "span", "value": {"stringValue": name}}])
+                     for name, histogram in sorted(self.span_histograms.items())],
+                    now, unit="s"))
+
+        return {
+            "resourceSpans": [{"resource": resource,
+                               "scopeSpans": [{"scope": scope, "spans": spans}]}],
+            "resourceMetrics": [{"resource": resource,
+                                 "scopeMetrics": [{"scope": scope, "metrics": metrics}]}],
+        }
+
+
+def _prometheus_histogram(metric: str, histogram: Histogram, labels: str = "") -> List[str]:
+    prefix = labels + "," if labels else ""
+    suffix = "{" + labels + "}" if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    lines.append(f"{metric}_sum{suffix} {histogram.sum}")
+    lines.append(f"{metric}_count{suffix} {histogram.count}")
+    return lines
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    converted = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            converted.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            converted.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            converted.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            converted.append({"key": key, "value": {"stringValue": str(value)}})
+    return converted
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    return {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id or "",
+        "name": span.name,
+        "kind": 1,  # internal
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+    }
+
+
+def _otlp_histogram(name: str, points: List[Tuple[Histogram, List[Dict]]], now: str,
+                    unit: str = "") -> Dict[str, Any]:
+    return {
+        "name": name,
+        "unit": unit,
+        "histogram": {
+            "dataPoints": [
+                {
+                    "attributes": attributes,
+                    "timeUnixNano": now,
+                    "count": str(histogram.count),
+                    "sum": histogram.sum,
+                    "bucketCounts": [str(count) for count in histogram.counts],
+                    "explicitBounds": list(histogram.buckets),
+                }
+                for histogram, attributes in points
+            ],
+            "aggregationTemporality": 2,
+        },
+    }
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0",
+                         metrics: Optional[Metrics] = None) -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus text) and /metrics.json (OTLP/JSON) from a daemon thread"""
+    metrics = metrics or get_metrics()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = metrics.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path == "/metrics.json":
+                body = json.dumps(metrics.to_otlp_json()).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
@@ -0,0 +1,128 @@
+"""
+Coalesces concurrent NLI scoring requests into shared model batches
+"""
+import queue
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+from .instrumentation import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Drop-in for NLIScorer.score when many threads score at once.
+
+    Callers block while a single background thread gathers requests until
+    max_batch_size pairs are queued or max_wait_ms has passed since the first
+    one, scores them all with one NLIScorer.score call (which sorts by length
+    and pads per model batch) and hands each caller its slice of the scores.
+    The model only ever runs on that one thread.
+    """
+
+    def __init__(self, scorer: Any, max_batch_size: int = 256, max_wait_ms: float = 10.0):
+        self.scorer = scorer
+        self.tokenizer = scorer.tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = 0
+        self.flushes = 0
+        self._queue: "queue.Queue[Tuple[List[str], List[str], Future]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="nli-micro-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def seconds_per_pair(self) -> Optional[float]:
+        """model time per uncached pair of the wrapped scorer"""
+        return getattr(self.scorer, "seconds_per_pair", None)
+
+    def score(self, premises: List[str], labels: List[str]) -> List[float]:
+        if len(premises) != len(labels):
+            raise ValueError("premises and labels must have the same length")
+        if not premises:
+            return []
+        if self._closed:
+            raise RuntimeError("micro batcher is closed")
+
+        future = Future()
+        self._queue.put((premises, labels, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            pairs = len(request[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+
+            while pairs < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                pairs += len(request[0])
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[List[str], List[str], Future]]):
+        premises = [premise for request in batch for premise in request[0]]
+        labels = [label for request in batch for label in request[1]]
+
+        self.requests += len(batch)
+        self.flushes += 1
+        metrics = get_metrics()
+        metrics.observe("micro_batch_requests", len(batch))
+        metrics.observe("micro_batch_pairs", len(premises))
+
+        try:
+            scores = self.scorer.score(premises, labels)
+        except Exception as e:
+            logger.warning(f"error scoring micro batch of {len(premises)} pairs: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_premises, _, future in batch:
+            future.set_result(scores[offset:offset + len(request_premises)])
+            offset += len(request_premises)
+
+    def close(self):
+        """score what's already queued, then stop the background thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            # requests that raced with close
+            while not self._queue.empty():
+                request = self._queue.get_nowait()
+                if request is not None:
+                    request[2].set_exception(RuntimeError("micro batcher is closed"))
+
+    def get_stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "flushes": self.flushes,
+            "avg_requests_per_flush": round(self.requests / self.flushes, 2) if self.flushes else 0.0,
+            "queued": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
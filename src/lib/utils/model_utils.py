@@ -1,75 +1,314 @@
+import gc
 import logging
-import torch
-from typing import Any, Optional
-import spacy
-from transformers import pipeline
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from .score_cache import ScoreCache
+from .inference_profile import InferenceProfile
+
+# torch, transformers and spaCy are imported by the first load that needs them,
+# so runs without models (rules only, --help) never pay for them
+if TYPE_CHECKING:
+    import spacy
+    from .nli_scorer import NLIScorer
+    from .embedding_prefilter import EmbeddingEncoder
 
-torch.cuda.empty_cache()
 logger = logging.getLogger(__name__)
 
 
+# only sentence boundaries are used, everything else is dead weight per document
+SPACY_UNUSED_PIPES = ["parser", "ner", "tagger", "lemmatizer", "attribute_ruler"]
+
+# registry key of a loaded model: (model path, device, dtype or inference backend)
+ModelKey = Tuple[str, str, str]
+
+
 class ModelManager:
+    """Process-wide registry of loaded models, one copy per (model path, device, dtype).
+
+    Every load takes a reference and every release drops one; a model is unloaded
+    once nothing references it anymore.
+    """
+
     def __init__(self):
-        self._models = {}
+        self._models: Dict[ModelKey, Any] = {}
+        self._refs: Dict[ModelKey, int] = {}
         self._nlp_model = None
+        self._tokenizers: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        # (threads, interop threads) last applied to torch, they are process-wide
+        self._threads: Tuple[Optional[int], Optional[int]] = (None, None)
 
     def check_gpu_availability(self) -> bool:
         try:
+            import torch
             return torch.cuda.is_available()
         except ImportError:
             logger.warning("PyTorch not installed, using CPU")
             return False
 
-    def load_spacy_model(self, model_name: str = "en_core_web_sm") -> spacy.Language:
+    def resolve_device(self, use_gpu: bool = True) -> int:
+        return 0 if (use_gpu and self.check_gpu_availability()) else -1
+
+    def model_key(self, model_name: str, use_gpu: bool = True, dtype: str = "float32",
+                  backend: str = "torch") -> ModelKey:
+        from .inference_backends import validate_backend
+        validate_backend(backend)
+        if backend != "torch":
+            # quantized and ONNX models run on CPU only
+            return (str(model_name), "cpu", backend)
+
+        device = self.resolve_device(use_gpu)
+        return (str(model_name), f"cuda:{device}" if device >= 0 else "cpu", dtype)
+
+    def apply_inference_profile(self, profile: InferenceProfile):
+        """torch's process-wide thread pools, as the profile asks"""
+        threads = (profile.threads, profile.interop_threads)
+        if threads == self._threads or threads == (None, None):
+            return
+        import torch
+        with self._lock:
+            if profile.threads:
+                torch.set_num_threads(profile.threads)
+            if profile.interop_threads and profile.interop_threads != self._threads[1]:
+                try:
+                    torch.set_num_interop_threads(profile.interop_threads)
+                except RuntimeError as e:
+                    # only possible before the first inter-op parallel work of the process
+                    logger.warning(f"inter-op threads left at {torch.get_num_interop_threads()}: {e}")
+            self._threads = threads
+        logger.info(f"torch threads: intra-op {torch.get_num_threads()}, "
+                    f"inter-op {torch.get_num_interop_threads()}")
+
+    def load_spacy_model(self, model_name: str = "en_core_web_sm") -> 'spacy.Language':
+        """spaCy pipeline trimmed down to tokenization and sentence splitting"""
         if self._nlp_model is None:
+            import spacy
             try:
-                self._nlp_model = spacy.load(model_name)
-                logger.info(f"Loaded spaCy model: {model_name}")
+                nlp = spacy.load(model_name, exclude=SPACY_UNUSED_PIPES)
+
+                # the statistical senter ships disabled, fall back to the rule-based sentencizer
+                if "senter" in nlp.disabled:
+                    nlp.enable_pipe("senter")
+                elif not nlp.has_pipe("senter") and not nlp.has_pipe("sentencizer"):
+                    nlp.add_pipe("sentencizer")
+
+                # shared embeddings are only needed if a remaining pipe listens to them
+                if nlp.has_pipe("tok2vec") and not nlp.get_pipe("tok2vec").listening_components:
+                    nlp.disable_pipe("tok2vec")
+
+                self._nlp_model = nlp
+                logger.info(
+                    f"Loaded spaCy model: {model_name} (pipes: {nlp.pipe_names})")
             except OSError:
                 logger.error(
                     f"Please install spaCy model: python -m spacy download {model_name}")
                 raise
         return self._nlp_model
 
+    def load_tokenizer(self, model_name: str) -> Any:
+        """tokenizer alone, for token counting without loading the model weights"""
+        with self._lock:
+            if model_name not in self._tokenizers:
+                from transformers import AutoTokenizer
+                self._tokenizers[model_name] = AutoTokenizer.from_pretrained(
+                    model_name)
+            return self._tokenizers[model_name]
+
     def load_zero_shot_classifier(
         self,
         model_name: str,
         use_gpu: bool = True,
-        cache_key: Optional[str] = None
+        dtype: str = "float32",
+        backend: str = "torch",
+        onnx_model_dir: Optional[str] = None,
+        profile: Optional[InferenceProfile] = None
     ) -> Any:
-        if cache_key is None:
-            cache_key = f"zsl_{model_name}"
+        """Get the shared classifier for this model, loading it on first use.
+        Each call takes a reference, give it back with release_model.
 
-        if cache_key not in self._models:
-            device = 0 if (use_gpu and self.check_gpu_availability()) else -1
+        For the torch backends this is a transformers zero-shot pipeline; the onnx
+        backend returns an ONNXClassifier, which only exposes model and tokenizer.
+        A profile (threads, dtype, compile) overrides dtype.
+        """
+        if profile is not None:
+            profile = profile.for_backend(backend)
+            dtype = profile.dtype
+            self.apply_inference_profile(profile)
+        key = self.model_key(model_name, use_gpu, dtype, backend)
 
-            try:
-                model = pipeline(
-                    "zero-shot-classification",
-                    model=model_name,
-                    device=device,
-                    multi_label=True
-                )
-                self._models[cache_key] = model
-                logger.info(
-                    f"Loaded zero-shot classifier: {model_name} on device {device}")
-            except Exception as e:
-                logger.error(f"Error loading model {model_name}: {e}")
-                raise
+        with self._lock:
+            if key not in self._models:
+                try:
+                    self._models[key] = self._load_classifier(
+                        model_name, use_gpu, dtype, backend, onnx_model_dir, profile)
+                    self._refs[key] = 0
+                    logger.info(
+                        f"Loaded zero-shot classifier: {model_name} on {key[1]} ({key[2]})")
+                except Exception as e:
+                    logger.error(f"Error loading model {model_name}: {e}")
+                    raise
+
+            self._refs[key] += 1
+            return self._models[key]
+
+    def _load_classifier(self, model_name: str, use_gpu: bool, dtype: str, backend: str,
+                         onnx_model_dir: Optional[str], profile: Optional[InferenceProfile]) -> Any:
+        import torch
+        from transformers import pipeline
+        from .inference_backends import ONNXClassifier, get_onnx_model_dir, quantize_dynamic_int8
 
-        return self._models[cache_key]
+        if backend == "onnx":
+            return ONNXClassifier(str(get_onnx_model_dir(model_name, onnx_model_dir)),
+                                  num_threads=profile.threads if profile is not None else None)
 
-    def get_model(self, cache_key: str) -> Optional[Any]:
-        return self._models.get(cache_key)
+        if backend == "torch_int8":
+            model = pipeline(
+                "zero-shot-classification",
+                model=model_name,
+                device=-1,
+                multi_label=True
+            )
+            model.model = quantize_dynamic_int8(model.model)
+            return model
+
+        device = self.resolve_device(use_gpu)
+        if profile is not None:
+            if device < 0 and dtype == "float16":
+                logger.warning("float16 inference needs a GPU, running in float32")
+            dtype = profile.weight_dtype(device >= 0)
+
+        model = pipeline(
+            "zero-shot-classification",
+            model=model_name,
+            device=device,
+            torch_dtype=getattr(torch, dtype),
+            multi_label=True
+        )
+        model.model.eval()
+        if profile is not None and profile.compile:
+            self._compile_model(model)
+        return model
+
+    @staticmethod
+    def _compile_model(classifier: Any):
+        """torch.compile the forward pass in place, so the module (and everything
+        keyed by it) stays the same object; falls back to eager mode if compiling
+        the first call fails"""
+        import torch
+        module = classifier.model
+        eager_forward = module.forward
+        try:
+            module.forward = torch.compile(eager_forward, dynamic=True)
+            # compilation happens on the first call, pay for it now and not mid-request
+            warmup = classifier.tokenizer(
+                ["Deployed services with Docker."], ["This example is docker."],
+                return_tensors="pt").to(module.device)
+            with torch.inference_mode():
+                module(**warmup)
+            logger.info(f"Compiled {module.config.name_or_path} with torch.compile")
+        except Exception as e:
+            module.forward = eager_forward
+            logger.warning(f"torch.compile failed, running eagerly: {e}")
+
+    def load_nli_scorer(
+        self,
+        model_name: str,
+        use_gpu: bool = True,
+        batch_size: int = 32,
+        dtype: str = "float32",
+        backend: str = "torch",
+        onnx_model_dir: Optional[str] = None,
+        score_cache: Optional[ScoreCache] = None,
+        profile: Optional[InferenceProfile] = None
+    ) -> 'NLIScorer':
+        from .nli_scorer import NLIScorer
+        # shares model weights (and the reference) with the zero-shot pipeline
+        classifier = self.load_zero_shot_classifier(
+            model_name, use_gpu=use_gpu, dtype=dtype, backend=backend,
+            onnx_model_dir=onnx_model_dir, profile=profile)
+        if profile is not None:
+            profile = profile.for_backend(backend)
+        return NLIScorer.from_pipeline(
+            classifier, batch_size=batch_size, backend=backend, score_cache=score_cache,
+            profile=profile)
+
+    def load_embedding_encoder(self, model_name: str, use_gpu: bool = True) -> 'EmbeddingEncoder':
+        """shared bi-encoder for the NLI pre-filter, give it back with release_model"""
+        key = self.model_key(model_name, use_gpu)
+
+        with self._lock:
+            if key not in self._models:
+                from .embedding_prefilter import EmbeddingEncoder
+                self._models[key] = EmbeddingEncoder(model_name, device=key[1])
+                self._refs[key] = 0
+                logger.info(f"Loaded embedding model: {model_name} on {key[1]}")
+
+            self._refs[key] += 1
+            return self._models[key]
+
+    def release_model(self, model_name: str, use_gpu: bool = True, dtype: str = "float32",
+                      backend: str = "torch"):
+        key = self.model_key(model_name, use_gpu, dtype, backend)
+
+        with self._lock:
+            if key not in self._refs:
+                return
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                self._unload(key)
+
+    def unload_model(self, model_name: str, use_gpu: bool = True, dtype: str = "float32",
+                     backend: str = "torch"):
+        """drop the model regardless of outstanding references"""
+        with self._lock:
+            self._unload(self.model_key(model_name, use_gpu, dtype, backend))
+
+    def _unload(self, key: ModelKey):
+        if self._models.pop(key, None) is not None:
+            self._refs.pop(key, None)
+            gc.collect()
+            if self.check_gpu_availability():
+                import torch
+                torch.cuda.empty_cache()
+            logger.info(f"Unloaded model: {key[0]} ({key[1]}, {key[2]})")
+
+    def get_model(self, model_name: str, use_gpu: bool = True, dtype: str = "float32",
+                  backend: str = "torch") -> Optional[Any]:
+        return self._models.get(self.model_key(model_name, use_gpu, dtype, backend))
 
     def clear_cache(self):
-        self._models.clear()
+        with self._lock:
+            for key in list(self._models):
+                self._unload(key)
         self._nlp_model = None
         logger.info("Model cache cleared")
 
+    @staticmethod
+    def _model_memory_mb(model: Any) -> float:
+        module = getattr(model, "model", model)
+        if hasattr(module, "memory_mb"):
+            return module.memory_mb
+        # note: packed weights of dynamically quantized Linear layers aren't counted
+        tensors = list(module.parameters()) + list(module.buffers())
+        size = sum(t.numel() * t.element_size() for t in tensors)
+        return round(size / (1024 ** 2), 1)
+
     def get_cache_info(self) -> dict:
+        with self._lock:
+            models = [
+                {
+                    "model": model_name,
+                    "device": device,
+                    "dtype": dtype,
+                    "references": self._refs[(model_name, device, dtype)],
+                    "memory_mb": self._model_memory_mb(model)
+                }
+                for (model_name, device, dtype), model in self._models.items()
+            ]
+
         return {
-            "cached_models": list(self._models.keys()),
+            "cached_models": models,
+            "total_memory_mb": round(sum(m["memory_mb"] for m in models), 1),
             "spacy_loaded": self._nlp_model is not None,
             "gpu_available": self.check_gpu_availability()
         }
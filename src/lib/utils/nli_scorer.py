@@ -0,0 +1,209 @@
+"""
+Batched NLI entailment scoring for zero-shot classification
+"""
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from .result_cache import get_model_version
+from .score_cache import ScoreCache, make_score_key
+from .instrumentation import get_metrics
+from .inference_profile import InferenceProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HYPOTHESIS_TEMPLATE = "This example is {}."
+
+
+class NLIScorer:
+    """Scores (premise, label) pairs with an NLI cross-encoder.
+
+    Gives the same entailment scores as the transformers zero-shot pipeline with
+    multi_label=True, but tokenizes every distinct premise once and every label's
+    hypothesis once per scorer, sorts pairs by length to keep padding low and runs
+    the model in large batches.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        tokenizer: Any,
+        batch_size: int = 32,
+        hypothesis_template: str = DEFAULT_HYPOTHESIS_TEMPLATE,
+        backend: str = "torch",
+        score_cache: Optional[ScoreCache] = None,
+        profile: Optional[InferenceProfile] = None
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.hypothesis_template = hypothesis_template
+        self.backend = backend
+        self.score_cache = score_cache
+        self.profile = profile or InferenceProfile()
+        self.device = getattr(model, "device", torch.device("cpu"))
+        self.model_id = self._get_model_id()
+
+        self.entailment_id = self._get_entailment_id()
+        # same label pair the zero-shot pipeline softmaxes over in multi-label mode
+        self.contradiction_id = -1 if self.entailment_id == 0 else 0
+
+        # hypothesis token ids per label, reused across calls
+        self._hypothesis_ids: Dict[str, List[int]] = {}
+        self._split_encoding = self._check_split_encoding()
+        # model seconds per pair that missed the score cache, a moving average
+        self.seconds_per_pair: Optional[float] = None
+
+    @classmethod
+    def from_pipeline(cls, classifier: Any, **kwargs) -> 'NLIScorer':
+        return cls(classifier.model, classifier.tokenizer, **kwargs)
+
+    def _get_model_id(self) -> str:
+        revision = getattr(self.model.config, '_commit_hash', None)
+        if revision is None:
+            # local model dirs have no commit hash, their files' sizes and mtimes
+            # change when the model is retrained or replaced
+            revision = get_model_version(self.model.config.name_or_path)[:16]
+        # quantized backends and half precision give slightly different scores,
+        # keep them apart in the cache
+        model_id = f"{self.model.config.name_or_path}@{revision}/{self.backend}"
+        if self.profile.dtype != "float32":
+            model_id += f"/{self.profile.dtype}"
+        return model_id
+
+    def _get_entailment_id(self) -> int:
+        for label, idx in self.model.config.label2id.items():
+            if label.lower().startswith("entail"):
+                return idx
+        return -1
+
+    def score(self, premises: List[str], labels: List[str]) -> List[float]:
+        """entailment score of each (premise, label) pair, in input order"""
+        if len(premises) != len(labels):
+            raise ValueError("premises and labels must have the same length")
+        if not premises:
+            return []
+
+        metrics = get_metrics()
+        with metrics.span("nli_scoring", pairs=len(premises)):
+            return self._score(premises, labels, metrics)
+
+    def _score(self, premises: List[str], labels: List[str], metrics) -> List[float]:
+        if self.score_cache is None:
+            metrics.incr("nli_pairs_scored", len(premises))
+            return self._score_uncached(premises, labels)
+
+        keys = [
+            make_score_key(self.model_id, self.hypothesis_template, premise, label)
+            for premise, label in zip(premises, labels)
+        ]
+        cached = self.score_cache.get_many(keys)
+
+        # only pairs missing from the cache reach the model
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        metrics.incr("score_cache_hits", len(keys) - len(missing))
+        metrics.incr("score_cache_misses", len(missing))
+        metrics.incr("nli_pairs_scored", len(missing))
+        if missing:
+            new_scores = self._score_uncached(
+                [premises[i] for i in missing], [labels[i] for i in missing])
+            new_items = {keys[i]: score for i, score in zip(missing, new_scores)}
+            self.score_cache.put_many(new_items.items())
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    def _check_split_encoding(self) -> bool:
+        """whether pairs can be assembled from separately tokenized premise and
+        hypothesis, i.e. the result is identical to tokenizing the pair jointly"""
+        try:
+            premise = "Built REST APIs in Python and deployed them with Docker on AWS."
+            hypothesis = self.hypothesis_template.format("cloud computing")
+            joint = self.tokenizer(premise, hypothesis, truncation="only_first")
+            split = self._encode_split([premise], [0], [hypothesis])
+            return all(joint[key] == split[key][0] for key in split)
+        except Exception as e:
+            logger.debug(f"split pair encoding unavailable, tokenizing pairs jointly: {e}")
+            return False
+
+    def _encode_split(self, premises: List[str], premise_index: List[int],
+                      hypotheses: List[str]) -> Dict[str, List]:
+        """input ids of each (premises[premise_index[i]], hypotheses[i]) pair,
+        truncating the premise like truncation="only_first" does"""
+        tokenizer = self.tokenizer
+        premise_ids = tokenizer(premises, add_special_tokens=False)['input_ids']
+        missing = [h for h in dict.fromkeys(hypotheses) if h not in self._hypothesis_ids]
+        if missing:
+            for hypothesis, ids in zip(missing, tokenizer(missing, add_special_tokens=False)['input_ids']):
+                self._hypothesis_ids[hypothesis] = ids
+
+        max_length = tokenizer.model_max_length
+        special = tokenizer.num_special_tokens_to_add(pair=True)
+        with_types = "token_type_ids" in tokenizer.model_input_names
+        encodings = {"input_ids": [], "attention_mask": []}
+        if with_types:
+            encodings["token_type_ids"] = []
+
+        for index, hypothesis in zip(premise_index, hypotheses):
+            hypothesis_ids = self._hypothesis_ids[hypothesis]
+            first = premise_ids[index][:max(max_length - special - len(hypothesis_ids), 0)]
+            input_ids = tokenizer.build_inputs_with_special_tokens(first, hypothesis_ids)
+            encodings["input_ids"].append(input_ids)
+            encodings["attention_mask"].append([1] * len(input_ids))
+            if with_types:
+                encodings["token_type_ids"].append(
+                    tokenizer.create_token_type_ids_from_sequences(first, hypothesis_ids))
+        return encodings
+
+    def _encode_pairs(self, premises: List[str], labels: List[str]) -> Dict[str, List]:
+        hypotheses = [self.hypothesis_template.format(label) for label in labels]
+        if not self._split_encoding:
+            return self.tokenizer(premises, hypotheses, truncation="only_first")
+
+        # chunks repeat once per candidate label, tokenize each one only once
+        unique_premises = {}
+        premise_index = [unique_premises.setdefault(premise, len(unique_premises))
+                         for premise in premises]
+        return self._encode_split(list(unique_premises), premise_index, hypotheses)
+
+    def _score_uncached(self, premises: List[str], labels: List[str]) -> List[float]:
+        start = time.perf_counter()
+        encodings = self._encode_pairs(premises, labels)
+        lengths = [len(input_ids) for input_ids in encodings['input_ids']]
+
+        # shortest first so every batch pads to a similar length
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        scores = [0.0] * len(lengths)
+
+        self.model.eval()
+        with self.profile.context(self.device):
+            for batch_start in range(0, len(order), self.batch_size):
+                batch_ids = order[batch_start:batch_start + self.batch_size]
+                batch = self.tokenizer.pad(
+                    {key: [values[i] for i in batch_ids]
+                     for key, values in encodings.items()},
+                    return_tensors="pt"
+                ).to(self.device)
+
+                # tolist() waits for the GPU, so the span covers the whole forward pass
+                with get_metrics().span("nli_batch", size=len(batch_ids)):
+                    logits = self.model(**batch).logits
+                    entail_contr = logits[:, [self.contradiction_id, self.entailment_id]]
+                    batch_scores = entail_contr.float().softmax(dim=-1)[:, 1].tolist()
+
+                for i, batch_score in zip(batch_ids, batch_scores):
+                    scores[i] = batch_score
+
+        self._update_pair_cost((time.perf_counter() - start) / len(scores))
+        logger.debug(
+            f"NLI scored {len(scores)} pairs in batches of {self.batch_size}")
+        return scores
+
+    def _update_pair_cost(self, seconds_per_pair: float):
+        # moving average, so one slow call doesn't swing the estimate
+        if self.seconds_per_pair is None:
+            self.seconds_per_pair = seconds_per_pair
+        else:
+            self.seconds_per_pair = 0.8 * self.seconds_per_pair + 0.2 * seconds_per_pair
@@ -0,0 +1,189 @@
+"""
+Persistent cache of whole-resume analysis results, keyed by PDF content
+"""
+import os
+import json
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# bump when the shape or meaning of process_resume results changes
+RESULT_FORMAT_VERSION = 5
+
+# config fields that don't change what a resume's analysis looks like
+NON_RESULT_CONFIG_KEYS = {
+    'score_cache_path', 'score_cache_size', 'use_gpu', 'device', 'metrics_enabled',
+    'pdf_page_workers', 'pdf_parallel_min_pages', 'pdf_page_timeout',
+    'result_cache_path', 'result_cache_ttl', 'result_cache_max_mb', 'skill_embeddings_dir',
+    'taxonomy_cache_dir', 'inference_threads', 'inference_interop_threads', 'inference_compile',
+    'inference_mode', 'inference_profile_path', 'artifact_store_path',
+}
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def get_model_version(model_name: str) -> str:
+    """Best effort revision of a model: file sizes and mtimes of a local model dir,
+    the content of a single model file (e.g. role profiles), or the cached commit
+    of a HuggingFace hub model"""
+    model_path = Path(model_name)
+    if model_path.is_file():
+        return hash_file(str(model_path))
+    if model_path.is_dir():
+        files = sorted(
+            (str(p.relative_to(model_path)), p.stat().st_size, p.stat().st_mtime_ns)
+            for p in model_path.rglob("*") if p.is_file())
+        return hashlib.sha256(repr(files).encode("utf-8")).hexdigest()
+
+    hub_cache = os.environ.get("HF_HUB_CACHE") or os.path.join(
+        os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub")
+    ref = Path(hub_cache) / ("models--" + model_name.replace("/", "--")) / "refs" / "main"
+    if ref.is_file():
+        return ref.read_text().strip()
+    return "unknown"
+
+
+def make_result_fingerprint(config_dict: Dict[str, Any], skill_categories: Dict[str, List[str]],
+                            model_names: Iterable[str],
+                            skill_aliases: Optional[Dict[str, List[str]]] = None) -> str:
+    """everything a cached result depends on besides the PDF itself"""
+    config_dict = {key: value for key, value in config_dict.items()
+                   if key not in NON_RESULT_CONFIG_KEYS}
+    fingerprint = {
+        "format": RESULT_FORMAT_VERSION,
+        "config": config_dict,
+        "skills": skill_categories,
+        "aliases": skill_aliases or {},
+        "models": {name: get_model_version(name) for name in sorted(set(model_names))},
+    }
+    encoded = json.dumps(fingerprint, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite backed result store with TTL expiry and size-bounded LRU eviction"""
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_mb: float = 512):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, result BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._conn.commit()
+        logger.info(f"Opened result cache: {self.path}")
+
+    @staticmethod
+    def make_key(pdf_sha256: str, fingerprint: str) -> str:
+        # a changed fingerprint gives new keys, old entries simply age out
+        return hashlib.sha256(f"{pdf_sha256}\x1f{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created FROM results WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and self.ttl and row[1] < now - self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, result: Dict[str, Any]):
+        blob = zlib.compress(json.dumps(
+            result, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)", (key, blob, len(blob), now, now))
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl:
+            self._conn.execute(
+                "DELETE FROM results WHERE created < ?", (now - self.ttl,))
+
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # least recently used first, until the store fits again
+        excess = total - self.max_bytes
+        evicted = []
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used ASC"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} entries from result cache")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        total = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size_mb": round(size / 1024 ** 2, 2),
+            "max_mb": round(self.max_bytes / 1024 ** 2, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# open caches, one per file
+_result_caches: Dict[str, ResultCache] = {}
+
+
+def get_result_cache(path: Optional[str], ttl: Optional[float] = None,
+                     max_mb: float = 512) -> Optional[ResultCache]:
+    if not path:
+        return None
+    if path not in _result_caches:
+        _result_caches[path] = ResultCache(path, ttl, max_mb)
+    return _result_caches[path]
@@ -0,0 +1,118 @@
+"""
+Persistent cache for NLI entailment scores
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_score_key(model_id: str, hypothesis_template: str, premise: str, label: str) -> str:
+    """content-addressed key of one (premise, label) score"""
+    premise_hash = hashlib.sha256(premise.encode("utf-8")).hexdigest()
+    key = "\x1f".join([model_id, hypothesis_template, premise_hash, label])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """SQLite backed score store with size-bounded LRU eviction"""
+
+    def __init__(self, path: str, max_entries: int = 200_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key TEXT PRIMARY KEY, score REAL NOT NULL, last_used REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self._conn.commit()
+        logger.info(f"Opened NLI score cache: {self.path}")
+
+    def get_many(self, keys: List[str]) -> Dict[str, float]:
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            # stay well under sqlite's bound parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, score FROM scores WHERE key IN ({placeholders})", batch)
+                found.update(rows.fetchall())
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE scores SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found])
+                self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, float]]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores (key, score, last_used) VALUES (?, ?, ?)",
+                [(key, score, now) for key, score in items])
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM scores WHERE key IN ("
+                "SELECT key FROM scores ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,))
+            logger.info(
+                f"Evicted {count - self.max_entries} entries from NLI score cache")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM scores")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM scores").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# open caches, one per file
+_score_caches: Dict[str, ScoreCache] = {}
+
+
+def get_score_cache(path: Optional[str], max_entries: int = 200_000) -> Optional[ScoreCache]:
+    if not path:
+        return None
+    if path not in _score_caches:
+        _score_caches[path] = ScoreCache(path, max_entries)
+    return _score_caches[path]
@@ -0,0 +1,105 @@
+"""
+Import time breakdown for script.py --profile-startup
+"""
+import sys
+import time
+from collections import defaultdict
+from importlib.abc import Loader, MetaPathFinder
+from typing import Dict, List, Tuple
+
+
+class _TimedLoader(Loader):
+    """wraps a module's real loader to time its execution"""
+
+    def __init__(self, loader: Loader, name: str, profiler: 'ImportProfiler'):
+        self.loader = loader
+        self.name = name
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.profiler._enter()
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            # the module keeps its real loader, e.g. for importlib.resources
+            module.__loader__ = self.loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self.loader
+            self.profiler._exit(self.name, time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportProfiler(MetaPathFinder):
+    """Times every module imported after install(), like python -X importtime:
+    self time of the module body and cumulative time including the imports it
+    triggers. mark() records named startup phases in between."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.modules: List[Tuple[str, float, float]] = []  # (name, self s, cumulative s)
+        self.phases: List[Tuple[str, float]] = []
+        self._last_mark = self.start
+        self._children: List[float] = []
+
+    def install(self) -> 'ImportProfiler':
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        # let the real finders locate the module, then time its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, fullname, self)
+                return spec
+        return None
+
+    def _enter(self):
+        self._children.append(0.0)
+
+    def _exit(self, name: str, cumulative: float):
+        children = self._children.pop()
+        self.modules.append((name, cumulative - children, cumulative))
+        if self._children:
+            self._children[-1] += cumulative
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def by_package(self) -> Dict[str, float]:
+        """self time per top-level package, so nested imports aren't counted twice"""
+        totals = defaultdict(float)
+        for name, self_time, _ in self.modules:
+            totals[name.partition(".")[0]] += self_time
+        return dict(totals)
+
+    def report(self, top: int = 15) -> str:
+        lines = [f"startup: {time.perf_counter() - self.start:.3f}s total"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:32s} {seconds:8.3f}s")
+
+        lines.append(f"\nimports by package (self time, {len(self.modules)} modules):")
+        packages = sorted(self.by_package().items(), key=lambda x: x[1], reverse=True)
+        for package, seconds in packages[:top]:
+            lines.append(f"  {package:32s} {seconds:8.3f}s")
+
+        lines.append("\nslowest imports (cumulative):")
+        slowest = sorted(self.modules, key=lambda x: x[2], reverse=True)
+        for name, self_time, cumulative in slowest[:top]:
+            lines.append(f"  {name:48s} {cumulative:8.3f}s (self {self_time:.3f}s)")
+        return "\n".join(lines)
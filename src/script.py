@@ -1,22 +1,50 @@
-import re
-import subprocess
 import sys
+
+# installed before the other imports, so --profile-startup sees every one of them
+if "--profile-startup" in sys.argv:
+    from lib.utils.startup_profile import ImportProfiler
+    import_profiler = ImportProfiler().install()
+else:
+    import_profiler = None
+
+import re
 import os
 import json
+import time
 import logging
-from typing import List, Dict
-from lib.utils.model_utils import ModelManager
+import argparse
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from lib.utils.model_utils import get_model_manager
+from lib.utils.inference_profile import InferenceProfile
+from lib.utils.score_cache import get_score_cache
+from lib.utils.result_cache import get_result_cache, hash_file, make_result_fingerprint
+from lib.utils.artifact_store import (
+    decode_pair_scores, encode_pair_scores, get_artifact_store, make_artifact_fingerprint)
+from lib.utils.instrumentation import get_metrics, start_metrics_server
 from lib.config.skill_categories import SkillCategories
 from lib.config.model_config import ModelConfig
-from lib.processors.text_processor import TextProcessor
+from lib.processors.text_processor import TextCleaner, TextProcessor
+from lib.processors.resume_document import ResumeDocument
+from lib.processors.skill_taxonomy import (
+    TaxonomyError, default_skill_aliases, diff_taxonomies, get_skill_taxonomy,
+    validate_default_taxonomy)
+from lib.processors.skill_matcher import SkillMatcher
+from lib.processors.result_processor import JSONFileSink, open_result_sink, read_results
+from lib.processors.skill_index import SkillIndex, SkillIndexBuilder, QueryError
 from lib.extractors.text_extractor import TextExtractor
+from lib.extractors.role_predictor import SkillRolePredictor
 from lib.extractors.skill_extractor import RuleBasedSkillExtractor, ZeroShotSkillExtractor, HybridSkillExtractor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def run_retrieve_cookie_and_scraper(scraper_venv_python, query, location):
+def run_retrieve_cookie_and_scraper(scraper_venv_python, query, location, output_path="linkedin_jobs.json"):
     subprocess.run(
         [scraper_venv_python, "./scraper/retrieve_cookie.py"], check=True)
 
@@ -27,12 +55,25 @@ def run_retrieve_cookie_and_scraper(scraper_venv_python, query, location):
     env["LI_AT_COOKIE"] = li_at
     subprocess.run(
         [scraper_venv_python, "./scraper/scraper.py",
-            "--query", query, "--location", location],
+            "--query", query, "--location", location, "--output", output_path],
         env=env,
         check=True
     )
 
 
+def get_job_search_query(results: Dict, top_n: int = 2) -> str:
+    # first skills by matches descending, then by confidence descending
+    # i use this to append them to the predicted role as "machine learning engineer pytorch pandas"
+    top_skills = sorted(
+        results["skills"]["detailed_skills"],
+        key=lambda x: (-x.get("matches", 0), -x.get("confidence", 0.0))
+    )[:top_n]
+
+    top_skill_names = [skill["skill"] for skill in top_skills]
+    predicted_role = results["predicted_role"]["predicted_role"]
+    return predicted_role + " " + " ".join(top_skill_names)
+
+
 def print_jobs_from_json(json_path):
     with open(json_path, "r", encoding="utf-8") as f:
         jobs = json.load(f)
@@ -51,26 +92,136 @@ def print_jobs_from_json(json_path):
         print("-" * 40)
 
 
+def _create_document(text_processor: TextProcessor, config: ModelConfig, text: str,
+                     cleaner: Optional[TextCleaner] = None) -> ResumeDocument:
+    # cleaner: the TextCleaner text was already fed to, e.g. page by page
+    cleaned_text = cleaner.text if cleaner is not None else None
+    if config.mode == "rules":
+        line_breaks = cleaner.line_breaks if cleaner is not None else None
+        return text_processor.create_rules_document(text, cleaned_text, line_breaks)
+
+    # token budgeted chunks only need the skill classifier's tokenizer, not its weights
+    tokenizer = None
+    if config.chunk_token_budget:
+        tokenizer = get_model_manager().load_tokenizer(
+            config.skill_classifier_model)
+
+    return text_processor.create_document(
+        text, config.text_chunk_size, tokenizer=tokenizer, token_budget=config.chunk_token_budget,
+        text=cleaned_text)
+
+
+def _parse_pdf(pdf_path: str, text_extractor: TextExtractor, text_processor: TextProcessor,
+               rule_extractor: RuleBasedSkillExtractor, config: ModelConfig) -> Tuple[ResumeDocument, List[Dict]]:
+    """Document and rule-based skills of a PDF. Each page is cleaned and rule
+    matched as soon as it's parsed, only sentence splitting and chunking wait for
+    the last page; the result is the same as for the whole text at once."""
+    cleaner = TextCleaner()
+    match_stream = rule_extractor.match_stream()
+
+    def on_page(page_text: str):
+        match_stream.feed(cleaner.feed(page_text))
+
+    raw_text = text_extractor.extract_from_pdf(pdf_path, on_page=on_page)
+    document = _create_document(text_processor, config, raw_text, cleaner=cleaner)
+    return document, rule_extractor.extract_stream(document.text, match_stream)
+
+
+# per-process state of batch workers, see ResumeSkillExtractor.process_resumes
+_worker_state = {}
+
+
+def _init_resume_worker(config: ModelConfig, ship_metrics: bool = False,
+                        skill_categories: Optional[Dict[str, List[str]]] = None):
+    if config.metrics_enabled:
+        get_metrics().enable()
+    # pool processes send their metrics back with every result
+    _worker_state["ship_metrics"] = ship_metrics and config.metrics_enabled
+    _worker_state["text_extractor"] = TextExtractor(config, page_workers=1)
+    _worker_state["text_processor"] = TextProcessor(config.spacy_model)
+    _worker_state["config"] = config
+    _worker_state["rule_extractor"] = RuleBasedSkillExtractor(
+        config, skill_categories or SkillCategories.get_default_skills())
+
+
+def _prepare_resume(pdf_path: str, text: Optional[str] = None):
+    """CPU-bound part of the pipeline: PDF text (unless text is given), cleaning,
+    sentence splitting, chunking and rule-based matching"""
+    document, rule_based_skills, error = None, None, None
+    try:
+        if text is None:
+            document, rule_based_skills = _parse_pdf(
+                pdf_path, _worker_state["text_extractor"], _worker_state["text_processor"],
+                _worker_state["rule_extractor"], _worker_state["config"])
+        else:
+            document = _create_document(
+                _worker_state["text_processor"], _worker_state["config"], text)
+            rule_based_skills = _worker_state["rule_extractor"].extract(
+                document.text)
+    except Exception as e:
+        error = str(e)
+
+    metrics = None
+    if _worker_state["ship_metrics"]:
+        metrics = get_metrics().snapshot(reset=True)
+    return pdf_path, document, rule_based_skills, error, metrics
+
+
 class ResumeSkillExtractor:
     def setup_models(self):
         logger.info("Loading models...")
-        self.model_manager = ModelManager()
+        # process-wide registry, shared with the extractors
+        self.model_manager = get_model_manager()
         self.nlp = self.model_manager.load_spacy_model(self.config.spacy_model)
-        self.role_classifier = self.model_manager.load_zero_shot_classifier(
-            self.config.role_classifier_model, self.config.use_gpu)
-        self.skill_classifier = self.model_manager.load_zero_shot_classifier(
-            self.config.skill_classifier_model, self.config.use_gpu)
+        self.score_cache = get_score_cache(
+            self.config.score_cache_path, self.config.score_cache_size)
+        # skill-based role prediction needs no role model at all
+        if self.role_predictor_mode != "skills":
+            self._load_role_scorer()
+        # the skill classifier is loaded (once) by the zero-shot extractors
+        self.zsl_extractor.setup()
+        self.hybrid_extractor.zsl_extractor.setup()
         logger.info("Models loaded successfully!")
-
-    def __init__(self, config: ModelConfig = None):
-        self.config = config
-
-        # skills
-        self.skill_categories = SkillCategories.get_default_skills()
-        self.all_candidate_skills = SkillCategories.get_all_skills_flat(
-            self.skill_categories)
-        self.skill_to_category = SkillCategories.get_skill_to_category_mapping(
-            self.skill_categories)
+        logger.info(f"Model cache: {self.model_manager.get_cache_info()}")
+
+    def _load_role_scorer(self):
+        self.role_scorer = self.model_manager.load_nli_scorer(
+            self.config.role_classifier_model, self.config.use_gpu,
+            batch_size=self.config.nli_batch_size,
+            backend=self.config.inference_backend,
+            score_cache=get_score_cache(self.config.score_cache_path, self.config.score_cache_size),
+            profile=InferenceProfile.from_config(self.config))
+
+    def release_models(self):
+        if self.role_scorer is not None:
+            self.model_manager.release_model(
+                self.config.role_classifier_model, self.config.use_gpu,
+                dtype=self.config.inference_dtype, backend=self.config.inference_backend)
+            self.role_scorer = None
+        self.zsl_extractor.release()
+        self.hybrid_extractor.release()
+        self.text_extractor.close()
+
+    def __init__(self, config: ModelConfig = None, load_models: bool = True,
+                 skill_categories: Optional[Dict[str, List[str]]] = None):
+        # load_models=False leaves the NLI scorers unset (e.g. to plug in stubs) until
+        # first needed; mode="rules" never loads them
+        self.config = config = config or ModelConfig.get_default_config()
+        if config.mode not in ("full", "rules"):
+            raise ValueError(f"unknown mode: {config.mode}")
+        # the rules-only pipeline has no role model to fall back to
+        self.role_predictor_mode = "skills" if config.mode == "rules" else config.role_predictor
+        self.model_manager = get_model_manager()
+        self.role_scorer = None
+        if config.metrics_enabled:
+            get_metrics().enable()
+
+        # skills, e.g. SkillCategories.create_custom_categories(...) instead of the defaults
+        self.skill_categories = skill_categories or SkillCategories.get_default_skills()
+        self.skill_aliases = default_skill_aliases(self.skill_categories)
+        self.taxonomy = get_skill_taxonomy(
+            self.skill_categories, self.skill_aliases, cache_dir=config.taxonomy_cache_dir)
+        self.all_candidate_skills = self.taxonomy.names
 
         # extractors
         self.rule_extractor = RuleBasedSkillExtractor(
@@ -80,12 +231,41 @@ class ResumeSkillExtractor:
         self.hybrid_extractor = HybridSkillExtractor(
             config, self.skill_categories)
         self.text_extractor = TextExtractor(config)
+        self.role_predictor = None
+        if self.role_predictor_mode in ("skills", "hybrid"):
+            self.role_predictor = SkillRolePredictor.from_file(config.role_profiles_path)
+        elif self.role_predictor_mode != "nli":
+            raise ValueError(f"unknown role_predictor: {config.role_predictor}")
 
         # processors
         self.text_processor = TextProcessor(
             spacy_model=self.config.spacy_model)
 
-        self.setup_models()
+        # whole-resume results, keyed by PDF hash + everything the analysis depends on
+        self.result_cache = get_result_cache(
+            config.result_cache_path, config.result_cache_ttl, config.result_cache_max_mb)
+        self.result_fingerprint = None
+        if self.result_cache is not None:
+            model_names = []
+            if config.mode == "full":
+                model_names.append(config.skill_classifier_model)
+            if self.role_predictor_mode != "skills":
+                model_names.append(config.role_classifier_model)
+            if config.role_profiles_path is not None:
+                model_names.append(config.role_profiles_path)
+            self.result_fingerprint = make_result_fingerprint(
+                config.to_dict(), self.skill_categories, model_names, self.skill_aliases)
+
+        # per-resume intermediates, for incremental reanalysis after taxonomy changes
+        self.artifact_store = get_artifact_store(config.artifact_store_path)
+        self.artifact_fingerprint = None
+        if self.artifact_store is not None:
+            self.artifact_fingerprint = make_artifact_fingerprint(config.to_dict())
+            self.artifact_store.put_taxonomy(
+                self.taxonomy.digest, self.skill_categories, self.skill_aliases)
+
+        if load_models and config.mode == "full":
+            self.setup_models()
 
     def extract_skills_with_zsl(self, text: str) -> List[Dict]:
         return self.zsl_extractor.extract(text)
@@ -93,60 +273,62 @@ class ResumeSkillExtractor:
     def extract_skills_rule_based(self, text: str) -> List[Dict]:
         return self.rule_extractor.extract(text)
 
-    def hybrid_skill_extraction(self, text: str) -> Dict:
-        return self.hybrid_extractor.extract(text)
-
-    def classify_role(self, text: str) -> Dict:  # ZSL classification
-        candidate_roles = [
-            "Web Developer",
-            "Frontend Developer",
-            "Backend Developer",
-            "Frontend Engineer",
-            "Backend Engineer",
-            "Cloud Developer",
-            "SysAdmin",
-            "System Engineer",
-            "System Administrator",
-            "Cloud R&D Engineer",
-            "Full Stack Developer",
-            "Data Science",
-            "Machine Learning Engineer",
-            "AI Engineer",
-            "Artificial Intelligence Engineer",
-            "DevOps Engineer",
-            "Mobile Developer",
-            "UI/UX Designer",
-            "Software Engineer",
-            "Data Engineer",
-            "Cloud Engineer",
-            "Software Architect",
-            "Product Manager",
-            "Technical Lead",
-            "Cybersecurity Specialist",
-            "iOS Developer",
-            "Tehnical Lead",
-            "Platform Engineer",
-            "Data Engineer",
-            "Site Reliability Engineer"
-            "SRE",
-            "Cloud Architect",
-            "MLOps",
-            "Prompt Engineer",
-            "GenAI Engineer",
-            "Web3 Developer"
-        ]
-
-        text_sample = text[50:2500]
+    def hybrid_skill_extraction(self, text: str, rule_based_skills: List[Dict] = None,
+                                document: ResumeDocument = None, pair_scores: Optional[Dict] = None) -> Dict:
+        # mode="rules" never reaches the skill classifier, not even lazily
+        if self.config.mode == "rules":
+            return self.hybrid_extractor.extract_rules_only(text, rule_based_skills)
+        return self.hybrid_extractor.extract(
+            text, rule_based_skills=rule_based_skills, document=document, pair_scores=pair_scores)
+
+    def predict_role(self, text: str, document: ResumeDocument = None, skills: Dict = None,
+                     rule_based_skills: List[Dict] = None) -> Dict:
+        """role with the configured role_predictor; the skill based ones use the
+        extracted skills, computed here unless given"""
+        if self.role_predictor is None:
+            return self.classify_role(text, document)
+
+        if skills is None:
+            skills = self.hybrid_skill_extraction(text, rule_based_skills, document)
+        with get_metrics().span("skill_role_prediction"):
+            prediction = self.role_predictor.predict(skills)
+
+        # low confidence skill evidence, ask the role model
+        if (self.role_predictor_mode == "hybrid"
+                and prediction["confidence"] < self.config.role_fallback_confidence):
+            get_metrics().incr("role_nli_fallbacks")
+            fallback = self.classify_role(text, document)
+            if "error" not in fallback:
+                fallback["method"] = "nli"
+                fallback["skill_prediction"] = prediction
+                return fallback
+        return prediction
+
+    def classify_role(self, text: str, document: ResumeDocument = None) -> Dict:  # ZSL classification
+        candidate_roles = self.config.candidate_roles
 
         try:
-            result = self.role_classifier(text_sample, candidate_roles)
+            if self.role_scorer is None:
+                self._load_role_scorer()
+            chunks = self._role_chunks(text, document, len(candidate_roles))
+
+            # every (chunk, role) pair in one scoring call, entailment cached per pair
+            with get_metrics().span("classify_role", roles=len(candidate_roles), chunks=len(chunks)):
+                scores = self.role_scorer.score(
+                    [chunk for chunk in chunks for _ in candidate_roles],
+                    [role for _ in chunks for role in candidate_roles])
+
+            role_scores = self._aggregate_role_scores(chunks, candidate_roles, scores)
+            ranked = sorted(role_scores.items(),
+                            key=lambda x: x[1], reverse=True)
             return {
-                "predicted_role": result["labels"][0],
-                "confidence": result["scores"][0],
+                "predicted_role": ranked[0][0],
+                "confidence": ranked[0][1],
                 "top_3_roles": {
                     role: score
-                    for role, score in zip(result["labels"][:3], result["scores"][:3])
+                    for role, score in ranked[:3]
                 },
+                "chunks_scored": len(chunks),
             }
         except Exception as e:
             logger.error(f"Error in role classification: {e}")
@@ -156,6 +338,53 @@ class ResumeSkillExtractor:
                 "error": str(e),
             }
 
+    def _role_chunks(self, text: str, document: Optional[ResumeDocument], role_count: int) -> List[str]:
+        """evenly spaced chunks of the whole resume, as many as role_max_chunks and
+        the latency budget allow; the first chunk (headline, summary) is always kept"""
+        if document is not None and document.chunks:
+            chunks = document.chunks
+        else:
+            chunks = self.text_processor.create_chunks(text, self.config.text_chunk_size) or [text]
+
+        limit = max(self.config.role_max_chunks, 1)
+        budget_ms = self.config.role_latency_budget_ms
+        if budget_ms is not None:
+            affordable_pairs = budget_ms / 1000 / self._role_pair_cost()
+            limit = max(min(limit, int(affordable_pairs // role_count)), 1)
+
+        if len(chunks) <= limit:
+            return chunks
+        step = len(chunks) / limit
+        return [chunks[int(i * step)] for i in range(limit)]
+
+    def _role_pair_cost(self) -> float:
+        # model time per pair the scorer measured on uncached pairs (score cache hits
+        # would pull it towards zero), the conservative default before the first one
+        measured = getattr(self.role_scorer, "seconds_per_pair", None)
+        if measured is None:
+            return self.config.role_pair_cost_ms / 1000
+        return measured
+
+    def _aggregate_role_scores(self, chunks: List[str], candidate_roles: List[str],
+                               scores: List[float]) -> Dict[str, float]:
+        aggregation = self.config.role_aggregation
+        role_count = len(candidate_roles)
+        per_role = {
+            role: [scores[i * role_count + j] for i in range(len(chunks))]
+            for j, role in enumerate(candidate_roles)
+        }
+
+        if aggregation == "max":
+            return {role: max(values) for role, values in per_role.items()}
+        if aggregation == "mean":
+            return {role: sum(values) / len(values) for role, values in per_role.items()}
+        if aggregation == "length_weighted":
+            weights = [len(chunk) for chunk in chunks]
+            total = sum(weights) or 1
+            return {role: sum(w * v for w, v in zip(weights, values)) / total
+                    for role, values in per_role.items()}
+        raise ValueError(f"unknown role_aggregation: {aggregation}")
+
     def extract_experience_years(self, text: str) -> List[Dict]:
         patterns = [
             r"(\d+)\+?\s*years?\s*(?:of\s*)?experience",
@@ -182,45 +411,552 @@ class ResumeSkillExtractor:
     def process_resume(self, pdf_path: str) -> Dict:
         logger.info(f"Processing resume: {pdf_path}")
 
-        text = self.text_extractor.extract_from_pdf(pdf_path)
-        text = self.text_processor.clean_text(text)
-
-        skill_extraction = self.hybrid_skill_extraction(text)
-
-        role_prediction = self.classify_role(text)
+        with get_metrics().span("process_resume"):
+            pdf_sha256 = self._pdf_sha256(pdf_path)
+            cache_key = self._result_cache_key(pdf_sha256)
+            cached = self.get_cached_result(cache_key, pdf_path)
+            if cached is not None:
+                return cached
+
+            document, rule_based_skills = _parse_pdf(
+                pdf_path, self.text_extractor, self.text_processor, self.rule_extractor, self.config)
+
+            results = self.analyze_document(
+                document, pdf_path, rule_based_skills, pdf_sha256=pdf_sha256)
+            self.cache_result(cache_key, results)
+            return results
+
+    def _pdf_sha256(self, pdf_path: str) -> Optional[str]:
+        # only the result cache and the artifact store need it
+        if self.result_cache is None and self.artifact_store is None:
+            return None
+        return hash_file(pdf_path)
+
+    def _result_cache_key(self, pdf_sha256: Optional[str]) -> Optional[str]:
+        if self.result_cache is None or pdf_sha256 is None:
+            return None
+        return self.result_cache.make_key(pdf_sha256, self.result_fingerprint)
+
+    def get_cached_result(self, cache_key: Optional[str], pdf_path: str) -> Optional[Dict]:
+        if cache_key is None:
+            return None
+        results = self.result_cache.get(cache_key)
+        if results is None:
+            get_metrics().incr("result_cache_misses")
+            return None
+
+        # same content, possibly under another name (e.g. a re-uploaded temp file)
+        get_metrics().incr("result_cache_hits")
+        logger.info(f"Result cache hit for {pdf_path}")
+        results["file_path"] = pdf_path
+        return results
 
-        experience_info = self.extract_experience_years(text)
+    def cache_result(self, cache_key: Optional[str], results: Dict):
+        # a failed role prediction is worth retrying next time
+        if cache_key is not None and "error" not in results["predicted_role"]:
+            self.result_cache.put(cache_key, results)
+
+    def create_document(self, text: str) -> ResumeDocument:
+        return _create_document(self.text_processor, self.config, text)
+
+    def analyze_text(self, text: str, file_path: str) -> Dict:
+        return self.analyze_document(self.create_document(text), file_path)
+
+    def analyze_document(self, document: ResumeDocument, file_path: str,
+                         rule_based_skills: List[Dict] = None, pdf_sha256: Optional[str] = None,
+                         pair_scores: Optional[Dict] = None, role_prediction: Optional[Dict] = None) -> Dict:
+        """Skills, role and experience of a parsed resume. With pdf_sha256 and an
+        artifact store, the document, rule matches and NLI pair scores are stored
+        for reanalysis; pair_scores and role_prediction are the stored ones a
+        reanalysis passes back in."""
+        # the document is parsed once, every stage below reuses its text, sentences and chunks
+        text = document.text
+        metrics = get_metrics()
+        store_artifacts = pdf_sha256 is not None and self.artifact_store is not None
+        if pair_scores is None and store_artifacts:
+            pair_scores = {}
+
+        with metrics.span("analyze_document"):
+            skill_extraction = self.hybrid_skill_extraction(
+                text, rule_based_skills, document, pair_scores)
+
+            if role_prediction is None:
+                role_prediction = self.predict_role(text, document, skill_extraction)
+
+            with metrics.span("experience_regexes"):
+                experience_info = self.extract_experience_years(text)
+        metrics.incr("resumes_analyzed")
 
         results = {
-            "file_path": pdf_path,
+            "file_path": file_path,
             "predicted_role": role_prediction,
             "skills": skill_extraction,
             "experience": experience_info,
             "text_stats": {
                 "length": len(text),
                 "words": len(text.split()),
-                "sentences": len([sent for sent in self.nlp(text).sents]),
+                "sentences": document.sentence_count,
             }
         }
 
+        if store_artifacts:
+            self.store_artifacts(pdf_sha256, file_path, document, skill_extraction,
+                                 pair_scores, role_prediction)
         return results
 
+    def store_artifacts(self, pdf_sha256: str, file_path: str, document: ResumeDocument,
+                        skill_extraction: Dict, pair_scores: Dict, role_prediction: Dict):
+        # every extracted skill comes from a rule match, ZSL only verifies them
+        rule_matches = {skill['skill']: skill['positions']
+                        for skill in skill_extraction['detailed_skills'] if 'positions' in skill}
+        # only the NLI role doesn't depend on the skills, the others are recomputed
+        keep_role = self.role_predictor_mode == "nli" and "error" not in role_prediction
+
+        self.artifact_store.put(pdf_sha256, self.artifact_fingerprint, self.taxonomy.digest, {
+            "file_path": file_path,
+            "document": {
+                "text": document.text,
+                "sentence_spans": document.sentence_spans,
+                "chunks": document.chunks,
+                "chunk_size": document.chunk_size,
+                "chunk_spans": document.chunk_spans,
+            },
+            "rule_matches": rule_matches,
+            "pair_scores": encode_pair_scores(pair_scores),
+            "role": role_prediction if keep_role else None,
+        })
+
+    def reanalyze_stored(self) -> Iterator[Dict]:
+        """Results of every resume in the artifact store (for this config) under the
+        current skill taxonomy, without touching the PDFs. Per resume only the skills
+        added or changed since it was stored are matched again and only (chunk, skill)
+        pairs without a stored score reach the NLI model, so adding a few skills
+        costs a rule scan for them and NLI for the resumes that mention them."""
+        if self.artifact_store is None:
+            raise ValueError("reanalysis needs an artifact store, set artifact_store_path")
+
+        start = time.perf_counter()
+        # changed skills and a matcher for them alone, per stored taxonomy
+        diffs = {}
+        processed = failed = 0
+        stats = {"pairs_scored": 0}
+
+        for pdf_sha256, digest, artifact in self.artifact_store.iter_artifacts(self.artifact_fingerprint):
+            if digest not in diffs:
+                diffs[digest] = self._taxonomy_diff(digest)
+            changed, matcher = diffs[digest]
+
+            try:
+                result = self.reanalyze_artifact(pdf_sha256, artifact, changed, matcher, stats)
+                self.cache_result(self._result_cache_key(pdf_sha256), result)
+            except Exception as e:
+                logger.error(f"Failed to reanalyze {artifact['file_path']}: {e}")
+                result = {"file_path": artifact["file_path"], "error": str(e)}
+                failed += 1
+
+            processed += 1
+            yield result
+
+        elapsed = time.perf_counter() - start
+        self.reanalysis_stats = {
+            "processed": processed,
+            "failed": failed,
+            "changed_skills": sorted({skill for changed, _ in diffs.values() for skill in changed}),
+            "new_pairs_scored": stats["pairs_scored"],
+            "seconds": round(elapsed, 3),
+            "resumes_per_second": round(processed / elapsed, 3) if elapsed else 0.0,
+        }
+        logger.info(f"Reanalysis done: {self.reanalysis_stats}")
+
+    def _taxonomy_diff(self, digest: str):
+        if digest == self.taxonomy.digest:
+            return set(), None
+
+        stored = self.artifact_store.get_taxonomy(digest)
+        if stored is None:
+            # unknown old taxonomy, match everything again (NLI scores still hold)
+            changed, removed = list(self.taxonomy.names), []
+        else:
+            old_taxonomy = get_skill_taxonomy(*stored)
+            changed, removed = diff_taxonomies(old_taxonomy, self.taxonomy)
+        logger.info(f"taxonomy {digest[:12]} -> {self.taxonomy.digest[:12]}: "
+                    f"{len(changed)} skills added or changed, {len(removed)} removed")
+        matcher = SkillMatcher(self.taxonomy.subset(changed)) if changed else None
+        return set(changed), matcher
+
+    def reanalyze_artifact(self, pdf_sha256: str, artifact: Dict, changed_skills: set,
+                           matcher: Optional[SkillMatcher], stats: Dict[str, int] = None) -> Dict:
+        """stats, if given, gets the number of pairs the NLI model had to score added"""
+        stored = artifact["document"]
+        document = ResumeDocument(
+            raw_text=stored["text"],
+            text=stored["text"],
+            sentence_spans=[tuple(span) for span in stored["sentence_spans"]],
+            chunks=stored["chunks"],
+            chunk_size=stored["chunk_size"],
+            chunk_spans=[tuple(span) for span in stored["chunk_spans"]]
+        )
+
+        # stored matches of unchanged skills hold, changed and added skills are matched
+        # again; skills no longer in the taxonomy are dropped
+        matches = {}
+        for skill, spans in artifact["rule_matches"].items():
+            skill_id = self.taxonomy.canonical_id(skill)
+            if skill_id is not None and skill not in changed_skills:
+                matches[skill_id] = [tuple(span) for span in spans]
+        if matcher is not None:
+            with get_metrics().span("rule_matching"):
+                for skill, spans in matcher.find_all(document.text).items():
+                    matches[self.taxonomy.canonical_id(skill)] = spans
+        # taxonomy order, like a full run
+        rule_based_skills = self.rule_extractor.skills_from_matches(
+            document.text, dict(sorted(matches.items())))
+
+        pair_scores = decode_pair_scores(artifact["pair_scores"])
+        stored_pairs = len(pair_scores)
+        results = self.analyze_document(
+            document, artifact["file_path"], rule_based_skills, pdf_sha256=pdf_sha256,
+            pair_scores=pair_scores, role_prediction=artifact.get("role"))
+        if stats is not None:
+            stats["pairs_scored"] = stats.get("pairs_scored", 0) + len(pair_scores) - stored_pairs
+        return results
+
+    def process_resumes(self, pdf_paths: Iterable[str], workers: Optional[int] = None) -> Iterator[Dict]:
+        """Process many resumes, yielding each result as soon as it's ready.
+
+        PDF parsing, cleaning and rule-based matching run in a pool of worker
+        processes (forked, so they share the loaded weights copy-on-write), while
+        all NLI scoring stays in this process. A failing file yields a result with
+        an "error" key instead of aborting the batch. Resumes found in the result
+        cache are yielded first and never reach the workers.
+        """
+        pdf_paths = list(pdf_paths)
+        if workers is None:
+            workers = max((os.cpu_count() or 2) - 1, 1)
+
+        start = time.perf_counter()
+        processed = 0
+        failed = 0
+
+        pdf_hashes = {}
+        cache_keys = {}
+        cached_results = []
+        uncached_paths = []
+        for path in pdf_paths:
+            try:
+                pdf_hashes[path] = self._pdf_sha256(path)
+            except OSError:
+                # unreadable files are reported by the workers like any other failure
+                pdf_hashes[path] = None
+            cache_keys[path] = self._result_cache_key(pdf_hashes[path])
+            cached = self.get_cached_result(cache_keys[path], path)
+            if cached is None:
+                uncached_paths.append(path)
+            else:
+                cached_results.append(cached)
+
+        if workers <= 1 or not uncached_paths:
+            _init_resume_worker(self.config, skill_categories=self.skill_categories)
+            prepared = (_prepare_resume(path) for path in uncached_paths)
+        else:
+            prepared = self._prepare_in_pools(uncached_paths, workers)
+
+        try:
+            for result in cached_results:
+                processed += 1
+                yield result
+
+            for pdf_path, document, rule_based_skills, error, worker_metrics in prepared:
+                get_metrics().merge(worker_metrics)
+                if error is None:
+                    try:
+                        result = self.analyze_document(
+                            document, pdf_path, rule_based_skills, pdf_sha256=pdf_hashes[pdf_path])
+                        self.cache_result(cache_keys[pdf_path], result)
+                    except Exception as e:
+                        error = str(e)
+
+                if error is not None:
+                    logger.error(f"Failed to process {pdf_path}: {error}")
+                    result = {"file_path": pdf_path, "error": error}
+                    failed += 1
+                    get_metrics().incr("resumes_failed")
+
+                processed += 1
+                yield result
+
+                if processed % 100 == 0:
+                    elapsed = time.perf_counter() - start
+                    logger.info(f"Processed {processed}/{len(pdf_paths)} resumes "
+                                f"({processed / elapsed:.2f} resumes/s)")
+        finally:
+            prepared.close()
+
+        elapsed = time.perf_counter() - start
+        self.batch_stats = {
+            "processed": processed,
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+            "resumes_per_second": round(processed / elapsed, 3) if elapsed else 0.0,
+            "cached": len(cached_results)
+        }
+        logger.info(f"Batch done: {self.batch_stats}")
+
+    def _prepare_in_pools(self, pdf_paths: List[str], workers: int) -> Iterator[tuple]:
+        """_prepare_resume of every path in worker processes, in completion order.
+
+        A worker that dies (a segfaulting PDF parser, an OOM kill) breaks its whole
+        pool and fails every unfinished file with it. Those files go to a new pool;
+        one that was unfinished in two broken pools is retried alone, so a crash
+        there is its own and becomes its error result.
+        """
+        crashes = defaultdict(int)
+        pending = list(pdf_paths)
+        while pending:
+            pools = [[path] for path in pending if crashes[path] >= 2]
+            shared = [path for path in pending if crashes[path] < 2]
+            if shared:
+                pools.append(shared)
+            pending = []
+
+            for paths in pools:
+                executor = ProcessPoolExecutor(
+                    max_workers=min(workers, len(paths)), initializer=_init_resume_worker,
+                    initargs=(self.config, True, self.skill_categories))
+                try:
+                    futures = {executor.submit(_prepare_resume, path): path for path in paths}
+                    for future in as_completed(futures):
+                        path = futures[future]
+                        try:
+                            prepared = future.result()
+                        except BrokenProcessPool as e:
+                            crashes[path] += 1
+                            if len(paths) > 1:
+                                pending.append(path)
+                                continue
+                            prepared = path, None, None, f"worker process died: {e}", None
+                        except Exception as e:
+                            prepared = path, None, None, str(e), None
+                        yield prepared
+                finally:
+                    executor.shutdown(cancel_futures=True)
+
+            if pending:
+                logger.warning(f"Worker pool broke, retrying {len(pending)} unfinished resumes")
+                get_metrics().incr("worker_pool_restarts")
+
     def save_results(self, results: Dict, output_path: str):
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=4, default=str, ensure_ascii=False)
-        logger.info(f"Results saved to {output_path}")
+        with JSONFileSink(output_path) as sink:
+            sink.write(results)
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python script.py <path_to_pdf>")
+def run_batch(extractor: ResumeSkillExtractor, pdf_dir: str, output_path: str,
+              workers: Optional[int], compact: bool = False):
+    pdf_paths = sorted(str(p) for p in Path(pdf_dir).glob("*.pdf"))
+    if not pdf_paths:
+        print(f"[ERROR] No PDF files found in {pdf_dir}")
         sys.exit(1)
 
-    pdf = sys.argv[1]
+    # JSON Lines sinks append and flush each resume as soon as it's done
+    with open_result_sink(output_path, compact=compact) as sink:
+        for results in extractor.process_resumes(pdf_paths, workers=workers):
+            sink.write(results)
+
+    stats = extractor.batch_stats
+    print("\n======= BATCH STATISTICS =======")
+    print(f"Resumes processed: {stats['processed']} "
+          f"({stats['failed']} failed, {stats['cached']} from cache)")
+    print(f"Elapsed: {stats['seconds']:.2f}s")
+    print(f"Throughput: {stats['resumes_per_second']:.2f} resumes/s")
+    print(f"Results saved to {output_path}")
+
+
+def write_metrics(output_path: Optional[str]):
+    if not output_path:
+        return
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(get_metrics().to_otlp_json(), f, indent=2)
+    print("\n======= TIMINGS =======")
+    for name, span in get_metrics().get_summary()["spans"].items():
+        print(f"{name:22s} x{span['count']:<5d} {span['total_s']:.3f}s")
+    print(f"Metrics saved to {output_path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Extract skills, role and experience from PDF resumes")
+    parser.add_argument("pdf", nargs="?", help="path to a PDF resume")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="process every PDF in DIR and stream results as JSON Lines")
+    parser.add_argument("--output", default=None,
+                        help="output file, .jsonl (optionally .jsonl.gz / .jsonl.zst) is appended "
+                             "one resume per line, anything else is written as one JSON document")
+    parser.add_argument("--compact", action="store_true",
+                        help="drop match positions and intern repeated contexts in JSON Lines output")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for PDF parsing and rule matching in --batch mode")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="enable instrumentation and serve Prometheus metrics on this port")
+    parser.add_argument("--metrics-output", default=None,
+                        help="enable instrumentation and write spans and metrics as OTLP/JSON here")
+    parser.add_argument("--mode", choices=["full", "rules"], default="full",
+                        help="rules: rule-based skills, experience and a skills-based role only, "
+                             "without loading any model (for bulk screening)")
+    parser.add_argument("--artifacts", metavar="DB", default=None,
+                        help="store per-resume intermediates in this SQLite file for --reanalyze")
+    parser.add_argument("--reanalyze", action="store_true",
+                        help="re-run every resume stored in --artifacts against the current skill "
+                             "taxonomy, redoing only the work of added or changed skills")
+    parser.add_argument("--custom-skills", metavar="JSON", default=None,
+                        help="extra skills per category ({\"category\": [\"skill\", ...]}) merged "
+                             "into the default taxonomy")
+    parser.add_argument("--index", metavar="DIR", default=None,
+                        help="skill index directory for --build-index and --search")
+    parser.add_argument("--build-index", metavar="JSONL", nargs="+", default=None,
+                        help="index the skills of these --batch / --reanalyze results into --index, "
+                             "then exit (a resume in several files keeps its last result)")
+    parser.add_argument("--search", metavar="QUERY", default=None,
+                        help="print the best resumes in --index for a boolean skill query, e.g. "
+                             "'kubernetes>0.9 AND (terraform OR ansible) AND NOT category:frontend'")
+    parser.add_argument("--min-confidence", type=float, default=0.0,
+                        help="--search: confidence a skill term needs unless it sets its own")
+    parser.add_argument("--top-k", type=int, default=10,
+                        help="--search: number of resumes to print")
+    parser.add_argument("--build-taxonomy", action="store_true",
+                        help="validate the skill lists and write the compiled taxonomy, then exit")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print an import time breakdown once the models are loaded "
+                             "(without a PDF or --batch, exit after that)")
+    args = parser.parse_args()
+
+    if args.reanalyze and not args.artifacts:
+        parser.error("--reanalyze needs --artifacts")
+    if (args.build_index or args.search) and not args.index:
+        parser.error("--build-index and --search need --index")
+    if (not args.pdf and not args.batch and not args.reanalyze and not args.build_index
+            and not args.search and not args.build_taxonomy and not args.profile_startup):
+        parser.error("either a PDF path, --batch DIR or --reanalyze is required")
+    return args
+
+
+def load_custom_skills(path: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    if path is None:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return SkillCategories.create_custom_categories(json.load(f))
+
+
+def run_reanalysis(extractor: ResumeSkillExtractor, output_path: str, compact: bool = False):
+    with open_result_sink(output_path, compact=compact) as sink:
+        for results in extractor.reanalyze_stored():
+            sink.write(results)
+
+    stats = extractor.reanalysis_stats
+    print("\n======= REANALYSIS STATISTICS =======")
+    print(f"Resumes reanalyzed: {stats['processed']} ({stats['failed']} failed)")
+    print(f"Skills added or changed: {len(stats['changed_skills'])}")
+    print(f"New NLI pairs scored: {stats['new_pairs_scored']}")
+    print(f"Elapsed: {stats['seconds']:.2f}s ({stats['resumes_per_second']:.2f} resumes/s)")
+    print(f"Results saved to {output_path}")
+
+
+def build_skill_index(results_paths: List[str], index_dir: str,
+                      skill_categories: Optional[Dict[str, List[str]]] = None):
+    skill_to_category = None
+    if skill_categories is not None:
+        skill_to_category = SkillCategories.get_skill_to_category_mapping(skill_categories)
+    builder = SkillIndexBuilder(skill_to_category)
+    start = time.time()
+    for path in results_paths:
+        added = builder.add_results(read_results(path))
+        print(f"Indexed {added} resumes from {path}")
+    builder.save(index_dir)
+    stats = SkillIndex(index_dir).get_stats()
+    print(f"Skill index {index_dir}: {stats['resumes']} resumes, {stats['skills']} skills, "
+          f"{stats['postings']} postings ({time.time() - start:.2f}s)")
+
+
+def search_skill_index(index_dir: str, query: str, min_confidence: float, top_k: int):
+    index = SkillIndex(index_dir)
+    start = time.perf_counter()
+    try:
+        resume_ids, _ = index.query(query, min_confidence)
+        hits = index.search(query, min_confidence, top_k)
+    except QueryError as e:
+        print(f"[ERROR] invalid query: {e}")
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - start) * 1000
 
-    config = ModelConfig.get_accurate_config()
-    extractor = ResumeSkillExtractor(config=config)
-    results = extractor.process_resume(pdf)
+    print(f"\n======= {len(resume_ids)} MATCHING RESUMES ({elapsed_ms:.1f} ms) =======")
+    for hit in hits:
+        skills = ", ".join(f"{skill} {confidence:.2f}" for skill, confidence in hit["skills"].items())
+        print(f"{hit['score']:6.2f}  {hit['resume']}" + (f"  ({skills})" if skills else ""))
+
+
+def build_taxonomy(config: ModelConfig):
+    """validate the default skill lists (including their source) and compile them"""
+    problems = validate_default_taxonomy()
+    try:
+        taxonomy = get_skill_taxonomy(cache_dir=config.taxonomy_cache_dir)
+    except TaxonomyError as e:
+        problems.extend(e.problems)
+
+    if problems:
+        print("[ERROR] invalid skill taxonomy:")
+        for problem in dict.fromkeys(problems):
+            print(f"  {problem}")
+        sys.exit(1)
+    print(f"Skill taxonomy {taxonomy.digest[:16]}: {len(taxonomy.names)} skills, "
+          f"{len(taxonomy.skill_ids) - len(taxonomy.names)} aliases, "
+          f"{len(taxonomy.categories)} categories, {len(taxonomy.patterns)} patterns")
+    print(f"Saved to {config.taxonomy_cache_dir}")
+
+
+def main():
+    if import_profiler is not None:
+        import_profiler.mark("module imports")
+    args = parse_args()
+
+    if args.mode == "rules":
+        config = ModelConfig.get_rules_config()
+    else:
+        config = ModelConfig.get_accurate_config()
+    if args.build_taxonomy:
+        build_taxonomy(config)
+        return
+    if args.build_index:
+        build_skill_index(args.build_index, args.index, load_custom_skills(args.custom_skills))
+        return
+    if args.search:
+        search_skill_index(args.index, args.search, args.min_confidence, args.top_k)
+        return
+    config.metrics_enabled = bool(args.metrics_port or args.metrics_output)
+    config.artifact_store_path = args.artifacts
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    # a reanalysis loads the NLI models only if some pair has no stored score
+    extractor = ResumeSkillExtractor(
+        config=config, load_models=not args.reanalyze,
+        skill_categories=load_custom_skills(args.custom_skills))
+    if import_profiler is not None:
+        import_profiler.mark("extractor and model setup")
+        print(import_profiler.report())
+        if not args.pdf and not args.batch:
+            return
+
+    if args.reanalyze:
+        run_reanalysis(extractor, args.output or "resume_reanalysis_results.jsonl", compact=args.compact)
+        write_metrics(args.metrics_output)
+        return
+
+    if args.batch:
+        output_path = args.output or "resume_analysis_zsl_results.jsonl"
+        run_batch(extractor, args.batch, output_path,
+                  args.workers, compact=args.compact)
+        write_metrics(args.metrics_output)
+        return
+
+    results = extractor.process_resume(args.pdf)
     predicted_role = results['predicted_role']['predicted_role']
     print("\n======= PREDICTED ROLE =======")
     print(f"{predicted_role}")
@@ -240,17 +976,11 @@ def main():
     print(f"Zero-shot detected: {stats['zsl_count']}")
     print(f"Rule-based detected: {stats['rule_based_count']}\n")
 
-    extractor.save_results(results, "resume_analysis_zsl_results.json")
-
-    # first skills by matches descending, then by confidence descending
-    # i use this to append them to the predicted role as "machine learning engineer pytorch pandas"
-    top_skills = sorted(
-        results["skills"]["detailed_skills"],
-        key=lambda x: (-x.get("matches", 0), -x.get("confidence", 0.0))
-    )[:2]
+    with open_result_sink(args.output or "resume_analysis_zsl_results.json", compact=args.compact) as sink:
+        sink.write(results)
+    write_metrics(args.metrics_output)
 
-    top_skill_names = [skill["skill"] for skill in top_skills]
-    extended_predicted_role = predicted_role + " " + " ".join(top_skill_names)
+    extended_predicted_role = get_job_search_query(results)
 
     # scraper python interpreter from its own virtual env
     scraper_venv_python = "scraper/scraper_venv/bin/python"
@@ -0,0 +1,340 @@
+"""
+Async HTTP service around ResumeSkillExtractor
+
+    python3 src/server.py --port 8000 --workers 4
+
+POST /analyze, /skills and /role take a PDF (multipart "file" field or an
+application/pdf body) or raw text (JSON {"text": ...} or a text/plain body).
+GET /health reports model and batching state, GET /metrics Prometheus text.
+"""
+import os
+import time
+import asyncio
+import functools
+import hashlib
+import logging
+import argparse
+import tempfile
+import multiprocessing
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from lib.config.model_config import ModelConfig
+from lib.processors.resume_document import ResumeDocument
+from lib.utils.instrumentation import TIME_BUCKETS, get_metrics
+from lib.utils.micro_batcher import MicroBatcher
+from script import ResumeSkillExtractor, _init_resume_worker, _prepare_resume
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeService:
+    """Shared state of the service: one extractor whose NLI scorers go through
+    micro batchers, a process pool for PDF/spaCy/rule work and a thread pool
+    for the (blocking) model stages"""
+
+    def __init__(self, config: ModelConfig, workers: int, threads: int,
+                 max_batch_size: int, max_wait_ms: float):
+        self.config = config
+        self.extractor = ResumeSkillExtractor(config=config)
+
+        # one batcher per model, so every request on a model shares its batches
+        self.batchers: Dict[int, MicroBatcher] = {}
+        extractor = self.extractor
+        if extractor.role_scorer is not None:
+            extractor.role_scorer = self._batched(
+                extractor.role_scorer, max_batch_size, max_wait_ms)
+        for zsl_extractor in (extractor.zsl_extractor, extractor.hybrid_extractor.zsl_extractor):
+            # mode="rules" loads no skill classifier
+            if zsl_extractor.scorer is None:
+                continue
+            zsl_extractor.scorer = self._batched(
+                zsl_extractor.scorer, max_batch_size, max_wait_ms)
+
+        self.workers = workers
+        self.process_pool = None
+        if workers > 1:
+            self.process_pool = self._new_process_pool()
+        else:
+            _init_resume_worker(config)
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="resume-analysis")
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        # forkserver, not fork: by the first request the batcher and analysis threads
+        # (and torch's pools) run, a forked child could inherit one of their locks held.
+        # The workers need no model, only script's imports, preloaded by the fork server
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload(["script"])
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=mp_context,
+            initializer=_init_resume_worker, initargs=(self.config, True))
+
+    def _batched(self, scorer, max_batch_size: int, max_wait_ms: float) -> MicroBatcher:
+        key = id(scorer.model)
+        if key not in self.batchers:
+            self.batchers[key] = MicroBatcher(scorer, max_batch_size, max_wait_ms)
+        return self.batchers[key]
+
+    async def prepare(self, pdf_bytes: Optional[bytes], text: Optional[str]) -> Tuple[ResumeDocument, list]:
+        """PDF text, cleaning, chunking and rule matching, off the event loop"""
+        loop = asyncio.get_running_loop()
+        pdf_path = None
+        if pdf_bytes is not None:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                tmp_file.write(pdf_bytes)
+                pdf_path = tmp_file.name
+
+        try:
+            if self.process_pool is not None:
+                try:
+                    prepared = await loop.run_in_executor(
+                        self.process_pool, _prepare_resume, pdf_path, text)
+                except BrokenProcessPool:
+                    # a worker died (e.g. a crashing PDF parser), later requests get a new pool
+                    broken, self.process_pool = self.process_pool, self._new_process_pool()
+                    broken.shutdown(wait=False)
+                    raise
+            else:
+                prepared = await loop.run_in_executor(
+                    self.thread_pool, _prepare_resume, pdf_path, text)
+        finally:
+            if pdf_path is not None:
+                os.remove(pdf_path)
+
+        _, document, rule_based_skills, error, worker_metrics = prepared
+        get_metrics().merge(worker_metrics)
+        if error is not None:
+            raise ValueError(error)
+        return document, rule_based_skills
+
+    async def run(self, func, *args):
+        """run a blocking model stage on the analysis threads"""
+        return await asyncio.get_running_loop().run_in_executor(self.thread_pool, func, *args)
+
+    def cache_key(self, pdf_bytes: Optional[bytes]) -> Optional[str]:
+        if pdf_bytes is None or self.extractor.result_cache is None:
+            return None
+        return self.extractor.result_cache.make_key(
+            hashlib.sha256(pdf_bytes).hexdigest(), self.extractor.result_fingerprint)
+
+    def close(self):
+        if self.process_pool is not None:
+            self.process_pool.shutdown(cancel_futures=True)
+        self.thread_pool.shutdown(cancel_futures=True)
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+async def read_input(request: Request) -> Tuple[Optional[bytes], Optional[str], str]:
+    """(pdf bytes, text, file name) from a multipart upload, a PDF body, JSON or plain text"""
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is not None and hasattr(upload, "read"):
+            return await upload.read(), None, upload.filename or "upload.pdf"
+        if form.get("text"):
+            return None, str(form["text"]), "text"
+    elif content_type.startswith("application/pdf"):
+        return await request.body(), None, "upload.pdf"
+    elif content_type.startswith("application/json"):
+        payload = await request.json()
+        if isinstance(payload, dict) and payload.get("text"):
+            return None, str(payload["text"]), "text"
+    else:
+        body = await request.body()
+        if body.strip():
+            return None, body.decode("utf-8", errors="replace"), "text"
+
+    raise ValueError("expected a PDF (multipart 'file' or application/pdf body) or text")
+
+
+def error_response(error: Exception, status_code: int = 400) -> JSONResponse:
+    return JSONResponse({"error": str(error)}, status_code=status_code)
+
+
+def internal_error(error: Exception) -> JSONResponse:
+    logger.exception(f"analysis failed: {error}")
+    get_metrics().incr("http_internal_errors")
+    return error_response(error, 500)
+
+
+def timed(endpoint):
+    """Request latency histogram per endpoint. Spans are thread-local and would
+    interleave between coroutines on the event loop, so handlers aren't spans."""
+    name = endpoint.__name__
+
+    @functools.wraps(endpoint)
+    async def wrapper(request: Request):
+        start = time.perf_counter()
+        try:
+            return await endpoint(request)
+        finally:
+            metrics = get_metrics()
+            metrics.incr(f"http_{name}_requests")
+            metrics.observe(f"http_{name}_latency_seconds",
+                            time.perf_counter() - start, TIME_BUCKETS)
+
+    return wrapper
+
+
+@timed
+async def analyze(request: Request) -> JSONResponse:
+    service: ResumeService = request.app.state.service
+    extractor = service.extractor
+    try:
+        pdf_bytes, text, file_name = await read_input(request)
+    except ValueError as e:
+        return error_response(e)
+
+    cache_key = service.cache_key(pdf_bytes)
+    cached = extractor.get_cached_result(cache_key, file_name)
+    if cached is not None:
+        return JSONResponse(cached)
+
+    try:
+        document, rule_based_skills = await service.prepare(pdf_bytes, text)
+    except ValueError as e:
+        return error_response(e, 422)
+    except Exception as e:
+        return internal_error(e)
+
+    try:
+        results = await service.run(
+            extractor.analyze_document, document, file_name, rule_based_skills)
+    except Exception as e:
+        return internal_error(e)
+    extractor.cache_result(cache_key, results)
+    return JSONResponse(results)
+
+
+@timed
+async def skills(request: Request) -> JSONResponse:
+    service: ResumeService = request.app.state.service
+    try:
+        pdf_bytes, text, _ = await read_input(request)
+        document, rule_based_skills = await service.prepare(pdf_bytes, text)
+    except ValueError as e:
+        return error_response(e, 422)
+    except Exception as e:
+        return internal_error(e)
+
+    try:
+        results = await service.run(
+            service.extractor.hybrid_skill_extraction, document.text, rule_based_skills, document)
+    except Exception as e:
+        return internal_error(e)
+    return JSONResponse(results)
+
+
+@timed
+async def role(request: Request) -> JSONResponse:
+    service: ResumeService = request.app.state.service
+    try:
+        pdf_bytes, text, _ = await read_input(request)
+        document, rule_based_skills = await service.prepare(pdf_bytes, text)
+    except ValueError as e:
+        return error_response(e, 422)
+    except Exception as e:
+        return internal_error(e)
+
+    extractor = service.extractor
+    try:
+        skills = None
+        if service.config.mode == "rules":
+            # the skills based role predictor on rules-only skills, no model involved
+            skills = await service.run(
+                extractor.hybrid_skill_extraction, document.text, rule_based_skills, document)
+        results = await service.run(
+            extractor.predict_role, document.text, document, skills, rule_based_skills)
+    except Exception as e:
+        return internal_error(e)
+    return JSONResponse(results)
+
+
+async def health(request: Request) -> JSONResponse:
+    service: ResumeService = request.app.state.service
+    return JSONResponse({
+        "status": "ok",
+        "models": service.extractor.model_manager.get_cache_info(),
+        "batchers": [batcher.get_stats() for batcher in service.batchers.values()],
+        "result_cache": (service.extractor.result_cache.get_stats()
+                         if service.extractor.result_cache is not None else None),
+    })
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(get_metrics().to_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+
+def create_app(config: ModelConfig = None, workers: int = 2, threads: int = 16,
+               max_batch_size: int = 256, max_wait_ms: float = 10.0) -> Starlette:
+    config = config or ModelConfig.get_accurate_config()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.service = ResumeService(
+            config, workers, threads, max_batch_size, max_wait_ms)
+        logger.info("Resume service ready")
+        try:
+            yield
+        finally:
+            app.state.service.close()
+
+    return Starlette(
+        routes=[
+            Route("/analyze", analyze, methods=["POST"]),
+            Route("/skills", skills, methods=["POST"]),
+            Route("/role", role, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="HTTP service for resume skill, role and experience extraction")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) - 1, 1),
+                        help="processes for PDF parsing, spaCy and rule matching")
+    parser.add_argument("--threads", type=int, default=16,
+                        help="concurrent requests in the model stages")
+    parser.add_argument("--max-batch-size", type=int, default=256,
+                        help="NLI pairs that trigger a micro batch right away")
+    parser.add_argument("--max-wait-ms", type=float, default=10.0,
+                        help="how long a micro batch waits for more requests")
+    parser.add_argument("--metrics", action="store_true",
+                        help="enable instrumentation for /metrics")
+    parser.add_argument("--mode", choices=["full", "rules"], default="full",
+                        help="rules: rule-based analysis only, no model is loaded")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.mode == "rules":
+        config = ModelConfig.get_rules_config()
+    else:
+        config = ModelConfig.get_accurate_config()
+    config.metrics_enabled = args.metrics
+    app = create_app(config, args.workers, args.threads,
+                     args.max_batch_size, args.max_wait_ms)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
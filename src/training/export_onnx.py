@@ -0,0 +1,91 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
+
+from lib.utils.inference_backends import export_onnx, get_onnx_model_dir  # noqa: E402
+from lib.utils.model_utils import get_model_manager  # noqa: E402
+from samples import resume_text, candidate_skills  # noqa: E402
+
+model_path = Path(__file__).parent.resolve() / \
+    "./skill_extractor_zsl_model"
+model_path = model_path.resolve()
+
+# === CONFIG ===
+THRESHOLD = 0.85  # same as ModelConfig.confidence_threshold
+TOLERANCE = 0.05  # max allowed score difference vs. fp32
+
+
+def score_sample(model_name, backend):
+    manager = get_model_manager()
+    scorer = manager.load_nli_scorer(model_name, use_gpu=False, backend=backend)
+
+    premises = [resume_text] * len(candidate_skills)
+    scorer.score(premises[:1], candidate_skills[:1])  # warm up
+
+    start = time.perf_counter()
+    scores = scorer.score(premises, candidate_skills)
+    elapsed = time.perf_counter() - start
+
+    manager.release_model(model_name, use_gpu=False, backend=backend)
+    return scores, elapsed / len(candidate_skills)
+
+
+def check_backends(model_name, backends, tolerance):
+    reference, reference_latency = score_sample(model_name, "torch")
+    print(f"torch fp32: {reference_latency * 1000:.1f} ms/pair")
+
+    ok = True
+    for backend in backends:
+        scores, latency = score_sample(model_name, backend)
+        max_diff = max(abs(a - b) for a, b in zip(reference, scores))
+        flipped = [
+            skill for skill, a, b in zip(candidate_skills, reference, scores)
+            if (a >= THRESHOLD) != (b >= THRESHOLD)
+        ]
+
+        print(f"\n{backend}: {latency * 1000:.1f} ms/pair "
+              f"({reference_latency / latency:.2f}x vs fp32)")
+        print(f"  max score difference: {max_diff:.4f} (tolerance {tolerance})")
+        print(f"  decisions flipped at {THRESHOLD}: {flipped or 'none'}")
+
+        if max_diff > tolerance:
+            ok = False
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the NLI model to ONNX and check CPU backends against fp32")
+    parser.add_argument("--model", default=str(model_path),
+                        help="model dir or HuggingFace name to export")
+    parser.add_argument("--output", default=None,
+                        help="ONNX output dir (default: <model dir>_onnx)")
+    parser.add_argument("--no-quantize", action="store_true",
+                        help="skip the int8 ONNX copy")
+    parser.add_argument("--skip-export", action="store_true",
+                        help="only run the accuracy check")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        output_dir = args.output or get_onnx_model_dir(args.model)
+        export_onnx(args.model, output_dir, quantize=not args.no_quantize)
+        print(f"ONNX model saved to {output_dir}")
+
+    # the onnx backend only reads the default export location
+    backends = ["torch_int8"]
+    if args.output is None:
+        backends.append("onnx")
+
+    if not check_backends(args.model, backends, args.tolerance):
+        print("\n[ERROR] a backend drifted beyond tolerance from fp32")
+        sys.exit(1)
+    print("\nAll backends within tolerance")
+
+
+if __name__ == "__main__":
+    main()
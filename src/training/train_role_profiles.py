@@ -0,0 +1,61 @@
+import argparse
+import csv
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
+
+from lib.extractors.role_predictor import SkillRolePredictor, fit_role_profiles, save_role_profiles  # noqa: E402
+from lib.processors.result_processor import read_results  # noqa: E402
+
+# === CONFIG ===
+OUTPUT_PATH = Path(__file__).parent.resolve() / "role_profiles.json"
+
+
+def load_labeled_skills(results_path, labels_path):
+    """(skills results, roles) of the resumes in labels_path, a CSV of file,role
+    rows matched by file name against a --batch results .jsonl"""
+    with open(labels_path, newline="", encoding="utf-8") as f:
+        labels = {Path(row["file"]).name: row["role"] for row in csv.DictReader(f)}
+
+    skill_results, roles = [], []
+    for result in read_results(results_path):
+        role = labels.get(Path(result["file_path"]).name)
+        if role is not None and "skills" in result:
+            skill_results.append(result["skills"])
+            roles.append(role)
+    return skill_results, roles
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Learn skill-to-role profiles for role_predictor='skills' / 'hybrid'")
+    parser.add_argument("--results", required=True,
+                        help="results .jsonl written by script.py --batch")
+    parser.add_argument("--labels", required=True,
+                        help="CSV with file,role columns")
+    parser.add_argument("--output", default=str(OUTPUT_PATH))
+    parser.add_argument("--regularization", type=float, default=1.0,
+                        help="inverse regularization strength (C) of the logistic regression")
+    args = parser.parse_args()
+
+    skill_results, roles = load_labeled_skills(args.results, args.labels)
+    if len(set(roles)) < 2:
+        print("[ERROR] need labeled resumes of at least two roles")
+        sys.exit(1)
+    print(f"{len(roles)} labeled resumes: {dict(Counter(roles))}")
+
+    profiles = fit_role_profiles(skill_results, roles, args.regularization)
+    save_role_profiles(args.output, profiles)
+
+    # training accuracy, a sanity check rather than an estimate
+    predictor = SkillRolePredictor(profiles)
+    correct = sum(predictor.predict(skills)["predicted_role"] == role
+                  for skills, role in zip(skill_results, roles))
+    print(f"training accuracy: {correct / len(roles):.3f}")
+    print(f"Role profiles saved to {args.output}, set role_profiles_path in ModelConfig to use them")
+
+
+if __name__ == "__main__":
+    main()
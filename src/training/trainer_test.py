@@ -1,6 +1,7 @@
 from transformers import pipeline
 from sklearn.metrics import precision_recall_fscore_support
 from pathlib import Path
+from samples import resume_text, candidate_skills
 
 model_path = Path(__file__).parent.resolve() / \
     "./skill_extractor_zsl_model"
@@ -22,17 +23,6 @@ zsl = pipeline("zero-shot-classification",
 #     "Frontend development", "Observability", "Microservices"
 # ]
 
-resume_text = """
-    Seasoned engineer with 5+ years building and scaling distributed backend systems. Played a key role in refactoring legacy monoliths into microservice-based architecture using Spring Boot and Docker. Designed REST and GraphQL APIs, integrated with PostgreSQL and Redis, and maintained real-time data pipelines using Kafka and Airflow. Championed CI/CD adoption with GitHub Actions and Terraform for AWS deployments. Collaborated closely with SRE teams on observability stack (Prometheus, Grafana, ELK). Recently led backend modernization effort, introducing gRPC, service mesh patterns, and zero-downtime rollouts. Actively contributed to tech debt reduction and performance tuning across multiple services.
-"""
-candidate_skills = [
-    "Backend development", "Spring Boot", "Docker", "Microservices", "GraphQL",
-    "REST APIs", "PostgreSQL", "Redis", "Kafka", "Airflow",
-    "CI/CD", "GitHub Actions", "Terraform", "AWS", "Prometheus",
-    "Grafana", "ELK stack", "gRPC", "Service Mesh", "Performance Optimization",
-    "Software Architecture", "Game Development", "C/C++", "Algorithms", "Computer Architecture", "Assembly (NASM/TASM)", "ChatGPT Professional UAB Graduate", "Godot", "Unity Engine", "Formal Languages & Automata", "DevOps", "Real-time systems", "SRE", "Distributed Systems"
-]
-
 # Run inference
 results = zsl(resume_text, candidate_skills, multi_label=True)
 
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the code imports itself as lib.*, the way src/script.py runs it
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
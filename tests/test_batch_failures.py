@@ -0,0 +1,44 @@
+import os
+import shutil
+
+import script
+from lib.config.model_config import ModelConfig
+from script import ResumeSkillExtractor
+
+RESUMES = os.path.join(os.path.dirname(__file__), "..", "resumes")
+prepare_resume = script._prepare_resume
+
+
+def crashing_prepare_resume(pdf_path, text=None):
+    # a worker killed mid-file, like a segfaulting PDF parser or the OOM killer
+    if "crash" in os.path.basename(pdf_path):
+        os._exit(1)
+    return prepare_resume(pdf_path, text)
+
+
+crashing_prepare_resume.__qualname__ = crashing_prepare_resume.__name__ = "_prepare_resume"
+crashing_prepare_resume.__module__ = "script"
+
+
+def test_dead_worker_fails_only_its_file(tmp_path, monkeypatch):
+    pdfs = sorted(name for name in os.listdir(RESUMES) if name.endswith(".pdf"))[:4]
+    paths = []
+    for i, name in enumerate(pdfs):
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join(RESUMES, name), paths[-1])
+        if i == 1:
+            paths.append(str(tmp_path / "crash.pdf"))
+            shutil.copy(os.path.join(RESUMES, name), paths[-1])
+
+    config = ModelConfig.get_rules_config()
+    config.result_cache_path = None
+    extractor = ResumeSkillExtractor(config=config)
+    # the pool pickles _prepare_resume by name, its forked workers see the patch
+    monkeypatch.setattr(script, "_prepare_resume", crashing_prepare_resume)
+
+    results = {result["file_path"]: result for result in extractor.process_resumes(paths, workers=2)}
+
+    assert results.keys() == set(paths)
+    assert "worker process died" in results[str(tmp_path / "crash.pdf")]["error"]
+    assert all("error" not in result for path, result in results.items() if "crash" not in path)
+    assert extractor.batch_stats["failed"] == 1
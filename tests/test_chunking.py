@@ -0,0 +1,64 @@
+import random
+import re
+
+import pytest
+
+from lib.processors.text_processor import TextProcessor
+
+
+class SubwordTokenizer:
+    """words split into 3 char tokens, with offsets like a fast tokenizer"""
+
+    is_fast = True
+
+    def __init__(self, fast: bool = True):
+        self.is_fast = fast
+
+    def _offsets(self, text):
+        return [(start, min(start + 3, word.end()))
+                for word in re.finditer(r"\S+", text) for start in range(word.start(), word.end(), 3)]
+
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=False):
+        encoded = {"input_ids": [[0] * len(self._offsets(text)) for text in texts]}
+        if return_offsets_mapping:
+            assert self.is_fast
+            encoded["offset_mapping"] = [self._offsets(text) for text in texts]
+        return encoded
+
+
+def chunk(text, tokenizer, budget):
+    processor = TextProcessor()
+    # one sentence per line, some far over the budget (unpunctuated bullet lists)
+    spans, start = [], 0
+    for line in text.split("\n"):
+        spans.append((start, start + len(line)))
+        start += len(line) + 1
+    lengths = processor.count_tokens(tokenizer, [text[s:e] for s, e in spans])
+    pieces, piece_lengths = processor.split_long_spans(tokenizer, text, spans, lengths, budget)
+    return processor.chunk_sentence_spans(pieces, budget, piece_lengths), pieces
+
+
+@pytest.mark.parametrize("fast", [True, False])
+@pytest.mark.parametrize("seed", range(20))
+def test_no_chunk_exceeds_the_token_budget(seed, fast):
+    rng = random.Random(seed)
+    words = ["python", "kubernetes", "ci", "terraform", "a", "microservices", "x" * rng.randint(1, 40)]
+    text = "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(1, 120)))
+                     for _ in range(rng.randint(1, 6)))
+    tokenizer = SubwordTokenizer(fast)
+    budget = rng.randint(16, 64)
+
+    chunks, pieces = chunk(text, tokenizer, budget)
+
+    for start, end in chunks:
+        assert len(tokenizer._offsets(text[start:end])) <= budget
+    # pieces keep every word, in order, once
+    assert " ".join(text[start:end] for start, end in pieces).split() == text.split()
+
+
+def test_pieces_end_at_word_boundaries():
+    text = ("kubernetes " * 30).strip()
+    pieces, lengths = TextProcessor.split_long_spans(SubwordTokenizer(), text, [(0, len(text))], [120], 10)
+    # 4 tokens per word, two whole words fit in 10
+    assert {text[start:end] for start, end in pieces} == {"kubernetes kubernetes"}
+    assert lengths == [8] * 15
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from lib.config.model_config import ModelConfig
+from lib.config.skill_categories import SkillCategories
+from lib.extractors.skill_extractor import EARLY_EXIT_MIN_CONFIDENCE, ZeroShotSkillExtractor
+from lib.processors.resume_document import ResumeDocument
+
+
+class RandomScorer:
+    """fixed random entailment score per (chunk, skill)"""
+
+    def __init__(self, seed: int):
+        self.seed = seed
+
+    def score(self, premises, hypotheses):
+        scores = []
+        for premise, hypothesis in zip(premises, hypotheses):
+            # the same in any scoring order; half the pairs near or above the threshold
+            rng = random.Random(f"{self.seed}|{premise}|{hypothesis}")
+            scores.append(rng.random() if rng.random() < 0.5 else rng.uniform(0.8, 1.0))
+        return scores
+
+
+def extract(early_exit: bool, seed: int, document: ResumeDocument, skills, positions):
+    config = ModelConfig(use_gpu=False, score_cache_path=None, zsl_early_exit=early_exit)
+    extractor = ZeroShotSkillExtractor(config, SkillCategories.get_default_skills())
+    extractor.scorer = RandomScorer(seed)
+    stats = {}
+    detected = extractor.extract(document.text, skills, document=document,
+                                 skill_positions=positions, stats=stats)
+    return {skill["skill"]: skill["confidence"] for skill in detected}, stats
+
+
+def test_early_exit_is_off_by_default():
+    assert ModelConfig().zsl_early_exit is False
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_early_exit_detects_the_same_skills(seed):
+    rng = random.Random(seed)
+    chunks = [f"chunk {i} " + "worked on distributed systems and cloud infrastructure " * 2
+              for i in range(rng.randint(1, 12))]
+    spans, start = [], 0
+    for chunk in chunks:
+        spans.append((start, start + len(chunk)))
+        start += len(chunk) + 1
+    document = ResumeDocument(raw_text="", text=" ".join(chunks), chunks=chunks, chunk_spans=spans)
+    skills = rng.sample(["python", "docker", "kubernetes", "terraform", "aws", "java", "react"],
+                        rng.randint(1, 7))
+    positions = {skill: [(rng.randrange(start), 0)] for skill in skills if rng.random() < 0.5}
+
+    exhaustive, exhaustive_stats = extract(False, seed, document, skills, positions)
+    early, early_stats = extract(True, seed, document, skills, positions)
+
+    assert early.keys() == exhaustive.keys()
+    assert exhaustive_stats["pairs_skipped"] == 0
+    assert early_stats["pairs_scored"] + early_stats["pairs_skipped"] == exhaustive_stats["pairs_scored"]
+    for skill, confidence in early.items():
+        if confidence != exhaustive[skill]:
+            # only confirmed skills stop early, with a lower bound of their maximum
+            assert EARLY_EXIT_MIN_CONFIDENCE < confidence <= exhaustive[skill]
+
+
+class FailingChunkScorer(RandomScorer):
+    """RandomScorer that raises on any call including one chunk"""
+
+    def __init__(self, seed: int, bad_chunk: str):
+        super().__init__(seed)
+        self.bad_chunk = bad_chunk
+
+    def score(self, premises, hypotheses):
+        if self.bad_chunk in premises:
+            raise RuntimeError("CUDA error")
+        return super().score(premises, hypotheses)
+
+
+@pytest.mark.parametrize("early_exit", [False, True])
+def test_a_failing_chunk_costs_only_its_pairs(early_exit):
+    chunks = [f"chunk {i} " + "worked on distributed systems and cloud infrastructure " * 2
+              for i in range(4)]
+    document = ResumeDocument(raw_text="", text=" ".join(chunks), chunks=chunks)
+    skills = ["python", "docker", "kubernetes"]
+
+    config = ModelConfig(use_gpu=False, score_cache_path=None, zsl_early_exit=early_exit)
+    extractor = ZeroShotSkillExtractor(config, SkillCategories.get_default_skills())
+    extractor.scorer = FailingChunkScorer(7, chunks[0])
+    stats = {}
+    extractor.extract(document.text, skills, document=document, stats=stats)
+
+    # chunk 0 is every skill's first chunk, so even early exit attempts all its pairs
+    assert stats["pairs_failed"] == len(skills)
+    assert stats["pairs_scored"] > 0
+    if not early_exit:
+        assert stats["pairs_skipped"] == 0
+        assert stats["pairs_scored"] == 3 * len(skills)
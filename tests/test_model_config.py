@@ -0,0 +1,17 @@
+from lib.config.model_config import ModelConfig
+
+
+def test_from_dict_round_trip():
+    config = ModelConfig.get_accurate_config()
+    assert ModelConfig.from_dict(config.to_dict()) == config
+
+
+def test_from_dict_reads_configs_saved_before_renames(caplog):
+    saved = ModelConfig.get_fast_config().to_dict()
+    saved["zsl_batch_size"] = saved.pop("nli_batch_size") + 1
+    saved["retired_option"] = True
+
+    config = ModelConfig.from_dict(saved)
+
+    assert config.nli_batch_size == saved["zsl_batch_size"]
+    assert "retired_option" in caplog.text
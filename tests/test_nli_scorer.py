@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from lib.config.model_config import ModelConfig  # noqa: E402
+from lib.processors.resume_document import ResumeDocument  # noqa: E402
+from lib.utils.nli_scorer import NLIScorer  # noqa: E402
+from lib.utils.score_cache import ScoreCache  # noqa: E402
+from script import ResumeSkillExtractor  # noqa: E402
+
+
+class StubBatch(dict):
+    def to(self, device):
+        return self
+
+
+class StubTokenizer:
+    """word count token ids, joint pair encoding only"""
+
+    def __call__(self, premises, hypotheses=None, truncation=None, **kwargs):
+        if isinstance(premises, str):
+            premises, hypotheses = [premises], [hypotheses]
+        input_ids = [[1] * (len(premise.split()) + len(hypothesis.split()))
+                     for premise, hypothesis in zip(premises, hypotheses)]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, encodings, return_tensors="pt"):
+        width = max(len(ids) for ids in encodings["input_ids"])
+        return StubBatch({key: torch.tensor([ids + [0] * (width - len(ids)) for ids in values])
+                          for key, values in encodings.items()})
+
+
+class StubModel(torch.nn.Module):
+    def __init__(self, name_or_path="stub-nli"):
+        super().__init__()
+        self.config = SimpleNamespace(
+            name_or_path=name_or_path, _commit_hash="0" * 40,
+            label2id={"contradiction": 0, "neutral": 1, "entailment": 2})
+
+    def forward(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(dim=1, keepdim=True).float()
+        return SimpleNamespace(logits=torch.cat([-lengths, lengths * 0, lengths / 10], dim=1))
+
+
+def test_uncached_scoring_measures_seconds_per_pair():
+    scorer = NLIScorer(StubModel(), StubTokenizer(), batch_size=4)
+    premises = [f"built {'backend ' * i}services" for i in range(10)]
+
+    scores = scorer.score(premises, ["python"] * len(premises))
+
+    assert len(scores) == len(premises) and all(0 < score < 1 for score in scores)
+    # a stub forward pass takes microseconds, not the process uptime
+    assert 0 < scorer.seconds_per_pair < 0.1
+    scorer.score(premises, ["docker"] * len(premises))
+    assert 0 < scorer.seconds_per_pair < 0.1
+
+
+def test_role_budget_follows_the_measured_cost():
+    config = ModelConfig.get_accurate_config()
+    config.score_cache_path = None
+    config.result_cache_path = None
+    config.role_max_chunks = 8
+    config.role_latency_budget_ms = 1000
+    extractor = ResumeSkillExtractor(config=config, load_models=False)
+    extractor.role_scorer = NLIScorer(StubModel(), StubTokenizer())
+
+    chunks = [f"Chunk {i} about building backend services in Python." for i in range(40)]
+    text = " ".join(chunks)
+    document = ResumeDocument(raw_text=text, text=text, chunks=chunks)
+    extractor.classify_role(text, document)
+
+    # once measured, stub pairs cost next to nothing and the budget affords every chunk
+    assert extractor.classify_role(text, document)["chunks_scored"] == 8
+
+
+def test_replacing_a_local_model_misses_the_score_cache(tmp_path):
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "model.safetensors").write_bytes(b"weights v1")
+    cache = ScoreCache(str(tmp_path / "scores.db"))
+    premises, labels = ["built backend services"], ["python"]
+
+    def scorer():
+        model = StubModel(name_or_path=str(model_dir))
+        model.config._commit_hash = None
+        return NLIScorer(model, StubTokenizer(), score_cache=cache)
+
+    scorer().score(premises, labels)
+    reused = scorer()
+    reused.score(premises, labels)
+    assert reused.seconds_per_pair is None
+
+    # retrained in place: the model id, and so every cache key, changes
+    (model_dir / "model.safetensors").write_bytes(b"weights v2, retrained")
+    retrained = scorer()
+    assert retrained.model_id != reused.model_id
+    retrained.score(premises, labels)
+    assert retrained.seconds_per_pair is not None
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from lib.config.skill_categories import SkillCategories
+from lib.processors.skill_matcher import get_skill_matcher
+from lib.processors.skill_taxonomy import get_skill_taxonomy
+from lib.processors.text_processor import TextCleaner, TextProcessor
+
+WORDS = ["python", "machine", "learning", "node.js", "c++", "c#", "react", "k8s", "apache", "kafka",
+         "Σ", "ΟΔΟΣ", "\u0003", "\xa0", "\t", "\n", " ", "  ", "-", "senior", "engineer", "go", "r", "."]
+
+
+def random_pages(rng: random.Random):
+    text = "".join(rng.choice(WORDS) + rng.choice(["", " ", "\n", "-"]) for _ in range(rng.randint(0, 300)))
+    cuts = sorted(rng.sample(range(len(text) + 1), min(rng.randint(0, 6), len(text) + 1)))
+    # pages as TextExtractor.extract_from_pdf hands them out, a line break after each
+    return [page + "\n" for page in (text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)]))]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    taxonomy = get_skill_taxonomy(SkillCategories.get_default_skills(), SkillCategories.get_skill_aliases())
+    return get_skill_matcher(taxonomy)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_page_by_page_matches_whole_text(seed, matcher):
+    pages = random_pages(random.Random(seed))
+    cleaner = TextCleaner()
+    stream = matcher.stream()
+    for page in pages:
+        stream.feed(cleaner.feed(page))
+
+    whole = TextCleaner()
+    whole.feed("".join(pages))
+    text = TextProcessor().clean_text("".join(pages))
+    assert cleaner.text == whole.text == text
+    assert cleaner.line_breaks == whole.line_breaks
+    assert stream.text_lower == text.lower()
+    assert stream.finish() == matcher.find_ids(text)
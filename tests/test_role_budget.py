@@ -0,0 +1,45 @@
+from lib.config.model_config import ModelConfig
+from lib.processors.resume_document import ResumeDocument
+from script import ResumeSkillExtractor
+
+
+class CountingScorer:
+    tokenizer = None
+    seconds_per_pair = None
+
+    def __init__(self):
+        self.pairs = []
+
+    def score(self, premises, labels):
+        self.pairs.append(len(premises))
+        return [0.5] * len(premises)
+
+
+def extractor_with(scorer, budget_ms):
+    config = ModelConfig.get_accurate_config()
+    config.score_cache_path = None
+    config.result_cache_path = None
+    config.role_max_chunks = 8
+    config.role_latency_budget_ms = budget_ms
+    extractor = ResumeSkillExtractor(config=config, load_models=False)
+    extractor.role_scorer = scorer
+    return extractor
+
+
+def long_resume():
+    chunks = [f"Chunk {i} about building backend services in Python." for i in range(40)]
+    text = " ".join(chunks)
+    return text, ResumeDocument(raw_text=text, text=text, chunks=chunks)
+
+
+def test_budget_applies_before_anything_is_measured():
+    scorer = CountingScorer()
+    extractor = extractor_with(scorer, budget_ms=1)
+    roles = len(extractor.config.candidate_roles)
+
+    result = extractor.classify_role(*long_resume())
+
+    # the default pair cost affords less than one chunk, the first is always kept
+    assert result["chunks_scored"] == 1
+    assert scorer.pairs == [roles]
+
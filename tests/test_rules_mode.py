@@ -0,0 +1,32 @@
+import sys
+
+from lib.config.model_config import ModelConfig
+from script import ResumeSkillExtractor
+
+TEXT = "Senior engineer.\nPython, Docker and Kubernetes on AWS.\n- Terraform\n"
+
+
+def test_rules_mode_loads_no_model():
+    extractor = ResumeSkillExtractor(config=ModelConfig.get_rules_config())
+
+    skills = extractor.hybrid_skill_extraction(TEXT)
+    assert skills["extraction_stats"]["method"] == "rule_based"
+    assert {"python", "docker", "kubernetes", "terraform"} <= set(skills["skill_names"])
+
+    # without skills, predict_role extracts them itself, rules-only as well
+    role = extractor.predict_role(TEXT)
+    assert role == extractor.predict_role(TEXT, skills=skills)
+
+    assert extractor.zsl_extractor.scorer is None
+    assert extractor.hybrid_extractor.zsl_extractor.scorer is None
+    assert "torch" not in sys.modules and "transformers" not in sys.modules
+
+
+def test_rules_sentences_break_at_raw_line_breaks():
+    processor = ResumeSkillExtractor(config=ModelConfig.get_rules_config()).text_processor
+    document = processor.create_rules_document(
+        "Skills\n\n- Python 3.5\n- node.js   and Docker\n\nBuilt APIs. Shipped them!\n")
+
+    assert document.text == processor.clean_text(document.raw_text)
+    assert document.sentences == [
+        "Skills", "- Python 3.5", "- node.js and Docker", "Built APIs.", "Shipped them!"]
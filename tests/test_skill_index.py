@@ -0,0 +1,111 @@
+import pytest
+
+from lib.processors.skill_index import QueryError, SkillIndex, SkillIndexBuilder
+
+SKILL_TO_CATEGORY = {
+    "kubernetes": "cloud_devops",
+    "terraform": "cloud_devops",
+    "php": "backend",
+    "python": "backend",
+    "react": "frontend",
+}
+ALIASES = {"kubernetes": ["k8s"]}
+
+
+def skills(**confidences):
+    return {"detailed_skills": [{"skill": skill, "confidence": confidence, "matches": 1}
+                                for skill, confidence in confidences.items()]}
+
+
+def build(tmp_path, resumes):
+    builder = SkillIndexBuilder(SKILL_TO_CATEGORY, ALIASES)
+    for resume, resume_skills in resumes:
+        builder.add(resume, resume_skills)
+    builder.save(str(tmp_path))
+    return SkillIndex(str(tmp_path))
+
+
+def matching(index, query, min_confidence=0.0):
+    resume_ids, _ = index.query(query, min_confidence)
+    return {index.resumes[resume_id] for resume_id in resume_ids}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return build(tmp_path, [
+        ("a.pdf", skills(kubernetes=0.95, terraform=0.7, python=0.9)),
+        ("b.pdf", skills(kubernetes=0.6, php=0.8)),
+        ("c.pdf", skills(react=0.99, python=0.5)),
+        ("d.pdf", skills(terraform=0.92)),
+    ])
+
+
+def test_replaced_resume_keeps_its_last_result(tmp_path):
+    index = build(tmp_path, [
+        ("a.pdf", skills(kubernetes=0.9, php=0.8)),
+        ("a.pdf", skills(kubernetes=0.7)),
+    ])
+    assert index.resume_count == 1
+    assert index.skills == ["kubernetes"]
+    assert matching(index, "kubernetes") == {"a.pdf"}
+    assert matching(index, "php") == set()
+    # its category is still known, just empty
+    assert matching(index, "category:backend") == set()
+    assert index.search("kubernetes")[0]["skills"] == {"kubernetes": 0.7}
+
+
+def test_replacement_renumbers_resumes(tmp_path):
+    index = build(tmp_path, [
+        ("a.pdf", skills(python=0.9)),
+        ("b.pdf", skills(python=0.8)),
+        ("a.pdf", skills(react=0.9)),
+    ])
+    assert index.resumes == ["b.pdf", "a.pdf"]
+    assert matching(index, "python") == {"b.pdf"}
+    assert matching(index, "react") == {"a.pdf"}
+
+
+def test_boolean_operators(index):
+    assert matching(index, "kubernetes AND python") == {"a.pdf"}
+    assert matching(index, "php OR react") == {"b.pdf", "c.pdf"}
+    assert matching(index, "python AND NOT kubernetes") == {"c.pdf"}
+    assert matching(index, "(php OR react) AND python") == {"c.pdf"}
+    assert matching(index, "kubernetes AND python OR react") == {"a.pdf", "c.pdf"}
+    assert matching(index, "k8s") == {"a.pdf", "b.pdf"}
+    assert matching(index, "unknown_skill OR php") == {"b.pdf"}
+
+
+def test_not_only_queries(index):
+    assert matching(index, "NOT kubernetes") == {"c.pdf", "d.pdf"}
+    assert matching(index, "NOT (kubernetes OR react)") == {"d.pdf"}
+    assert matching(index, "NOT NOT php") == {"b.pdf"}
+
+
+def test_category_terms(index):
+    assert matching(index, "category:cloud_devops") == {"a.pdf", "b.pdf", "d.pdf"}
+    assert matching(index, "category:cloud_devops>0.9") == {"a.pdf", "d.pdf"}
+    assert matching(index, "category:backend AND NOT category:cloud_devops") == {"c.pdf"}
+
+
+def test_confidence_thresholds(index):
+    assert matching(index, "kubernetes>0.9") == {"a.pdf"}
+    assert matching(index, "python", min_confidence=0.6) == {"a.pdf"}
+    # a term's own threshold wins over min_confidence
+    assert matching(index, "python>0.4", min_confidence=0.6) == {"a.pdf", "c.pdf"}
+
+
+def test_search_ranks_by_summed_confidence(index):
+    hits = index.search("kubernetes OR terraform", top_k=2)
+    assert [hit["resume"] for hit in hits] == ["a.pdf", "d.pdf"]
+    assert hits[0]["skills"] == {"kubernetes": 0.95, "terraform": 0.7}
+    # negated skills don't count
+    assert index.search("terraform AND NOT python")[0]["skills"] == {"terraform": 0.92}
+
+
+@pytest.mark.parametrize("query", [
+    "", "kubernetes AND", "(kubernetes", "kubernetes)", "AND php", "kubernetes>high",
+    "category:no_such_category",
+])
+def test_malformed_queries(index, query):
+    with pytest.raises(QueryError):
+        index.query(query)
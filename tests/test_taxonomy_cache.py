@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+
+from lib.config.skill_categories import SkillCategories
+from lib.processors.skill_taxonomy import SkillTaxonomy, TaxonomyError, get_skill_taxonomy
+
+SKILLS = {"cloud_devops": ["kubernetes", "terraform"], "backend": ["python"]}
+ALIASES = {"kubernetes": ["k8s"]}
+
+
+def test_save_replaces_a_mapped_build_without_touching_its_files(tmp_path):
+    directory = tmp_path / "taxonomy"
+    taxonomy = SkillTaxonomy.build(SKILLS, ALIASES)
+    taxonomy.save(str(directory))
+    mapped = SkillTaxonomy.load(str(directory))
+
+    taxonomy.save(str(directory))
+
+    # the old mapping still reads, the new build loads, no staging is left behind
+    assert np.array_equal(mapped.category_bits, taxonomy.category_bits)
+    reloaded = SkillTaxonomy.load(str(directory))
+    assert reloaded.names == taxonomy.names
+    assert reloaded.skill_id("k8s") == taxonomy.skill_id("kubernetes")
+    assert os.listdir(tmp_path) == ["taxonomy"]
+
+
+def test_save_over_an_interrupted_build(tmp_path):
+    directory = tmp_path / "taxonomy"
+    directory.mkdir()
+    (directory / "primary_category.npy").write_bytes(b"truncated")
+
+    taxonomy = SkillTaxonomy.build(SKILLS, ALIASES)
+    taxonomy.save(str(directory))
+
+    assert SkillTaxonomy.load(str(directory)).digest == taxonomy.digest
+    assert os.listdir(tmp_path) == ["taxonomy"]
+
+
+def test_custom_skills_are_normalized_not_rejected(caplog):
+    custom = SkillCategories.create_custom_categories(
+        {"devops": ["Pulumi", " pulumi "], "newcat": ["a", "a", "Kubernetes", ""]})
+    assert custom["newcat"] == ["a", "kubernetes"]
+    assert custom["devops"].count("pulumi") == 1
+    assert "normalized" in caplog.text
+
+    taxonomy = get_skill_taxonomy({"newcat": ["Pulumi", "a", "a"], "other": ["B "]},
+                                  {"pulumi": ["Pulumi-CLI"]})
+    assert taxonomy.names == ["pulumi", "a", "b"]
+    assert taxonomy.skill_id("pulumi-cli") == taxonomy.skill_id("pulumi")
+
+
+def test_default_lists_stay_strict():
+    with pytest.raises(TaxonomyError):
+        SkillTaxonomy.build({"newcat": ["a", "a"]}, {}, strict=True)